@@ -0,0 +1,44 @@
+"""Add chatroom cards
+
+Revision ID: add_chatroom_cards
+Revises: partition_messages_by_month
+Create Date: 2026-10-19 12:00:00.000000
+
+채팅방 목록용 비정규화 카드 테이블(chatroom_cards)을 추가합니다.
+카드 채우기는 마이그레이션 이후 `python -m app.utils.room_cards rebuild`로 수행합니다.
+(앱 시작 시 카드 수가 채팅방 수와 다르면 자동으로 다시 만듭니다.)
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'add_chatroom_cards'
+down_revision: Union[str, None] = 'partition_messages_by_month'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        'chatroom_cards',
+        sa.Column('chatroom_id', sa.String(), sa.ForeignKey('chatrooms.id', ondelete='CASCADE'), primary_key=True),
+        sa.Column('title', sa.String(length=100), nullable=False),
+        sa.Column('is_active', sa.Boolean(), nullable=False, server_default=sa.true()),
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+        sa.Column('card', sa.Text(), nullable=False),
+        sa.Column('refreshed_at', sa.DateTime(), nullable=True),
+    )
+    op.create_index(
+        'ix_chatroom_cards_listing', 'chatroom_cards', ['is_active', 'created_at', 'chatroom_id']
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_chatroom_cards_listing', table_name='chatroom_cards')
+    op.drop_table('chatroom_cards')
@@ -0,0 +1,34 @@
+"""Add last message columns to chatroom cards
+
+Revision ID: chatroom_card_last_message
+Revises: chatroom_json_columns
+Create Date: 2026-10-19 15:00:00.000000
+
+chatroom_cards에 카드에 반영된 최신 메시지(last_message_id, last_message_at)를 추가합니다.
+앱 시작 시 이 값을 채팅방별 최신 메시지와 비교해 어긋난 카드만 다시 만들며,
+기존 카드는 값이 비어 있으므로 마이그레이션 후 첫 시작 때 메시지가 있는 채팅방 카드가 다시 만들어집니다.
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'chatroom_card_last_message'
+down_revision: Union[str, None] = 'chatroom_json_columns'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('chatroom_cards', sa.Column('last_message_id', sa.String(), nullable=True))
+    op.add_column('chatroom_cards', sa.Column('last_message_at', sa.DateTime(), nullable=True))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('chatroom_cards', 'last_message_at')
+    op.drop_column('chatroom_cards', 'last_message_id')
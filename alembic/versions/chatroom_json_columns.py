@@ -0,0 +1,64 @@
+"""Convert chatroom participants/connection to JSONB
+
+Revision ID: chatroom_json_columns
+Revises: add_chatroom_cards
+Create Date: 2026-10-19 13:00:00.000000
+
+chatrooms.participants / connection을 JSON 문자열(TEXT)에서 JSONB로 바꿉니다. (PostgreSQL 전용)
+- 비어 있거나 NULL인 값은 '[]'로, PostgreSQL 배열 문자열('{a,b}')은 JSON 배열로 변환
+- participants에 GIN 인덱스(jsonb_path_ops)를 만들어 참여 채팅방 조회(@>)에 사용
+다른 DB에서는 기존 TEXT 컬럼에 JSON 문자열이 그대로 저장되므로 변경하지 않습니다.
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'chatroom_json_columns'
+down_revision: Union[str, None] = 'add_chatroom_cards'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def _to_jsonb(column: str) -> str:
+    return (
+        f"CASE "
+        f"WHEN {column} IS NULL OR btrim({column}) IN ('', '{{}}') THEN '[]'::jsonb "
+        f"WHEN btrim({column}) LIKE '{{%}}' THEN to_jsonb(btrim({column})::text[]) "
+        f"ELSE {column}::jsonb END"
+    )
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    bind = op.get_bind()
+    if bind.dialect.name != "postgresql":
+        return
+
+    for column in ("participants", "connection"):
+        op.execute(f"ALTER TABLE chatrooms ALTER COLUMN {column} DROP DEFAULT")
+        op.execute(f"ALTER TABLE chatrooms ALTER COLUMN {column} TYPE JSONB USING {_to_jsonb(column)}")
+        op.execute(f"ALTER TABLE chatrooms ALTER COLUMN {column} SET DEFAULT '[]'::jsonb")
+        op.execute(f"ALTER TABLE chatrooms ALTER COLUMN {column} SET NOT NULL")
+
+    op.create_index(
+        'ix_chatrooms_participants', 'chatrooms', ['participants'],
+        postgresql_using='gin', postgresql_ops={'participants': 'jsonb_path_ops'}
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    bind = op.get_bind()
+    if bind.dialect.name != "postgresql":
+        return
+
+    op.drop_index('ix_chatrooms_participants', table_name='chatrooms')
+    for column in ("participants", "connection"):
+        op.execute(f"ALTER TABLE chatrooms ALTER COLUMN {column} DROP NOT NULL")
+        op.execute(f"ALTER TABLE chatrooms ALTER COLUMN {column} DROP DEFAULT")
+        op.execute(f"ALTER TABLE chatrooms ALTER COLUMN {column} TYPE TEXT USING {column}::text")
+        op.execute(f"ALTER TABLE chatrooms ALTER COLUMN {column} SET DEFAULT '[]'")
@@ -0,0 +1,108 @@
+"""Partition messages by month
+
+Revision ID: partition_messages_by_month
+Revises: create_default_chatrooms
+Create Date: 2026-10-19 09:00:00.000000
+
+messages 테이블을 timestamp 기준 월별 RANGE 파티션 테이블로 전환합니다. (PostgreSQL 전용)
+- 기존 데이터 범위의 월 파티션 + 앞으로 3개월 파티션을 미리 생성
+- 범위를 벗어난 행을 받기 위한 DEFAULT 파티션 (정상 운영 시 비어 있어야 함)
+- 이후 파티션 생성/분리는 `python -m app.utils.partitions`로 관리
+
+"""
+from typing import Sequence, Union
+from datetime import datetime
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'partition_messages_by_month'
+down_revision: Union[str, None] = 'create_default_chatrooms'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+MONTHS_AHEAD = 3
+
+
+def _add_months(month_start: datetime, months: int) -> datetime:
+    month_index = month_start.year * 12 + month_start.month - 1 + months
+    return datetime(month_index // 12, month_index % 12 + 1, 1)
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    bind = op.get_bind()
+    if bind.dialect.name != "postgresql":
+        return
+
+    # 기존 테이블을 옆으로 치우고 제약 조건/인덱스 이름 충돌 방지
+    op.execute("ALTER TABLE messages RENAME TO messages_unpartitioned")
+    op.execute("ALTER TABLE messages_unpartitioned RENAME CONSTRAINT messages_pkey TO messages_unpartitioned_pkey")
+    op.execute("ALTER INDEX IF EXISTS ix_messages_id RENAME TO ix_messages_unpartitioned_id")
+
+    # 파티션 키(timestamp)는 PK에 포함되어야 하며 NULL일 수 없음
+    op.execute("""
+        CREATE TABLE messages (
+            id VARCHAR NOT NULL,
+            chatroom_id VARCHAR NOT NULL REFERENCES chatrooms (id),
+            sender_id VARCHAR(50) NOT NULL REFERENCES users (firebase_uid),
+            content TEXT NOT NULL,
+            timestamp TIMESTAMP WITHOUT TIME ZONE NOT NULL DEFAULT (now() AT TIME ZONE 'utc'),
+            is_read BOOLEAN DEFAULT false,
+            PRIMARY KEY (id, timestamp)
+        ) PARTITION BY RANGE (timestamp)
+    """)
+    op.execute("CREATE INDEX ix_messages_chatroom_id_timestamp ON messages (chatroom_id, timestamp)")
+
+    # 기존 데이터 범위 ~ 앞으로 MONTHS_AHEAD개월까지 월 파티션 생성
+    oldest = bind.execute(sa.text("SELECT min(timestamp) FROM messages_unpartitioned")).scalar()
+    now = datetime.utcnow()
+    month = datetime((oldest or now).year, (oldest or now).month, 1)
+    last = _add_months(datetime(now.year, now.month, 1), MONTHS_AHEAD)
+    while month <= last:
+        next_month = _add_months(month, 1)
+        op.execute(
+            f"CREATE TABLE messages_y{month:%Y}m{month:%m} PARTITION OF messages "
+            f"FOR VALUES FROM ('{month:%Y-%m-%d}') TO ('{next_month:%Y-%m-%d}')"
+        )
+        month = next_month
+    op.execute("CREATE TABLE messages_default PARTITION OF messages DEFAULT")
+
+    # 데이터 이관 (timestamp가 비어 있던 행은 현재 시각으로)
+    op.execute("""
+        INSERT INTO messages (id, chatroom_id, sender_id, content, timestamp, is_read)
+        SELECT id, chatroom_id, sender_id, content,
+               COALESCE(timestamp, now() AT TIME ZONE 'utc'), is_read
+        FROM messages_unpartitioned
+    """)
+    op.execute("DROP TABLE messages_unpartitioned")
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    bind = op.get_bind()
+    if bind.dialect.name != "postgresql":
+        return
+
+    op.execute("ALTER TABLE messages RENAME TO messages_partitioned")
+    op.execute("ALTER INDEX ix_messages_chatroom_id_timestamp RENAME TO ix_messages_partitioned_chatroom_id_timestamp")
+    op.create_table('messages',
+        sa.Column('id', sa.String(), nullable=False),
+        sa.Column('chatroom_id', sa.String(), nullable=False),
+        sa.Column('sender_id', sa.String(50), nullable=False),
+        sa.Column('content', sa.Text(), nullable=False),
+        sa.Column('timestamp', sa.DateTime(), nullable=True),
+        sa.Column('is_read', sa.Boolean(), nullable=True, default=False),
+        sa.PrimaryKeyConstraint('id'),
+        sa.ForeignKeyConstraint(['chatroom_id'], ['chatrooms.id']),
+        sa.ForeignKeyConstraint(['sender_id'], ['users.firebase_uid'])
+    )
+    op.execute("""
+        INSERT INTO messages (id, chatroom_id, sender_id, content, timestamp, is_read)
+        SELECT id, chatroom_id, sender_id, content, timestamp, is_read
+        FROM messages_partitioned
+    """)
+    # 파티션들도 함께 삭제됨
+    op.execute("DROP TABLE messages_partitioned CASCADE")
@@ -1,9 +1,23 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, status
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
-from app.core.firebase import get_db, get_current_user_id
+from starlette.types import Receive, Scope, Send
+from app.core.firebase import get_db, get_admin_user_id, get_current_user_id
+from app.core.response_cache import CHATROOM_LISTINGS, response_cache
 from app.utils.init_data import create_default_chatrooms
+from app.utils.room_cards import refresh_room_card
 from app.models.chatroom import ChatroomDB
+from app.db import pool_monitor, session_router
+from app.schemas.bulk_import import ImportProgress
+from app.utils.bulk_import import DEFAULT_CHUNK_SIZE, IMPORT_FORMATS, IMPORT_KINDS, BodyChunkStream, iter_import
+from app.utils.export import NDJSON_MEDIA_TYPE
+from typing import Optional
+import asyncio
+import io
 import logging
+import queue
+import threading
 
 logger = logging.getLogger(__name__)
 
@@ -13,6 +27,22 @@ router = APIRouter(
     responses={404: {"description": "Not found"}},
 )
 
+
+class _UploadProgressResponse(StreamingResponse):
+    """
+    요청 본문을 받는 동안 보내는 스트리밍 응답.
+
+    StreamingResponse는 전송 중 receive()로 연결 종료를 기다리는데, 그러면 아직 읽지 않은
+    본문 메시지를 가로채므로 종료 감지 없이 본문 반복만 보냅니다.
+    (업로드 중 연결이 끊기면 request.stream()에서 감지)
+    """
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        await self.stream_response(send)
+        if self.background is not None:
+            await self.background()
+
+
 @router.post("/chatrooms/create-defaults", status_code=201)
 async def create_default_chatrooms_endpoint(
     current_user_id: str = Depends(get_current_user_id),
@@ -39,6 +69,7 @@ async def create_default_chatrooms_endpoint(
         
         # 기본 채팅방 생성
         create_default_chatrooms(db)
+        response_cache.invalidate(CHATROOM_LISTINGS)
         
         # 생성된 채팅방 개수 확인
         new_count = db.query(ChatroomDB).filter(
@@ -89,8 +120,10 @@ async def remove_default_chatrooms_endpoint(
         # 시스템 채팅방들 삭제
         for chatroom in system_chatrooms:
             db.delete(chatroom)
+            refresh_room_card(db, chatroom.id)
         
         db.commit()
+        response_cache.invalidate(CHATROOM_LISTINGS)
         
         logger.info(f"관리자 {current_user_id}에 의해 시스템 채팅방 {deleted_count}개가 삭제되었습니다.")
         
@@ -150,4 +183,91 @@ async def get_system_chatrooms_stats(
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"통계 조회 중 오류가 발생했습니다: {str(e)}"
-        ) 
\ No newline at end of file
+        ) 
+
+@router.get("/db/pool", status_code=200)
+async def get_db_pool_stats(
+    current_user_id: str = Depends(get_admin_user_id)
+):
+    """DB 커넥션 풀 점유 현황과 checkout 대기 시간을 조회합니다. (워커 단위, 관리자 전용)"""
+    return pool_monitor.stats()
+
+
+@router.get("/db/routing", status_code=200)
+async def get_db_routing_stats(
+    current_user_id: str = Depends(get_admin_user_id)
+):
+    """읽기 복제본 라우팅 결정 횟수와 복제본별 지연을 조회합니다. (워커 단위, 관리자 전용)"""
+    return session_router.stats()
+
+
+@router.post("/import/{kind}", status_code=200)
+async def bulk_import_endpoint(
+    kind: str,
+    request: Request,
+    format: str = Query("ndjson", description="입력 형식 (ndjson / csv)"),
+    chunk_size: int = Query(DEFAULT_CHUNK_SIZE, ge=100, le=100_000, description="청크당 행 수"),
+    current_user_id: str = Depends(get_admin_user_id)
+):
+    """
+    메시지/채팅방을 대량으로 가져옵니다. (관리자 전용, ADMIN_UIDS)
+    
+    - **kind**: messages 또는 chatrooms
+    - 요청 본문: NDJSON(한 줄에 레코드 하나) 또는 헤더가 있는 CSV
+    
+    본문은 받는 대로 적재 스레드에 넘기므로 업로드 중에도 청크 단위로 적재됩니다.
+    응답은 업로드가 끝나기 전에 시작되며, 청크마다 진행 상황을 NDJSON 한 줄로 스트리밍합니다.
+    마지막 줄은 done=true 이고, 중간에 실패하면 그 줄의 error에 오류 내용이 담깁니다.
+    """
+    if kind not in IMPORT_KINDS:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=f"지원하지 않는 가져오기 대상입니다: {kind}")
+    if format not in IMPORT_FORMATS:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=f"지원하지 않는 형식입니다: {format}")
+    
+    logger.info(f"관리자 {current_user_id}의 대량 가져오기 시작: {kind} ({format})")
+    
+    # 적재는 별도 스레드에서 본문을 받는 대로 진행하고, 진행 상황은 큐로 전달
+    body = BodyChunkStream()
+    progress_queue: "queue.Queue[Optional[str]]" = queue.Queue()
+    
+    def run_import():
+        last = ImportProgress(kind=kind)
+        try:
+            for progress in iter_import(io.BufferedReader(body), kind, format, chunk_size):
+                last = progress
+                progress_queue.put(progress.model_dump_json() + "\n")
+        except Exception as e:
+            logger.error(f"대량 가져오기 실패 ({kind}): {str(e)}")
+            # 잘린 응답과 구분되도록 실패도 done=true 줄로 알림
+            failed = last.model_copy(update={"done": True, "error": str(e)})
+            progress_queue.put(failed.model_dump_json() + "\n")
+        finally:
+            body.abandon()
+            response_cache.invalidate(CHATROOM_LISTINGS)
+            progress_queue.put(None)
+    
+    async def feed_body():
+        # 본문은 청크 단위로 넘기며, 적재가 밀리면 큐가 빌 때까지 기다림 (업로드 속도 조절)
+        try:
+            async for body_chunk in request.stream():
+                await run_in_threadpool(body.feed, body_chunk)
+        except Exception as e:
+            await run_in_threadpool(body.fail, OSError(f"요청 본문 수신 중단: {e.__class__.__name__}"))
+        else:
+            await run_in_threadpool(body.finish)
+    
+    async def progress_lines():
+        threading.Thread(target=run_import, name=f"bulk-import-{kind}", daemon=True).start()
+        feeder = asyncio.create_task(feed_body())
+        try:
+            while True:
+                line = await run_in_threadpool(progress_queue.get)
+                if line is None:
+                    return
+                yield line
+        finally:
+            body.abandon()
+            feeder.cancel()
+    
+    # 업로드가 끝나기 전에 응답을 시작해 청크마다 진행 상황을 바로 보냄
+    return _UploadProgressResponse(progress_lines(), media_type=NDJSON_MEDIA_TYPE)
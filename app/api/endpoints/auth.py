@@ -1,14 +1,16 @@
 from fastapi import APIRouter, Depends, HTTPException, status, Body
+from fastapi.concurrency import run_in_threadpool
 from fastapi.security import OAuth2PasswordBearer
-from app.core.firebase import verify_token, get_db, auth
-from app.models.user_models import TokenData, UserDB
+from app.core.auth_providers import get_auth_provider
+from app.core.firebase import verify_token, get_db
+from app.models.user_models import UserDB
+from app.db import session_router
 from sqlalchemy.orm import Session
 import logging
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="token")
 
 # 로깅 설정
-logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 router = APIRouter(prefix="/auth", tags=["인증"])
@@ -18,7 +20,11 @@ async def login(
     request_data: dict = Body(...),
     db: Session = Depends(get_db)
 ):
-    """Firebase UID를 사용하여 커스텀 토큰을 생성합니다."""
+    """
+    UID로 로그인 토큰을 생성합니다.
+
+    AUTH_PROVIDER=firebase이면 Firebase 커스텀 토큰, local이면 바로 사용할 수 있는 로컬 JWT를 반환합니다.
+    """
     try:
         uid = request_data.get("uid")
         if not uid:
@@ -27,12 +33,8 @@ async def login(
                 detail="UID is required"
             )
         
-        # Firebase 커스텀 토큰 생성
-        custom_token = auth.create_custom_token(uid)
-        
-        # 바이트를 문자열로 변환
-        if isinstance(custom_token, bytes):
-            custom_token = custom_token.decode('utf-8')
+        # 인증 공급자별 토큰 생성 (Firebase 커스텀 토큰 또는 로컬 JWT)
+        custom_token = get_auth_provider().issue_token(uid)
         
         logger.info(f"Custom token created for UID: {uid}")
         
@@ -48,31 +50,30 @@ async def login(
             detail=f"Failed to create custom token: {str(e)}"
         )
 
-async def get_current_user(token: str = Depends(oauth2_scheme)) -> TokenData:
+async def get_token_claims(token: str = Depends(oauth2_scheme)) -> dict:
     decoded_token = await verify_token(token)
     if not decoded_token or "uid" not in decoded_token:
         raise HTTPException(status_code=401, detail="Invalid token")
 
-    print("decode 성공")
-    return TokenData(firebase_uid=decoded_token["uid"])
+    return decoded_token
 
 
 
 @router.post("/sync")
 async def sync_user(
-    token_data: TokenData = Depends(get_current_user),
+    claims: dict = Depends(get_token_claims),
     db: Session = Depends(get_db),
 ):
-    uid = token_data.firebase_uid
-    firebase_user = auth.get_user(uid)
+    uid = claims["uid"]
+    # 인증 공급자별 사용자 정보 (firebase: Admin SDK 조회, local: 토큰 클레임)
+    firebase_user = await run_in_threadpool(get_auth_provider().get_user, uid, claims)
 
-    # Firebase 사용자 정보 로깅
-    logger.info(f"Firebase user info for UID {uid}:")
-    logger.info(f"  - Email: {firebase_user.email}")
-    logger.info(f"  - Display Name: {firebase_user.display_name}")
-    logger.info(f"  - Photo URL: {firebase_user.photo_url}")
-    logger.info(f"  - Phone Number: {firebase_user.phone_number}")
-    logger.info(f"  - Provider Data: {firebase_user.provider_data}")
+    # 사용자 정보 로깅
+    logger.debug(f"Auth user info for UID {uid} ({get_auth_provider().name}):")
+    logger.debug(f"  - Email: {firebase_user.email}")
+    logger.debug(f"  - Display Name: {firebase_user.display_name}")
+    logger.debug(f"  - Photo URL: {firebase_user.photo_url}")
+    logger.debug(f"  - Phone Number: {firebase_user.phone_number}")
 
     db_user = db.query(UserDB).filter_by(firebase_uid=uid).first()
     if not db_user:
@@ -103,6 +104,7 @@ async def sync_user(
     
     db.commit()
     db.refresh(db_user)
+    session_router.mark_write(uid)
 
     return {
         "success": True, 
@@ -1,19 +1,26 @@
 from fastapi import APIRouter, Depends, Body, WebSocket, WebSocketDisconnect, HTTPException, status, Query
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
-from typing import List, Dict
+from starlette.concurrency import run_in_threadpool
+from typing import List, Dict, Optional, Tuple
 from app.schemas.chat import MessageRequest
 from app.schemas.chatroom import Message
 
-from datetime import datetime
-import json
+from datetime import datetime, timezone
 
-from app.core.firebase import get_current_user_id, get_db
-from app.models.chatroom import MessageDB, ChatroomDB
+from app.core.firebase import get_current_user_id, get_db, get_user_read_db
+from app.core.responses import model_response
+from app.db import session_router
+from app.models.chatroom import MessageDB, ChatroomDB, has_participant
+from app.utils.archive import has_archive, read_archived_messages
+from app.utils.export import NDJSON_MEDIA_TYPE, iter_room_ndjson
 from app.utils.utils import (
     get_chatroom_or_404, 
     verify_chatroom_participant, 
     apply_pagination, 
     create_message, 
+    forget_room_loads,
+    message_flight,
     connection_manager
 )
 
@@ -27,7 +34,7 @@ router = APIRouter(
 async def search_messages(
     keyword: str = Query(None, description="검색할 키워드"),
     current_user_id: str = Depends(get_current_user_id),
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_user_read_db)
 ):
     """
     키워드 기반으로 채팅 메시지를 검색합니다.
@@ -42,17 +49,10 @@ async def search_messages(
     if not keyword:
         return []
     
-    # 현재 사용자가 참여한 채팅방 목록 조회
-    chatrooms = db.query(ChatroomDB).all()
-    user_chatrooms = []
-    
-    for chatroom in chatrooms:
-        try:
-            participants = json.loads(chatroom.participants)
-            if current_user_id in participants:
-                user_chatrooms.append(chatroom.id)
-        except:
-            continue
+    # 현재 사용자가 참여한 채팅방 목록 조회 (PostgreSQL: participants GIN 인덱스)
+    user_chatrooms = [
+        room_id for (room_id,) in db.query(ChatroomDB.id).filter(has_participant(db, current_user_id))
+    ]
     
     if not user_chatrooms:
         return []
@@ -75,15 +75,82 @@ async def search_messages(
         ) for msg in messages_db
     ]
     
-    return messages
+    return model_response(messages)
+
+@router.get("/{room_id}/export", summary="채팅 내역 전체 내보내기 (NDJSON)")
+async def export_chat_history(
+    room_id: str,
+    current_user_id: str = Depends(get_current_user_id),
+    db: Session = Depends(get_user_read_db)
+):
+    """
+    채팅방의 전체 메시지 내역을 NDJSON(한 줄에 메시지 하나)으로 스트리밍합니다.
+    
+    - **room_id**: 채팅방 ID
+    - **current_user_id**: 현재 로그인한 사용자 ID
+    
+    오래된 메시지부터 순서대로 내보내며, 아카이브된 메시지도 포함됩니다.
+    
+    Returns:
+        StreamingResponse: application/x-ndjson 스트림
+    """
+    # 채팅방 존재 여부 및 참가자 확인 (스트리밍 시작 전에 오류 응답)
+    chatroom = get_chatroom_or_404(db, room_id)
+    verify_chatroom_participant(chatroom, current_user_id)
+    
+    return StreamingResponse(
+        iter_room_ndjson(room_id, current_user_id),
+        media_type=NDJSON_MEDIA_TYPE,
+        headers={"Content-Disposition": f'attachment; filename="chat-{room_id}.ndjson"'}
+    )
+
+def load_message_page(
+    user_id: str,
+    room_id: str,
+    skip: int,
+    limit: int,
+    before: Optional[datetime]
+) -> Tuple[List[Message], Optional[Tuple[Optional[datetime], int]]]:
+    """
+    DB에서 메시지 한 페이지를 읽습니다. (스레드풀에서 실행)
+    
+    결과를 여러 요청이 공유하므로 요청 세션이 아닌 자체 읽기 세션을 열고 닫습니다.
+    DB 범위를 넘어 아카이브에서 이어 읽어야 하면 (before, skip) 커서를 함께 반환합니다.
+    """
+    with session_router.read_session(user_id) as db:
+        query = db.query(MessageDB)\
+            .filter(MessageDB.chatroom_id == room_id)
+        if before is not None:
+            query = query.filter(MessageDB.timestamp < before)
+        query = query.order_by(MessageDB.timestamp.desc())
+        
+        messages_db = apply_pagination(query, skip, limit).all()
+        
+        # DB 객체 목록을 Pydantic 모델 목록으로 변환
+        messages = [
+            Message(
+                id=msg.id,
+                senderId=msg.sender_id,
+                content=msg.content,
+                timestamp=msg.timestamp
+            ) for msg in messages_db
+        ]
+        
+        archive_cursor = None
+        if len(messages) < limit and has_archive(room_id):
+            if messages_db:
+                archive_cursor = (messages_db[-1].timestamp, 0)
+            else:
+                archive_cursor = (before, max(0, skip - query.order_by(None).count()))
+    return messages, archive_cursor
 
 @router.get("/{room_id}", response_model=List[Message], summary="채팅 내역 조회")
 async def get_chat_history(
     room_id: str,
     skip: int = 0,
     limit: int = 50,
-    current_user_id: str = Depends(get_current_user_id),
-    db: Session = Depends(get_db)
+    before: Optional[datetime] = None,
+    current_user_id: str = Depends(get_current_user_id)
 ):
     """
     특정 채팅방의 메시지 내역을 조회합니다.
@@ -91,35 +158,47 @@ async def get_chat_history(
     - **room_id**: 채팅방 ID
     - **skip**: 건너뛸 메시지 수
     - **limit**: 가져올 메시지 수
+    - **before**: 이 시각 이전의 메시지만 조회 (이전 페이지 커서, 지난 월 파티션은 스캔하지 않음)
     - **current_user_id**: 현재 로그인한 사용자 ID
     
+    DB에 남은 메시지보다 오래된 범위를 요청하면 메시지 아카이브에서 이어서 읽습니다.
+    
     Returns:
         List[Message]: 채팅 메시지 목록
     """
-    # 채팅방 존재 여부 확인
-    chatroom = get_chatroom_or_404(db, room_id)
-    
-    # 참가자 확인
-    verify_chatroom_participant(chatroom, current_user_id)
-    
-    # 메시지 조회
-    query = db.query(MessageDB)\
-        .filter(MessageDB.chatroom_id == room_id)\
-        .order_by(MessageDB.timestamp.desc())
-    
-    messages_db = apply_pagination(query, skip, limit).all()
-    
-    # DB 객체 목록을 Pydantic 모델 목록으로 변환
-    messages = [
-        Message(
-            id=msg.id,
-            senderId=msg.sender_id,
-            content=msg.content,
-            timestamp=msg.timestamp
-        ) for msg in messages_db
-    ]
+    # 저장된 timestamp는 naive UTC이므로 시간대가 있는 커서(예: ...Z, +09:00)는 UTC로 바꿔 비교
+    if before is not None and before.tzinfo is not None:
+        before = before.astimezone(timezone.utc).replace(tzinfo=None)
+    
+    # 채팅방 존재 여부 및 참가자 확인 (공유 로드를 기다리기 전에 세션을 닫아 커넥션을 풀에 반환)
+    with session_router.read_session(current_user_id) as db:
+        chatroom = get_chatroom_or_404(db, room_id)
+        verify_chatroom_participant(chatroom, current_user_id)
+    
+    # 메시지 조회 (같은 채팅방/같은 페이지를 동시에 요청하면 DB 조회 한 번을 공유,
+    # primary 고정 사용자는 복제본 로드에 합류하지 않음)
+    messages, archive_cursor = await message_flight.run_sync(
+        (room_id, skip, limit, before, session_router.is_sticky(current_user_id)),
+        load_message_page, current_user_id, room_id, skip, limit, before
+    )
     
-    return messages
+    # DB 범위를 넘어선 경우 아카이브에서 나머지를 채움 (아카이브는 DB보다 항상 오래된 메시지)
+    if archive_cursor is not None:
+        archive_before, archive_skip = archive_cursor
+        archived = await run_in_threadpool(
+            read_archived_messages, room_id, archive_before, archive_skip, limit - len(messages)
+        )
+        # 공유된 결과 목록은 수정하지 않고 새 목록으로
+        messages = messages + [
+            Message(
+                id=record["id"],
+                senderId=record["sender_id"],
+                content=record["content"],
+                timestamp=record["timestamp"]
+            ) for record in archived
+        ]
+    
+    return model_response(messages)
 
 @router.post("/{room_id}", response_model=Message, status_code=status.HTTP_201_CREATED)
 async def send_message(
@@ -146,17 +225,19 @@ async def send_message(
     
     # 메시지 생성
     db_message = create_message(db, message_request.content, room_id, current_user_id)
+    session_router.mark_write(current_user_id)
+    forget_room_loads(room_id)
     
     # WebSocket 연결된 사용자들에게 메시지 브로드캐스트
     await connection_manager.broadcast_message(db_message, room_id)
     
     # DB 모델을 API 모델로 변환
-    return Message(
+    return model_response(Message(
         id=db_message.id,
         senderId=db_message.sender_id,
         content=db_message.content,
         timestamp=db_message.timestamp
-    )
+    ), status_code=status.HTTP_201_CREATED)
 
 @router.get("/{room_id}/active-users", summary="현재 접속 중인 사용자 목록")
 async def get_active_users(
@@ -220,5 +301,6 @@ async def mark_message_as_read(
     # 메시지 읽음 상태 업데이트
     message.is_read = True
     db.commit()
+    session_router.mark_write(current_user_id)
     
     return {"status": "success"} 
\ No newline at end of file
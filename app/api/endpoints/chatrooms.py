@@ -1,101 +1,85 @@
-from fastapi import APIRouter, Depends, Body, Query, HTTPException, status, WebSocket, WebSocketDisconnect
+from fastapi import APIRouter, Depends, Body, Query, HTTPException, Request, status, WebSocket, WebSocketDisconnect
+from sqlalchemy import func
 from sqlalchemy.orm import Session
 from app.schemas.chatroom import CreateChatroomRequest, Chatroom, ChatroomFilter, Coordinate, UserProfile, Message
 
-from app.core.firebase import get_db, get_current_user_id
+from app.core.firebase import get_db, get_current_user_id, get_optional_user_id
+from app.core.http_cache import CHATROOM_DETAIL_CACHE, CHATROOM_LIST_CACHE, CHATROOM_SEARCH_CACHE, body_etag, make_etag
+from app.core.response_cache import CHATROOM_LISTINGS, CachedResponse, response_cache
+from app.core.responses import UnicodeJSONResponse, model_response
+from app.db import session_router
 from app.models.user_models import UserDB
-from app.models.chatroom import MessageDB, ChatroomDB
-from app.utils.utils import get_chatroom_or_404, apply_pagination, filter_chatrooms, create_message, verify_chatroom_participant, connection_manager
+from app.models.chatroom import MessageDB, ChatroomDB, ChatroomCardDB
+from app.utils.utils import get_chatroom_or_404, apply_pagination, create_message, verify_chatroom_participant, connection_manager, chatroom_flight, forget_room_loads
+from app.utils.membership import add_participant, remove_participant
+from app.utils.room_cards import page_body, refresh_room_card
 from typing import List, Dict, Any, Optional
-import json
 import uuid
 from datetime import datetime
-import ast
 import logging
 
+logger = logging.getLogger(__name__)
+
 router = APIRouter(
     prefix="/chatrooms",
     tags=["채팅방"],
     responses={404: {"description": "Not found"}},
 )
 
-def parse_participants(raw):
-    if not raw or raw == "[]":
-        return []
-    if isinstance(raw, list):
-        return raw
-    if raw.startswith("["):
-        # JSON 문자열
-        return json.loads(raw)
-    if raw.startswith("{") and raw.endswith("}"):
-        # PostgreSQL 배열 문자열
-        return [x.strip() for x in raw[1:-1].split(",") if x.strip()]
-    return []
+def participants_updated_at(db: Session, participant_ids) -> Optional[datetime]:
+    """참여자 프로필 중 가장 최근 수정 시각 (응답에 닉네임/프로필이 포함되므로 ETag에 반영)"""
+    if not participant_ids:
+        return None
+    return db.query(func.max(UserDB.updated_at)).filter(UserDB.firebase_uid.in_(list(participant_ids))).scalar()
 
 # [채팅방] 조건에 맞는 채팅방 목록(검색) 조회
 @router.get("/search", response_model=List[Chatroom])
 async def search_chatrooms(
+    request: Request,
     keyword: Optional[str] = Query(None, description="검색할 채팅방 제목"),
     is_active: Optional[bool] = Query(True, description="활성화된 채팅방만 검색"),
     skip: int = Query(0, description="건너뛸 결과 수"),
-    limit: int = Query(20, description="반환할 최대 결과 수"),
-    db: Session = Depends(get_db)
+    limit: int = Query(20, description="반환할 최대 결과 수")
 ):
     """키워드 기반으로 채팅방을 검색합니다."""
+    # 제목 검색은 대소문자를 구분하지 않으므로 정규화해서 같은 캐시 항목을 사용
+    keyword = keyword.strip().lower() if keyword and keyword.strip() else None
+    cached = await response_cache.get_or_build(
+        CHATROOM_LISTINGS,
+        {"route": "search", "keyword": keyword, "is_active": is_active, "skip": skip, "limit": limit},
+        lambda: build_chatroom_search(keyword, is_active, skip, limit)
+    )
+    not_modified = CHATROOM_SEARCH_CACHE.check(request, cached.etag)
+    if not_modified is not None:
+        return not_modified
+    return CHATROOM_SEARCH_CACHE.apply(UnicodeJSONResponse(content=cached.body), cached.etag)
+
+def build_chatroom_search(
+    keyword: Optional[str],
+    is_active: Optional[bool],
+    skip: int,
+    limit: int
+) -> CachedResponse:
+    """
+    채팅방 검색 응답 생성 (응답 캐시 미스일 때 스레드풀에서 실행, 채팅방 카드 한 번 조회)
+    결과를 여러 요청이 공유하므로 요청 세션이 아닌 자체 읽기 세션을 열고 닫습니다.
+    """
     # ChatroomFilter 사용
     filter_params = ChatroomFilter(
         keyword=keyword,
         is_active=is_active
     )
     
-    query = db.query(ChatroomDB)
-    query = filter_chatrooms(query, filter_params.dict())
-    chatrooms_db = apply_pagination(query, skip, limit).all()
-    
-    # DB 객체 목록을 Pydantic 모델 목록으로 변환
-    result = []
-    for chatroom in chatrooms_db:
-        # 1. participants 원본 값과 타입
-        logging.warning(f"participants raw: {chatroom.participants} ({type(chatroom.participants)})")
-        participant_ids = parse_participants(chatroom.participants)
-        logging.warning(f"participant_ids after parsing: {participant_ids} ({type(participant_ids)})")
-        user_profiles = []
-        for uid in participant_ids:
-            # 3. for문에서 uid 값
-            logging.warning(f"querying user: {uid}")
-            user = db.query(UserDB).filter(UserDB.firebase_uid == uid).first()
-            # 4. 쿼리 결과
-            logging.warning(f"user found: {user}")
-            if user:
-                user_profiles.append(UserProfile(
-                    uid=user.firebase_uid,
-                    nickname=user.name,
-                    bio=user.bio,
-                    profileImageUrl=user.profile_picture,
-                    likes=user.likes or 0
-                ))
-        # 5. user_profiles 최종 값
-        logging.warning(f"user_profiles: {user_profiles}")
-        
-        # 최근 메시지 조회
-        messages = db.query(MessageDB).filter(MessageDB.chatroom_id == chatroom.id).order_by(MessageDB.timestamp.desc()).limit(10).all()
-        message_models = [Message(
-            id=msg.id,
-            senderId=msg.sender_id,
-            content=msg.content,
-            timestamp=msg.timestamp
-        ) for msg in messages]
+    with session_router.read_session() as db:
+        query = db.query(ChatroomCardDB.card)
+        if filter_params.keyword:
+            query = query.filter(ChatroomCardDB.title.ilike(f"%{filter_params.keyword}%"))
+        if filter_params.is_active is not None:
+            query = query.filter(ChatroomCardDB.is_active == filter_params.is_active)
+        query = query.order_by(ChatroomCardDB.created_at, ChatroomCardDB.chatroom_id)
         
-        result.append(Chatroom(
-            id=str(chatroom.id),
-            title=chatroom.title,
-            participants=user_profiles,
-            connection=json.loads(chatroom.connection) if chatroom.connection else [],
-            createdAt=chatroom.created_at,
-            Message=message_models  # API.yaml에 맞춰 "Message"로 변경
-        ))
-    
-    return result
+        body = page_body(card for (card,) in apply_pagination(query, skip, limit))
+    return CachedResponse(body=body, etag=body_etag(body))
 
 # [채팅방] 채팅방 생성
 @router.post("/", response_model=Chatroom, status_code=201)
@@ -119,13 +103,16 @@ async def create_chatroom(
         created_at=datetime.utcnow(),
         updated_at=datetime.utcnow(),
         is_active=True,
-        participants=json.dumps(participants),  # 생성자만 포함
-        connection=json.dumps([coord.dict() for coord in request.connection])  # 좌표 정보를 JSON으로 저장
+        participants=participants,  # 생성자만 포함
+        connection=[coord.dict() for coord in request.connection]  # 좌표 정보 (JSON 컬럼)
     )
     
     db.add(chatroom)
+    refresh_room_card(db, chatroom_id)
     db.commit()
     db.refresh(chatroom)
+    session_router.mark_write(current_user_id)
+    response_cache.invalidate(CHATROOM_LISTINGS)
     
     # 생성자 정보 조회
     user_profiles = []
@@ -149,24 +136,64 @@ async def create_chatroom(
         Message=[]  # 생성 시점에는 메시지가 없음
     )
     
-    return response_chatroom
+    return model_response(response_chatroom, status_code=201)
 
 # [채팅방] 특정 채팅방 상세 정보 조회
 @router.get("/{chatroom_id}", response_model=Chatroom, status_code=200)
 async def get_chatroom(
     chatroom_id: str,
-    db: Session = Depends(get_db)
+    request: Request,
+    current_user_id: Optional[str] = Depends(get_optional_user_id)
 ):
-    """특정 채팅방의 정보를 조회합니다."""
+    """
+    특정 채팅방의 정보를 조회합니다.
+    
+    로그인 없이 조회할 수 있으며, 토큰을 보내면 방금 참여/수정한 내용이 바로 보이도록
+    해당 사용자의 읽기를 primary로 보냅니다 (read-your-writes).
+    """
+    # 같은 채팅방을 동시에 여는 요청은 ETag 계산과 응답 생성을 한 번씩만 수행
+    # (각 로드는 자체 읽기 세션을 사용하므로 기다리는 동안 요청이 커넥션을 붙잡지 않음,
+    #  primary 고정 사용자는 복제본 로드에 합류하지 않음)
+    sticky = session_router.is_sticky(current_user_id)
+    etag = await chatroom_flight.run_sync((chatroom_id, "etag", sticky), load_chatroom_etag, chatroom_id, current_user_id)
+    not_modified = CHATROOM_DETAIL_CACHE.check(request, etag)
+    if not_modified is not None:
+        return not_modified
+    
+    body = await chatroom_flight.run_sync(
+        (chatroom_id, "body", sticky, etag), build_chatroom_detail, chatroom_id, current_user_id
+    )
+    return CHATROOM_DETAIL_CACHE.apply(UnicodeJSONResponse(content=body), etag)
+
+def load_chatroom_etag(chatroom_id: str, user_id: Optional[str] = None) -> str:
+    """채팅방 상세 ETag: 채팅방 수정 시각 + 최신 메시지 id + 참여자 프로필 수정 시각 (스레드풀에서 실행)"""
+    with session_router.read_session(user_id) as db:
+        chatroom = get_chatroom_or_404(db, chatroom_id)
+        latest_message_id = (
+            db.query(MessageDB.id)
+            .filter(MessageDB.chatroom_id == chatroom.id)
+            .order_by(MessageDB.timestamp.desc())
+            .limit(1)
+            .scalar()
+        )
+        return make_etag(
+            chatroom.id,
+            chatroom.updated_at,
+            latest_message_id,
+            participants_updated_at(db, chatroom.get_participants())
+        )
+
+def build_chatroom_detail(chatroom_id: str, user_id: Optional[str] = None) -> bytes:
+    """채팅방 상세 응답 본문 생성 (스레드풀에서 실행, 자체 읽기 세션 사용)"""
+    with session_router.read_session(user_id) as db:
+        return _build_chatroom_detail(db, chatroom_id)
+
+def _build_chatroom_detail(db: Session, chatroom_id: str) -> bytes:
     chatroom = get_chatroom_or_404(db, chatroom_id)
     
     # 참가자 정보 조회
-    participant_ids = chatroom.participants if chatroom.participants else []
-    if isinstance(participant_ids, str):
-        # PostgreSQL 배열 문자열을 파이썬 리스트로 변환
-        participant_ids = ast.literal_eval(participant_ids.replace('{', '[').replace('}', ']'))
     user_profiles = []
-    for uid in participant_ids:
+    for uid in chatroom.get_participants():
         user = db.query(UserDB).filter(UserDB.firebase_uid == uid).first()
         if user:
             user_profiles.append(UserProfile(
@@ -187,81 +214,47 @@ async def get_chatroom(
     ) for msg in messages]
     
     # DB 객체를 Pydantic 모델로 변환
-    return Chatroom(
+    return model_response(Chatroom(
         id=chatroom.id,
         title=chatroom.title,
         participants=user_profiles,
-        connection=json.loads(chatroom.connection) if chatroom.connection else [],
+        connection=chatroom.get_connection(),
         createdAt=chatroom.created_at,
         Message=message_models  # API.yaml에 맞춰 "Message"로 변경
-    )
+    )).body
 
 # [채팅방] 활성화된 채팅방 목록 조회
 @router.get("/", response_model=List[Chatroom])
 async def get_chatrooms(
+    request: Request,
     skip: int = 0,
-    limit: int = 100,
-    db: Session = Depends(get_db)
+    limit: int = 100
 ):
     """활성화된 채팅방 목록을 조회합니다."""
-    query = db.query(ChatroomDB).filter(ChatroomDB.is_active == True)
-    chatrooms_db = apply_pagination(query, skip, limit).all()
-    
-    # DB 객체 목록을 Pydantic 모델 목록으로 변환
-    result = []
-    for chatroom in chatrooms_db:
-        # 1. participants 원본 값과 타입
-        logging.warning(f"participants raw: {chatroom.participants} ({type(chatroom.participants)})")
-        participant_ids = parse_participants(chatroom.participants)
-        logging.warning(f"participant_ids after parsing: {participant_ids} ({type(participant_ids)})")
-        user_profiles = []
-        for uid in participant_ids:
-            # 3. for문에서 uid 값
-            logging.warning(f"querying user: {uid}")
-            user = db.query(UserDB).filter(UserDB.firebase_uid == uid).first()
-            # 4. 쿼리 결과
-            logging.warning(f"user found: {user}")
-            if user:
-                user_profiles.append(UserProfile(
-                    uid=user.firebase_uid,
-                    nickname=user.name,
-                    bio=user.bio,
-                    profileImageUrl=user.profile_picture,
-                    likes=user.likes or 0
-                ))
-        # 5. user_profiles 최종 값
-        logging.warning(f"user_profiles: {user_profiles}")
-        
-        # 최근 메시지 조회
-        messages = db.query(MessageDB).filter(MessageDB.chatroom_id == chatroom.id).order_by(MessageDB.timestamp.desc()).limit(10).all()
-        message_models = [Message(
-            id=msg.id,
-            senderId=msg.sender_id,
-            content=msg.content,
-            timestamp=msg.timestamp
-        ) for msg in messages]
-        
-        # connection 데이터 처리
-        connection_data = []
-        if chatroom.connection:
-            try:
-                if isinstance(chatroom.connection, str):
-                    connection_data = json.loads(chatroom.connection)
-                else:
-                    connection_data = chatroom.connection
-            except:
-                connection_data = []
+    cached = await response_cache.get_or_build(
+        CHATROOM_LISTINGS,
+        {"route": "list", "skip": skip, "limit": limit},
+        lambda: build_chatroom_list(skip, limit)
+    )
+    not_modified = CHATROOM_LIST_CACHE.check(request, cached.etag)
+    if not_modified is not None:
+        return not_modified
+    return CHATROOM_LIST_CACHE.apply(UnicodeJSONResponse(content=cached.body), cached.etag)
+
+def build_chatroom_list(skip: int, limit: int) -> CachedResponse:
+    """
+    활성 채팅방 목록 응답 생성 (응답 캐시 미스일 때 스레드풀에서 실행, 채팅방 카드 한 번 조회)
+    결과를 여러 요청이 공유하므로 요청 세션이 아닌 자체 읽기 세션을 열고 닫습니다.
+    """
+    with session_router.read_session() as db:
+        query = (
+            db.query(ChatroomCardDB.card)
+            .filter(ChatroomCardDB.is_active == True)
+            .order_by(ChatroomCardDB.created_at, ChatroomCardDB.chatroom_id)
+        )
         
-        result.append(Chatroom(
-            id=str(chatroom.id),
-            title=chatroom.title,
-            participants=user_profiles,
-            connection=connection_data,
-            createdAt=chatroom.created_at,
-            Message=message_models
-        ))
-    
-    return result
+        body = page_body(card for (card,) in apply_pagination(query, skip, limit))
+    return CachedResponse(body=body, etag=body_etag(body))
 
 # [채팅방] 채팅방 참여
 @router.post("/{room_id}/join", response_model=Chatroom, status_code=200)
@@ -274,26 +267,17 @@ async def join_chatroom(
     # 채팅방 존재 여부 확인
     chatroom = get_chatroom_or_404(db, room_id)
     
-    # 현재 참여자 목록 가져오기
-    current_participants = chatroom.participants if chatroom.participants else []
-    
-    # 이미 참여 중인지 확인
-    if current_user_id in current_participants:
-        # 이미 참여 중이어도 에러가 아니라 현재 채팅방 정보를 반환
-        pass
-    else:
-        # 새로운 참여자 추가
-        current_participants.append(current_user_id)
-        
-        # DB 업데이트
-        chatroom.participants = json.dumps(current_participants)
-        chatroom.updated_at = datetime.utcnow()
+    # 참여자 추가 (UPDATE 한 번으로 처리, 이미 참여 중이어도 에러가 아니라 현재 채팅방 정보를 반환)
+    if add_participant(db, chatroom, current_user_id):
+        refresh_room_card(db, room_id)
         db.commit()
-        db.refresh(chatroom)
+        session_router.mark_write(current_user_id)
+        response_cache.invalidate(CHATROOM_LISTINGS)
+        forget_room_loads(room_id)
     
     # 참여자 정보 조회
     user_profiles = []
-    for uid in current_participants:
+    for uid in chatroom.get_participants():
         user = db.query(UserDB).filter(UserDB.firebase_uid == uid).first()
         if user:
             user_profiles.append(UserProfile(
@@ -314,14 +298,14 @@ async def join_chatroom(
     ) for msg in messages]
     
     # 채팅방 정보 반환
-    return Chatroom(
+    return model_response(Chatroom(
         id=chatroom.id,
         title=chatroom.title,
         participants=user_profiles,
-        connection=json.loads(chatroom.connection) if chatroom.connection else [],
+        connection=chatroom.get_connection(),
         createdAt=chatroom.created_at,
         Message=message_models
-    )
+    ))
 
 # [채팅방] 채팅방 나가기
 @router.post("/{room_id}/leave", status_code=200)
@@ -334,25 +318,15 @@ async def leave_chatroom(
     # 채팅방 존재 여부 확인
     chatroom = get_chatroom_or_404(db, room_id)
     
-    # 현재 참여자 목록 가져오기
-    current_participants = chatroom.participants if chatroom.participants else []
-    
-    # 참여 중인지 확인
-    if current_user_id not in current_participants:
+    # 참여자 목록에서 제거 (UPDATE 한 번으로 처리, 참여자가 모두 나가면 채팅방 비활성화)
+    if not remove_participant(db, chatroom, current_user_id):
         raise HTTPException(status_code=400, detail="You are not a participant in this chatroom")
     
-    # 참여자 목록에서 제거
-    current_participants.remove(current_user_id)
-    
-    # DB 업데이트
-    chatroom.participants = json.dumps(current_participants)
-    chatroom.updated_at = datetime.utcnow()
-    
-    # 참여자가 모두 나가면 채팅방 비활성화
-    if not current_participants:
-        chatroom.is_active = False
-    
+    refresh_room_card(db, room_id)
     db.commit()
+    session_router.mark_write(current_user_id)
+    response_cache.invalidate(CHATROOM_LISTINGS)
+    forget_room_loads(room_id)
     
     return {"message": "Successfully left the chatroom"}
 
@@ -372,6 +346,10 @@ async def delete_chatroom(
     
     # 채팅방 삭제
     db.delete(chatroom)
+    refresh_room_card(db, room_id)
     db.commit()
+    session_router.mark_write(current_user_id)
+    response_cache.invalidate(CHATROOM_LISTINGS)
+    forget_room_loads(room_id)
     
     return None 
\ No newline at end of file
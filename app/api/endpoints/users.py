@@ -1,22 +1,15 @@
-from fastapi import APIRouter, Depends, Body, HTTPException, status
-from fastapi.responses import JSONResponse
+from fastapi import APIRouter, Depends, Body, HTTPException, Request, status
 from sqlalchemy.orm import Session
-from app.core.firebase import get_db, get_current_user_id
+from app.core.http_cache import PROFILE_CACHE, make_etag
+from app.core.response_cache import CHATROOM_LISTINGS, response_cache
+from app.core.responses import UnicodeJSONResponse
+from app.core.firebase import get_db, get_read_db, get_current_user_id
+from app.db import session_router
 from app.models.user_models import UserDB
 from app.schemas.user import UserProfile
-from typing import Optional, List
-import json
-
-# 한국어 지원을 위한 커스텀 JSON Response
-class UnicodeJSONResponse(JSONResponse):
-    def render(self, content) -> bytes:
-        return json.dumps(
-            content,
-            ensure_ascii=False,  # 한국어 유니코드 문자 그대로 출력
-            allow_nan=False,
-            indent=None,
-            separators=(",", ":"),
-        ).encode("utf-8")
+from app.utils.utils import profile_flight
+from app.utils.room_cards import refresh_user_cards
+from typing import Any, Dict, Optional, List, Tuple
 
 router = APIRouter(
     prefix="/users",
@@ -24,48 +17,59 @@ router = APIRouter(
     responses={404: {"description": "Not found"}},
 )
 
+def load_profile(user_id: str, uid: str) -> Tuple[Dict[str, Any], str]:
+    """
+    프로필 응답 데이터와 ETag를 조회합니다. (스레드풀에서 실행, 결과는 동시 요청이 공유)
+    요청 세션이 아닌 자체 읽기 세션을 열고 닫습니다.
+    """
+    with session_router.read_session(user_id) as db:
+        user = db.query(UserDB).filter(UserDB.firebase_uid == uid).first()
+        if not user:
+            raise HTTPException(status_code=404, detail="User not found")
+        
+        profile_data = {
+            "uid": user.firebase_uid,
+            "nickname": user.name,
+            "bio": user.bio,
+            "profileImageUrl": user.profile_picture,
+            "likes": user.likes or 0
+        }
+        return profile_data, make_etag(user.firebase_uid, user.updated_at)
+
 # [프로필] 현재 사용자의 프로필 정보 조회
 @router.get("/me", summary="내 프로필 조회")
 async def get_my_profile(
-    current_user_id: str = Depends(get_current_user_id),
-    db: Session = Depends(get_db)
+    request: Request,
+    current_user_id: str = Depends(get_current_user_id)
 ):
     """현재 로그인한 사용자의 프로필을 조회합니다."""
-    user = db.query(UserDB).filter(UserDB.firebase_uid == current_user_id).first()
-    if not user:
-        raise HTTPException(status_code=404, detail="User not found")
-    
-    profile_data = {
-        "uid": user.firebase_uid,
-        "nickname": user.name,
-        "bio": user.bio,
-        "profileImageUrl": user.profile_picture,
-        "likes": user.likes or 0
-    }
+    # 같은 프로필을 동시에 조회하면 DB 조회 한 번을 공유 (primary 고정 사용자는 따로 조회)
+    profile_data, etag = await profile_flight.run_sync(
+        (current_user_id, session_router.is_sticky(current_user_id)), load_profile, current_user_id, current_user_id
+    )
+    not_modified = PROFILE_CACHE.check(request, etag)
+    if not_modified is not None:
+        return not_modified
     
-    return UnicodeJSONResponse(content=profile_data)
+    return PROFILE_CACHE.apply(UnicodeJSONResponse(content=profile_data), etag)
 
 # [프로필] 특정 사용자의 프로필 정보 조회
 @router.get("/profile/{uid}", summary="사용자 프로필 조회")
 async def get_user_profile(
     uid: str,
-    current_user_id: str = Depends(get_current_user_id),
-    db: Session = Depends(get_db)
+    request: Request,
+    current_user_id: str = Depends(get_current_user_id)
 ):
     """특정 사용자의 프로필을 조회합니다."""
-    user = db.query(UserDB).filter(UserDB.firebase_uid == uid).first()
-    if not user:
-        raise HTTPException(status_code=404, detail="User not found")
+    # 같은 프로필을 동시에 조회하면 DB 조회 한 번을 공유 (primary 고정 사용자는 따로 조회)
+    profile_data, etag = await profile_flight.run_sync(
+        (uid, session_router.is_sticky(current_user_id)), load_profile, current_user_id, uid
+    )
+    not_modified = PROFILE_CACHE.check(request, etag)
+    if not_modified is not None:
+        return not_modified
     
-    profile_data = {
-        "uid": user.firebase_uid,
-        "nickname": user.name,
-        "bio": user.bio,
-        "profileImageUrl": user.profile_picture,
-        "likes": user.likes or 0
-    }
-    
-    return UnicodeJSONResponse(content=profile_data)
+    return PROFILE_CACHE.apply(UnicodeJSONResponse(content=profile_data), etag)
 
 # [프로필] 프로필 정보 수정
 @router.patch("/profile", summary="프로필 수정")
@@ -91,8 +95,14 @@ async def update_user_profile(
         user.profile_picture = update_data["profileImageUrl"]
         updated_fields.append("profileImageUrl")
 
+    # 참여 중인 채팅방 카드의 프로필도 같은 트랜잭션에서 갱신
+    refresh_user_cards(db, current_user_id)
     db.commit()
     db.refresh(user)
+    session_router.mark_write(current_user_id)
+    profile_flight.forget(current_user_id)
+    # 채팅방 목록/검색 응답에 참여자 프로필이 포함됨
+    response_cache.invalidate(CHATROOM_LISTINGS)
 
     response_data = {
         "uid": user.firebase_uid,
@@ -111,7 +121,7 @@ async def update_user_profile(
 async def get_users(
     skip: int = 0,
     limit: int = 100,
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_read_db)
 ):
     """사용자 목록을 조회합니다."""
     users = db.query(UserDB).offset(skip).limit(limit).all()
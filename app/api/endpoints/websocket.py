@@ -1,13 +1,19 @@
 from fastapi import APIRouter, WebSocket, WebSocketDisconnect, HTTPException
+from fastapi.concurrency import run_in_threadpool
 from fastapi.responses import JSONResponse
 from sqlalchemy.orm import Session
-from app.core.firebase import get_current_user_id, get_db
+from app.core.admission import admission_controller, get_client_ip, WS_CLOSE_TRY_AGAIN_LATER
+from app.core.config import settings
+from app.core.firebase import get_current_user_id, verify_id_token
+from app.db import SessionLocal, pool_monitor, session_router
 from app.utils.utils import (
     get_chatroom_or_404, 
     verify_chatroom_participant, 
     create_message, 
+    forget_room_loads,
     connection_manager
 )
+from app.utils.ws_codec import WS_ENCODING_JSON, encode_ws_payload, send_ws_frame
 from app.schemas.websocket import (
     WebSocketIncomingMessage,
     AuthMessage,
@@ -19,6 +25,7 @@ from app.schemas.websocket import (
     PongMessage,
     ActiveUsersResponse
 )
+import asyncio
 import logging
 import json
 from datetime import datetime
@@ -39,13 +46,53 @@ router = APIRouter(
     }
 )
 
-async def send_websocket_message(websocket: WebSocket, message_obj):
-    """WebSocket으로 구조화된 메시지 전송"""
+async def send_websocket_message(websocket: WebSocket, message_obj, encoding: str = WS_ENCODING_JSON):
+    """WebSocket으로 구조화된 메시지 전송 (인증 시 선택한 인코딩 사용)"""
     try:
-        await websocket.send_text(message_obj.model_dump_json())
+        await send_ws_frame(websocket, encode_ws_payload(message_obj, encoding))
     except Exception as e:
         logger.error(f"Failed to send WebSocket message: {e}")
 
+async def reject_websocket(websocket: WebSocket, retry_after: float):
+    """입장 제어에 걸린 연결을 retry_after와 함께 1013 코드로 종료합니다."""
+    try:
+        await websocket.accept()
+        error_msg = ErrorMessage(
+            code=WS_CLOSE_TRY_AGAIN_LATER,
+            message="Server is busy. Please reconnect after retry_after seconds.",
+            retry_after=retry_after,
+            timestamp=datetime.utcnow()
+        )
+        await send_websocket_message(websocket, error_msg)
+        await websocket.close(code=WS_CLOSE_TRY_AGAIN_LATER, reason=f"retry-after={retry_after}")
+    except Exception:
+        pass
+
+def authenticate_websocket_user(token: str, room_id: str) -> str:
+    """
+    토큰을 검증하고 채팅방 참여 권한을 확인합니다.
+    
+    스레드풀에서 실행되며, DB 세션은 권한 확인 동안에만 사용하고 바로 반환합니다.
+    """
+    decoded_token = verify_id_token(token)
+    user_id = decoded_token["uid"]
+    
+    with SessionLocal() as db:
+        # 채팅방 존재 여부 확인
+        chatroom = get_chatroom_or_404(db, room_id)
+        
+        # 참여자 확인
+        verify_chatroom_participant(chatroom, user_id)
+    
+    return user_id
+
+def save_text_message(content: str, room_id: str, user_id: str):
+    """텍스트 메시지를 저장합니다. (스레드풀에서 실행, 저장하는 동안만 DB 세션 사용)"""
+    with SessionLocal() as db:
+        db_message = create_message(db, content, room_id, user_id)
+    session_router.mark_write(user_id)
+    return db_message
+
 @router.get("/chat/{room_id}", summary="채팅방 WebSocket 연결")
 async def get_websocket_info(room_id: str):
     """
@@ -61,6 +108,11 @@ async def get_websocket_info(room_id: str):
     2. 첫 번째 메시지로 JWT 토큰 전송: `{"type": "auth", "token": "YOUR_JWT_TOKEN"}`
     3. 인증 성공 후 실시간 채팅 가능
     
+    **인코딩 선택:**
+    - 인증 메시지에 `"encoding": "msgpack"`을 지정하면 이후 서버 메시지가 MessagePack 바이너리 프레임으로 전송됩니다
+    - 기본값은 `"json"` (텍스트 프레임)
+    - 클라이언트가 제안하면 permessage-deflate 압축이 협상됩니다
+    
     **지원되는 메시지 타입:**
     - `auth`: 인증 (필수 - 첫 번째 메시지)
     - `ping`: 연결 상태 확인
@@ -94,8 +146,10 @@ async def get_websocket_info(room_id: str):
             "message_response", "system", "user_status", 
             "error", "success", "pong", "active_users_response"
         ],
+        "supported_encodings": ["json", "msgpack"],
+        "compression": "permessage-deflate",
         "example_messages": {
-            "auth": {"type": "auth", "token": "YOUR_JWT_TOKEN"},
+            "auth": {"type": "auth", "token": "YOUR_JWT_TOKEN", "encoding": "json"},
             "ping": {"type": "ping"},
             "get_users": {"type": "get_active_users"}
         },
@@ -118,6 +172,12 @@ async def websocket_chat_endpoint(websocket: WebSocket, room_id: str):
     {"type": "auth", "token": "YOUR_JWT_TOKEN"}
     ```
     
+    **인코딩:**
+    인증 메시지의 `encoding` 필드로 서버 → 클라이언트 메시지 포맷을 선택합니다.
+    - `json` (기본값): 텍스트 프레임
+    - `msgpack`: MessagePack 바이너리 프레임 (timestamp는 Timestamp 확장 타입)
+    클라이언트 → 서버 메시지는 인코딩과 관계없이 JSON 텍스트입니다.
+    
     **지원되는 메시지 타입:**
     - `auth`: 인증 (필수 - 첫 번째 메시지)
     - `ping`: 연결 상태 확인 
@@ -141,6 +201,11 @@ async def websocket_chat_endpoint(websocket: WebSocket, room_id: str):
     {"type": "get_active_users"}
     ```
     
+    **입장 제어:**
+    동시 핸드셰이크 수 또는 IP별 재연결 속도가 한도를 넘으면
+    `error` 메시지(`retry_after` 포함)를 보낸 뒤 1013(Try Again Later)으로 종료합니다.
+    인증 메시지는 연결 후 제한 시간 안에 보내야 합니다.
+    
     **연결 종료:**
     클라이언트가 연결을 종료하면 자동으로 채팅방에서 제거되며,
     다른 참여자들에게 퇴장 알림이 전송됩니다.
@@ -154,9 +219,17 @@ async def websocket_chat_endpoint(websocket: WebSocket, room_id: str):
         - 모든 메시지는 JSON 형식이어야 함
         - 비정상적인 연결 종료 시 자동 정리됨
     """
-    db = next(get_db())
     user_id = None
     authenticated = False
+    encoding = WS_ENCODING_JSON
+    
+    # 입장 제어: IP별 속도 제한 + 전역 동시 핸드셰이크 수 제한
+    retry_after = admission_controller.admit(get_client_ip(websocket))
+    if retry_after is not None:
+        logger.warning(f"WebSocket handshake rejected for room {room_id}, retry after {retry_after}s")
+        await reject_websocket(websocket, retry_after)
+        return
+    handshake_slot_held = True
     
     try:
         # WebSocket 연결 수락
@@ -173,7 +246,24 @@ async def websocket_chat_endpoint(websocket: WebSocket, room_id: str):
         while True:
             try:
                 # 메시지 수신
-                data = await websocket.receive_text()
+                if authenticated:
+                    data = await websocket.receive_text()
+                else:
+                    # 인증 전에는 대기 시간을 제한하여 핸드셰이크 슬롯 장기 점유를 방지
+                    try:
+                        data = await asyncio.wait_for(
+                            websocket.receive_text(),
+                            timeout=settings.WS_AUTH_TIMEOUT_SECONDS
+                        )
+                    except asyncio.TimeoutError:
+                        error_msg = ErrorMessage(
+                            code=1008,
+                            message="Authentication timeout",
+                            timestamp=datetime.utcnow()
+                        )
+                        await send_websocket_message(websocket, error_msg, encoding)
+                        await websocket.close(code=1008)
+                        return
                 
                 try:
                     # JSON 메시지 파싱
@@ -188,30 +278,27 @@ async def websocket_chat_endpoint(websocket: WebSocket, room_id: str):
                                 message="Authentication required. Send auth message first.",
                                 timestamp=datetime.utcnow()
                             )
-                            await send_websocket_message(websocket, error_msg)
+                            await send_websocket_message(websocket, error_msg, encoding)
                             continue
                         
                         # 인증 처리
                         try:
                             auth_data = AuthMessage.model_validate(message_dict)
                             
-                            # 토큰 검증
-                            from app.core.firebase import auth
-                            decoded_token = auth.verify_id_token(auth_data.token)
-                            user_id = decoded_token["uid"]
-                            logger.info(f"WebSocket authentication successful for user: {user_id}")
-                            
-                            # 채팅방 존재 여부 확인
-                            chatroom = get_chatroom_or_404(db, room_id)
-                            
-                            # 참여자 확인
-                            verify_chatroom_participant(chatroom, user_id)
+                            # 토큰 검증 및 채팅방 권한 확인 (이벤트 루프를 막지 않도록 스레드풀에서 실행)
+                            user_id = await run_in_threadpool(
+                                authenticate_websocket_user, auth_data.token, room_id
+                            )
+                            logger.debug(f"WebSocket authentication successful for user: {user_id}")
                             
-                            # 인증 성공
+                            # 인증 성공 - 핸드셰이크 슬롯 반환
                             authenticated = True
+                            encoding = auth_data.encoding
+                            admission_controller.release()
+                            handshake_slot_held = False
                             
                             # WebSocket 연결 등록
-                            await connection_manager.connect(websocket, room_id, user_id)
+                            await connection_manager.connect(websocket, room_id, user_id, encoding)
                             logger.info(f"User {user_id} connected to chatroom {room_id}")
                             
                             # 인증 성공 메시지
@@ -219,7 +306,7 @@ async def websocket_chat_endpoint(websocket: WebSocket, room_id: str):
                                 message=f"Authentication successful. Welcome to chatroom {room_id}!",
                                 timestamp=datetime.utcnow()
                             )
-                            await send_websocket_message(websocket, auth_success)
+                            await send_websocket_message(websocket, auth_success, encoding)
                             
                         except HTTPException as e:
                             error_msg = ErrorMessage(
@@ -227,7 +314,7 @@ async def websocket_chat_endpoint(websocket: WebSocket, room_id: str):
                                 message=f"Authentication failed: {e.detail}",
                                 timestamp=datetime.utcnow()
                             )
-                            await send_websocket_message(websocket, error_msg)
+                            await send_websocket_message(websocket, error_msg, encoding)
                             await websocket.close(code=1008)
                             return
                             
@@ -239,7 +326,7 @@ async def websocket_chat_endpoint(websocket: WebSocket, room_id: str):
                                 details=str(e),
                                 timestamp=datetime.utcnow()
                             )
-                            await send_websocket_message(websocket, error_msg)
+                            await send_websocket_message(websocket, error_msg, encoding)
                             await websocket.close(code=1008)
                             return
                         
@@ -254,12 +341,12 @@ async def websocket_chat_endpoint(websocket: WebSocket, room_id: str):
                             details="WebSocket is for real-time notifications only. Send messages via REST API for better reliability.",
                             timestamp=datetime.utcnow()
                         )
-                        await send_websocket_message(websocket, error_msg)
+                        await send_websocket_message(websocket, error_msg, encoding)
                         
                     elif message_type == "ping":
                         # Ping 응답
                         pong_msg = PongMessage(timestamp=datetime.utcnow())
-                        await send_websocket_message(websocket, pong_msg)
+                        await send_websocket_message(websocket, pong_msg, encoding)
                         
                     elif message_type == "get_active_users":
                         # 활성 사용자 목록 요청
@@ -268,7 +355,7 @@ async def websocket_chat_endpoint(websocket: WebSocket, room_id: str):
                             users=active_users,
                             timestamp=datetime.utcnow()
                         )
-                        await send_websocket_message(websocket, users_response)
+                        await send_websocket_message(websocket, users_response, encoding)
                         
                     else:
                         # 지원하지 않는 메시지 타입
@@ -277,7 +364,7 @@ async def websocket_chat_endpoint(websocket: WebSocket, room_id: str):
                             message=f"Unsupported message type: {message_type}",
                             timestamp=datetime.utcnow()
                         )
-                        await send_websocket_message(websocket, error_msg)
+                        await send_websocket_message(websocket, error_msg, encoding)
                         
                 except ValidationError as e:
                     # 스키마 검증 실패
@@ -287,15 +374,16 @@ async def websocket_chat_endpoint(websocket: WebSocket, room_id: str):
                         details=str(e),
                         timestamp=datetime.utcnow()
                     )
-                    await send_websocket_message(websocket, error_msg)
+                    await send_websocket_message(websocket, error_msg, encoding)
                     
                 except json.JSONDecodeError:
                     # JSON 파싱 실패
                     if authenticated:
                         # 인증된 사용자는 일반 텍스트도 허용
                         if data.strip():
-                            db_message = create_message(db, data, room_id, user_id)
-                            logger.info(f"Text message saved: {db_message.id} from {user_id}")
+                            db_message = await run_in_threadpool(save_text_message, data, room_id, user_id)
+                            forget_room_loads(room_id)
+                            logger.debug(f"Text message saved: {db_message.id} from {user_id}")
                             
                             response_msg = ChatMessageResponse(
                                 id=str(db_message.id),
@@ -310,7 +398,7 @@ async def websocket_chat_endpoint(websocket: WebSocket, room_id: str):
                             message="Authentication required. Send JSON auth message first.",
                             timestamp=datetime.utcnow()
                         )
-                        await send_websocket_message(websocket, error_msg)
+                        await send_websocket_message(websocket, error_msg, encoding)
                         
             except WebSocketDisconnect:
                 # 연결 종료 처리
@@ -341,16 +429,14 @@ async def websocket_chat_endpoint(websocket: WebSocket, room_id: str):
                 details=str(e),
                 timestamp=datetime.utcnow()
             )
-            await send_websocket_message(websocket, error_msg)
+            await send_websocket_message(websocket, error_msg, encoding)
             await websocket.close(code=1011)
         except:
             pass
     finally:
-        # DB 세션 정리
-        try:
-            db.close()
-        except:
-            pass 
+        # 인증 전에 종료된 경우 핸드셰이크 슬롯 반환
+        if handshake_slot_held:
+            admission_controller.release()
 
 @router.get("/status/{room_id}", summary="WebSocket 연결 상태 확인 (관리자용)")
 async def get_websocket_status(room_id: str):
@@ -395,8 +481,8 @@ async def get_all_websocket_status():
     all_connections = {}
     total_connections = 0
     
-    for room_id, users in connection_manager.active_connections.items():
-        user_list = list(users.keys())
+    # 샤드별 스냅샷을 순회하므로 connect/disconnect와 동시에 실행되어도 안전
+    for room_id, user_list in connection_manager.snapshot().items():
         all_connections[room_id] = {
             "websocket_connections": len(user_list),
             "connected_users": user_list
@@ -407,6 +493,9 @@ async def get_all_websocket_status():
         "total_websocket_connections": total_connections,
         "active_rooms": len(all_connections),
         "rooms": all_connections,
+        "shards": connection_manager.shard_stats(),
+        "admission": admission_controller.stats(),
+        "db_pool": pool_monitor.stats(),
         "timestamp": datetime.utcnow(),
         "note": "이 엔드포인트는 시스템 관리용입니다."
     } 
\ No newline at end of file
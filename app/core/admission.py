@@ -0,0 +1,188 @@
+# app/core/admission.py
+from fastapi import WebSocket
+from app.core.config import settings
+from app.core.metrics import registry
+from typing import Dict, List, Optional, Union
+import ipaddress
+import logging
+import random
+import time
+
+logger = logging.getLogger(__name__)
+
+# RFC 6455 "Try Again Later" - 클라이언트는 retry_after 이후 재연결해야 함
+WS_CLOSE_TRY_AGAIN_LATER = 1013
+
+
+class TokenBucket:
+    """IP별 핸드셰이크 속도 제한용 토큰 버킷"""
+
+    __slots__ = ("tokens", "updated")
+
+    def __init__(self, burst: float, now: float):
+        self.tokens = burst
+        self.updated = now
+
+    def refill(self, rate: float, burst: float, now: float):
+        self.tokens = min(burst, self.tokens + (now - self.updated) * rate)
+        self.updated = now
+
+
+class AdmissionController:
+    """
+    WebSocket 연결 폭주(배포 직후 재연결 등)에 대한 입장 제어기.
+
+    - 전역 동시 핸드셰이크(accept ~ 인증 완료) 수 제한
+    - IP별 토큰 버킷으로 재연결 속도 제한
+    - 거절 시 지터가 포함된 retry_after를 돌려주어 재연결을 분산
+    """
+
+    def __init__(
+        self,
+        max_concurrent_handshakes: int,
+        rate_per_ip: float,
+        burst_per_ip: float,
+        retry_after: float,
+        max_tracked_ips: int = 100_000
+    ):
+        self.max_concurrent_handshakes = max_concurrent_handshakes
+        self.rate_per_ip = rate_per_ip
+        self.burst_per_ip = burst_per_ip
+        self.retry_after = retry_after
+        self.max_tracked_ips = max_tracked_ips
+
+        self.in_flight = 0
+        self.buckets: Dict[str, TokenBucket] = {}
+
+        # 통계
+        self.admitted = 0
+        self.rejected_rate_limited = 0
+        self.rejected_busy = 0
+
+    def _jittered(self, base: float) -> float:
+        return round(base * random.uniform(1.0, 2.0), 1)
+
+    def _prune_buckets(self, now: float):
+        """가득 찬(유휴) 버킷을 제거하여 추적 IP 수를 제한합니다."""
+        idle = [
+            ip for ip, bucket in self.buckets.items()
+            if bucket.tokens + (now - bucket.updated) * self.rate_per_ip >= self.burst_per_ip
+        ]
+        for ip in idle:
+            del self.buckets[ip]
+
+    def admit(self, client_ip: str) -> Optional[float]:
+        """
+        핸드셰이크 입장을 시도합니다.
+
+        Returns:
+            None이면 입장 허용 (반드시 release() 호출 필요),
+            숫자면 거절이며 재시도까지 기다려야 할 초
+        """
+        now = time.monotonic()
+
+        bucket = self.buckets.get(client_ip)
+        if bucket is None:
+            if len(self.buckets) >= self.max_tracked_ips:
+                self._prune_buckets(now)
+            bucket = self.buckets[client_ip] = TokenBucket(self.burst_per_ip, now)
+        else:
+            bucket.refill(self.rate_per_ip, self.burst_per_ip, now)
+
+        if bucket.tokens < 1:
+            self.rejected_rate_limited += 1
+            wait = (1 - bucket.tokens) / self.rate_per_ip if self.rate_per_ip > 0 else self.retry_after
+            return self._jittered(max(wait, 1.0))
+
+        if self.in_flight >= self.max_concurrent_handshakes:
+            self.rejected_busy += 1
+            return self._jittered(self.retry_after)
+
+        bucket.tokens -= 1
+        self.in_flight += 1
+        self.admitted += 1
+        return None
+
+    def release(self):
+        """핸드셰이크 슬롯을 반환합니다. (인증 완료 또는 연결 종료 시)"""
+        if self.in_flight > 0:
+            self.in_flight -= 1
+
+    def stats(self) -> Dict[str, float]:
+        return {
+            "in_flight_handshakes": self.in_flight,
+            "max_concurrent_handshakes": self.max_concurrent_handshakes,
+            "tracked_ips": len(self.buckets),
+            "admitted": self.admitted,
+            "rejected_rate_limited": self.rejected_rate_limited,
+            "rejected_busy": self.rejected_busy
+        }
+
+
+def parse_trusted_proxies(value: str) -> List[Union[ipaddress.IPv4Network, ipaddress.IPv6Network]]:
+    """쉼표로 구분한 IP/CIDR 목록을 네트워크 목록으로 변환합니다. (잘못된 항목은 경고 후 무시)"""
+    networks = []
+    for item in value.split(","):
+        item = item.strip()
+        if not item:
+            continue
+        try:
+            networks.append(ipaddress.ip_network(item, strict=False))
+        except ValueError:
+            logger.warning(f"WS_TRUSTED_PROXIES 항목을 해석할 수 없습니다: {item}")
+    return networks
+
+
+def is_trusted_proxy(host: Optional[str], networks=None) -> bool:
+    if not host:
+        return False
+    try:
+        address = ipaddress.ip_address(host)
+    except ValueError:
+        return False
+    return any(address in network for network in (TRUSTED_PROXIES if networks is None else networks))
+
+
+def get_client_ip(websocket: WebSocket) -> str:
+    """
+    클라이언트 IP를 반환합니다.
+
+    X-Real-IP / X-Forwarded-For는 직접 연결한 상대(scope["client"])가 신뢰하는 프록시
+    (WS_TRUSTED_PROXIES)일 때만 사용합니다. 그렇지 않으면 누구나 헤더를 바꿔 IP별 제한을
+    피할 수 있으므로 소켓 주소를 그대로 씁니다.
+    """
+    peer = websocket.client.host if websocket.client else None
+    if not is_trusted_proxy(peer):
+        return peer or "unknown"
+
+    real_ip = websocket.headers.get("x-real-ip")
+    if real_ip:
+        return real_ip.strip()
+    forwarded_for = websocket.headers.get("x-forwarded-for")
+    if forwarded_for:
+        # 오른쪽(가장 가까운 홉)부터 신뢰하는 프록시를 건너뛴 첫 주소가 실제 클라이언트
+        hops = [hop.strip() for hop in forwarded_for.split(",") if hop.strip()]
+        for hop in reversed(hops):
+            if not is_trusted_proxy(hop):
+                return hop
+        if hops:
+            return hops[0]
+    return peer
+
+
+# 프록시 헤더를 신뢰할 주소 목록
+TRUSTED_PROXIES = parse_trusted_proxies(settings.WS_TRUSTED_PROXIES)
+
+
+# 글로벌 AdmissionController 인스턴스 생성
+admission_controller = AdmissionController(
+    max_concurrent_handshakes=settings.WS_MAX_CONCURRENT_HANDSHAKES,
+    rate_per_ip=settings.WS_HANDSHAKE_RATE_PER_IP,
+    burst_per_ip=settings.WS_HANDSHAKE_BURST_PER_IP,
+    retry_after=settings.WS_RETRY_AFTER_SECONDS
+)
+
+registry.callback_gauge(
+    "ws_handshakes_in_flight", "WebSocket handshakes between accept and authentication", (),
+    lambda: [((), admission_controller.in_flight)]
+)
@@ -0,0 +1,290 @@
+# app/core/auth_providers.py
+"""
+인증 공급자 (Settings.AUTH_PROVIDER로 선택)
+
+- firebase: Firebase Admin SDK로 ID Token 검증 (운영 기본값)
+- local:    로컬에서 생성한 키로 서명한 JWT(HS256/RS256) 검증.
+            Google 서버와 자격 증명 없이 통합 테스트/부하 테스트를 돌리기 위한 용도입니다.
+
+verify()는 Firebase와 같이 "uid" 키를 포함한 클레임 dict를 반환하고, 실패하면 예외를 던집니다.
+get_user()는 사용자 동기화(/auth/sync)에 쓰는 프로필 정보(AuthUserInfo)를 반환합니다.
+
+로컬 토큰 발급:
+    AUTH_PROVIDER=local python -m app.core.auth_providers mint <uid> [--ttl 3600]
+    AUTH_PROVIDER=local python -m app.core.auth_providers keygen
+"""
+from abc import ABC, abstractmethod
+from functools import lru_cache
+from typing import Any, Dict, NamedTuple, Optional
+import argparse
+import logging
+import os
+import secrets
+import tempfile
+import time
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+AUTH_PROVIDERS = ("firebase", "local")
+LOCAL_ALGORITHMS = ("HS256", "RS256")
+
+
+class AuthUserInfo(NamedTuple):
+    """인증 공급자가 알고 있는 사용자 프로필"""
+    email: Optional[str] = None
+    display_name: Optional[str] = None
+    photo_url: Optional[str] = None
+    phone_number: Optional[str] = None
+
+
+class AuthProvider(ABC):
+    """인증 공급자 인터페이스 (verify/issue_token을 구현하지 않으면 인스턴스를 만들 수 없음)"""
+
+    name = "base"
+
+    def initialize(self):
+        """앱 시작 시 한 번 호출됩니다."""
+
+    @abstractmethod
+    def verify(self, token: str) -> Dict[str, Any]:
+        """토큰을 검증하고 "uid"를 포함한 클레임을 반환합니다. 실패하면 예외를 던집니다."""
+
+    def get_user(self, uid: str, claims: Dict[str, Any]) -> AuthUserInfo:
+        """
+        uid의 프로필 정보를 반환합니다. claims는 verify() 결과입니다.
+        기본 구현은 토큰 클레임(Firebase ID Token과 같은 이름)에서 읽습니다.
+        """
+        return AuthUserInfo(
+            email=claims.get("email"),
+            display_name=claims.get("name"),
+            photo_url=claims.get("picture"),
+            phone_number=claims.get("phone_number")
+        )
+
+    @abstractmethod
+    def issue_token(self, uid: str) -> str:
+        """uid로 로그인할 수 있는 토큰을 발급합니다."""
+
+
+class FirebaseAuthProvider(AuthProvider):
+    name = "firebase"
+
+    def __init__(self, credentials_path: str):
+        self.credentials_path = credentials_path
+
+    def initialize(self):
+        import firebase_admin
+        from firebase_admin import credentials
+
+        try:
+            # 이미 초기화되어 있는지 확인
+            firebase_admin.get_app()
+            logger.info("Firebase Admin SDK already initialized")
+        except ValueError:
+            # 초기화되어 있지 않은 경우에만 초기화
+            logger.info("Initializing Firebase Admin SDK")
+            cred = credentials.Certificate(self.credentials_path)
+            firebase_admin.initialize_app(cred)
+            logger.info("Firebase Admin SDK initialized successfully")
+
+    def verify(self, token: str) -> Dict[str, Any]:
+        from firebase_admin import auth
+
+        # 시간 동기화 문제("Token used too early")는 2초 후 한 번 재시도
+        try:
+            return auth.verify_id_token(token, check_revoked=False)
+        except Exception as e:
+            if "Token used too early" not in str(e):
+                raise
+            logger.warning(f"Token timing issue detected, retrying in 2 seconds: {str(e)}")
+            time.sleep(2)
+            return auth.verify_id_token(token, check_revoked=False)
+
+    def get_user(self, uid: str, claims: Dict[str, Any]) -> AuthUserInfo:
+        from firebase_admin import auth
+
+        # 토큰 클레임에 없는 전화번호 등까지 Firebase 사용자 레코드에서 조회
+        firebase_user = auth.get_user(uid)
+        logger.debug(f"Firebase user info for UID {uid}: provider data {firebase_user.provider_data}")
+        return AuthUserInfo(
+            email=firebase_user.email,
+            display_name=firebase_user.display_name,
+            photo_url=firebase_user.photo_url,
+            phone_number=firebase_user.phone_number
+        )
+
+    def issue_token(self, uid: str) -> str:
+        from firebase_admin import auth
+
+        # 클라이언트가 signInWithCustomToken으로 ID Token을 받아야 하는 커스텀 토큰
+        custom_token = auth.create_custom_token(uid)
+        if isinstance(custom_token, bytes):
+            custom_token = custom_token.decode("utf-8")
+        return custom_token
+
+
+def _write_key_once(path: str, data: bytes):
+    """키 파일이 없을 때만 원자적으로 생성합니다. (여러 워커가 동시에 시작해도 하나만 남음)"""
+    directory = os.path.dirname(os.path.abspath(path))
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=".auth-key-")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+        os.chmod(tmp_path, 0o600)
+        try:
+            os.link(tmp_path, path)
+            logger.info(f"Generated local auth key: {path}")
+        except FileExistsError:
+            pass
+    finally:
+        os.unlink(tmp_path)
+
+
+def generate_local_key(algorithm: str) -> bytes:
+    if algorithm == "HS256":
+        return secrets.token_urlsafe(64).encode("ascii")
+    from cryptography.hazmat.primitives import serialization
+    from cryptography.hazmat.primitives.asymmetric import rsa
+
+    private_key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+    return private_key.private_bytes(
+        encoding=serialization.Encoding.PEM,
+        format=serialization.PrivateFormat.PKCS8,
+        encryption_algorithm=serialization.NoEncryption()
+    )
+
+
+class LocalJWTAuthProvider(AuthProvider):
+    """
+    로컬 키로 서명한 JWT를 검증하는 공급자.
+
+    HS256은 AUTH_LOCAL_SECRET(비어 있으면 키 파일의 비밀값), RS256은 키 파일의
+    RSA 개인 키로 서명하고 공개 키로 검증합니다. 키 파일이 없으면 처음 사용할 때 생성합니다.
+    """
+
+    name = "local"
+
+    def __init__(
+        self,
+        algorithm: str,
+        key_path: str,
+        secret: str = "",
+        issuer: str = "mhp-local",
+        audience: str = "mhp-api",
+        ttl_seconds: int = 3600
+    ):
+        if algorithm not in LOCAL_ALGORITHMS:
+            raise ValueError(f"Unsupported local auth algorithm: {algorithm}")
+        self.algorithm = algorithm
+        self.key_path = key_path
+        self.secret = secret
+        self.issuer = issuer
+        self.audience = audience
+        self.ttl_seconds = ttl_seconds
+        self._signing_key: Optional[str] = None
+        self._verifying_key: Optional[str] = None
+
+    def initialize(self):
+        logger.warning(
+            f"Local JWT auth provider enabled ({self.algorithm}) - Firebase 검증을 사용하지 않습니다. 운영 환경에서 사용하지 마세요."
+        )
+        self._load_keys()
+
+    def _load_keys(self):
+        if self._signing_key is not None:
+            return
+        if self.algorithm == "HS256" and self.secret:
+            self._signing_key = self._verifying_key = self.secret
+            return
+
+        if not os.path.exists(self.key_path):
+            _write_key_once(self.key_path, generate_local_key(self.algorithm))
+        with open(self.key_path, "rb") as f:
+            key = f.read()
+
+        if self.algorithm == "HS256":
+            self._signing_key = self._verifying_key = key.decode("ascii").strip()
+        else:
+            from cryptography.hazmat.primitives import serialization
+
+            private_key = serialization.load_pem_private_key(key, password=None)
+            self._signing_key = key.decode("ascii")
+            self._verifying_key = private_key.public_key().public_bytes(
+                encoding=serialization.Encoding.PEM,
+                format=serialization.PublicFormat.SubjectPublicKeyInfo
+            ).decode("ascii")
+
+    def verify(self, token: str) -> Dict[str, Any]:
+        from jose import jwt
+
+        self._load_keys()
+        claims = jwt.decode(
+            token,
+            self._verifying_key,
+            algorithms=[self.algorithm],
+            audience=self.audience,
+            issuer=self.issuer
+        )
+        # Firebase 디코드 결과와 같은 형태로 uid 제공
+        claims["uid"] = claims["sub"]
+        return claims
+
+    def issue_token(self, uid: str, ttl_seconds: Optional[int] = None) -> str:
+        from jose import jwt
+
+        self._load_keys()
+        now = int(time.time())
+        claims = {
+            "sub": uid,
+            "iss": self.issuer,
+            "aud": self.audience,
+            "iat": now,
+            "exp": now + (ttl_seconds or self.ttl_seconds)
+        }
+        return jwt.encode(claims, self._signing_key, algorithm=self.algorithm)
+
+
+def create_auth_provider(name: Optional[str] = None) -> AuthProvider:
+    name = name or settings.AUTH_PROVIDER
+    if name == "firebase":
+        return FirebaseAuthProvider(settings.FIREBASE_CREDENTIALS_PATH)
+    if name == "local":
+        return LocalJWTAuthProvider(
+            algorithm=settings.AUTH_LOCAL_ALGORITHM,
+            key_path=settings.AUTH_LOCAL_KEY_PATH,
+            secret=settings.AUTH_LOCAL_SECRET,
+            issuer=settings.AUTH_LOCAL_ISSUER,
+            audience=settings.AUTH_LOCAL_AUDIENCE,
+            ttl_seconds=settings.AUTH_LOCAL_TOKEN_TTL_SECONDS
+        )
+    raise ValueError(f"Unknown AUTH_PROVIDER: {name} (expected one of {', '.join(AUTH_PROVIDERS)})")
+
+
+@lru_cache(maxsize=None)
+def get_auth_provider() -> AuthProvider:
+    """Settings.AUTH_PROVIDER에 해당하는 프로세스 전역 공급자"""
+    return create_auth_provider()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="로컬 JWT 인증 도구 (AUTH_PROVIDER=local)")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    mint = subparsers.add_parser("mint", help="uid로 로컬 토큰 발급")
+    mint.add_argument("uid")
+    mint.add_argument("--ttl", type=int, default=None, help="유효 시간(초)")
+    subparsers.add_parser("keygen", help="키 파일이 없으면 생성")
+    args = parser.parse_args()
+
+    provider = create_auth_provider("local")
+    if args.command == "mint":
+        print(provider.issue_token(args.uid, ttl_seconds=args.ttl))
+    else:
+        provider._load_keys()
+        print(provider.key_path)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,281 @@
+# app/core/compression.py
+"""
+응답 압축 미들웨어 (GZipMiddleware 대체)
+
+- Accept-Encoding 협상: br(brotli 패키지), zstd(zstandard 패키지), gzip 중 설치된 것과
+  COMPRESSION_ENCODINGS 선호 순서로 선택 (q 값 반영)
+- 본문 크기에 따라 압축 레벨 선택 (작은 본문은 높은 레벨, 큰 본문은 빠른 레벨)
+- COMPRESSION_THREADPOOL_MIN_BYTES 이상인 본문은 스레드풀에서 압축해 이벤트 루프를 막지 않음
+- 같은 본문(채팅방 목록 등)을 반복 압축하지 않도록 압축 결과를 본문 해시 기준 LRU에 보관
+- 스트리밍 응답(NDJSON 내보내기 등)은 청크마다 flush하여 클라이언트가 바로 받을 수 있게 함
+- 이미 Content-Encoding이 있는 응답(미리 압축된 정적 파일)은 그대로 통과
+"""
+from collections import OrderedDict
+from fastapi.concurrency import run_in_threadpool
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+from typing import Dict, Optional, Sequence, Tuple
+import gzip
+import hashlib
+import zlib
+
+from app.core.config import settings
+
+try:
+    import brotli
+except ImportError:  # 선택 의존성
+    brotli = None
+
+try:
+    import zstandard
+except ImportError:  # 선택 의존성
+    zstandard = None
+
+# 인코딩별 미리 압축된 파일 확장자
+ENCODING_EXTENSIONS = {"br": ".br", "zstd": ".zst", "gzip": ".gz"}
+
+COMPRESSIBLE_TYPES = (
+    "text/",
+    "application/json",
+    "application/x-ndjson",
+    "application/javascript",
+    "application/xml",
+    "application/manifest+json",
+    "image/svg+xml",
+)
+
+# (본문 크기 상한, 레벨) - 위에서부터 처음 맞는 구간의 레벨 사용
+LEVELS: Dict[str, Tuple[Tuple[float, int], ...]] = {
+    "br": ((64 * 1024, 5), (1024 * 1024, 4), (float("inf"), 1)),
+    "zstd": ((64 * 1024, 6), (1024 * 1024, 3), (float("inf"), 1)),
+    "gzip": ((64 * 1024, 6), (1024 * 1024, 4), (float("inf"), 1)),
+}
+# 스트리밍 응답은 전체 크기를 모르므로 빠른 레벨 사용
+STREAM_LEVELS = {"br": 4, "zstd": 3, "gzip": 4}
+
+
+def available_encodings(preference: Optional[Sequence[str]] = None) -> Tuple[str, ...]:
+    """선호 순서 중 이 환경에서 사용할 수 있는 인코딩"""
+    if preference is None:
+        preference = [item.strip() for item in settings.COMPRESSION_ENCODINGS.split(",") if item.strip()]
+    installed = {"gzip": True, "br": brotli is not None, "zstd": zstandard is not None}
+    return tuple(encoding for encoding in preference if installed.get(encoding))
+
+
+def negotiate(accept_encoding: str, encodings: Sequence[str]) -> Optional[str]:
+    """Accept-Encoding 헤더와 서버 선호 순서(encodings)로 사용할 인코딩을 고릅니다."""
+    if not accept_encoding:
+        return None
+    weights: Dict[str, float] = {}
+    for item in accept_encoding.split(","):
+        name, _, params = item.strip().partition(";")
+        name = name.strip().lower()
+        quality = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                quality = float(params[2:])
+            except ValueError:
+                quality = 0.0
+        if name:
+            weights[name] = quality
+
+    best, best_quality = None, 0.0
+    for encoding in encodings:
+        quality = weights.get(encoding, weights.get("*", 0.0))
+        if quality > best_quality:
+            best, best_quality = encoding, quality
+    return best
+
+
+def level_for(encoding: str, size: int) -> int:
+    for limit, level in LEVELS[encoding]:
+        if size <= limit:
+            return level
+    return LEVELS[encoding][-1][1]
+
+
+def compress(body: bytes, encoding: str, level: int) -> bytes:
+    if encoding == "gzip":
+        return gzip.compress(body, compresslevel=level, mtime=0)
+    if encoding == "br":
+        return brotli.compress(body, quality=level)
+    if encoding == "zstd":
+        return zstandard.ZstdCompressor(level=level).compress(body)
+    raise ValueError(f"Unsupported encoding: {encoding}")
+
+
+class StreamCompressor:
+    """청크 단위 압축기 (청크마다 flush하여 바로 전송 가능한 바이트를 반환)"""
+
+    def __init__(self, encoding: str, level: int):
+        self.encoding = encoding
+        if encoding == "gzip":
+            self._compressor = zlib.compressobj(level, zlib.DEFLATED, 31)
+        elif encoding == "br":
+            self._compressor = brotli.Compressor(quality=level)
+        elif encoding == "zstd":
+            self._compressor = zstandard.ZstdCompressor(level=level).compressobj()
+        else:
+            raise ValueError(f"Unsupported encoding: {encoding}")
+
+    def compress(self, chunk: bytes) -> bytes:
+        if self.encoding == "gzip":
+            return self._compressor.compress(chunk) + self._compressor.flush(zlib.Z_SYNC_FLUSH)
+        if self.encoding == "br":
+            return self._compressor.process(chunk) + self._compressor.flush()
+        return self._compressor.compress(chunk) + self._compressor.flush(zstandard.COMPRESSOBJ_FLUSH_BLOCK)
+
+    def finish(self) -> bytes:
+        if self.encoding == "gzip":
+            return self._compressor.flush(zlib.Z_FINISH)
+        if self.encoding == "br":
+            return self._compressor.finish()
+        return self._compressor.flush()
+
+
+class CompressedBodyCache:
+    """(인코딩, 레벨, 본문 해시) → 압축 결과 LRU (전체 바이트 수 상한)"""
+
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self.size = 0
+        self.hits = 0
+        self.misses = 0
+        self._entries: "OrderedDict[Tuple[str, int, bytes], bytes]" = OrderedDict()
+
+    def get(self, key) -> Optional[bytes]:
+        value = self._entries.get(key)
+        if value is None:
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def put(self, key, value: bytes):
+        if len(value) > self.max_bytes:
+            return
+        previous = self._entries.pop(key, None)
+        if previous is not None:
+            self.size -= len(previous)
+        self._entries[key] = value
+        self.size += len(value)
+        while self.size > self.max_bytes:
+            _, evicted = self._entries.popitem(last=False)
+            self.size -= len(evicted)
+
+    def stats(self) -> Dict[str, int]:
+        return {"entries": len(self._entries), "bytes": self.size, "hits": self.hits, "misses": self.misses}
+
+
+def is_compressible(content_type: str) -> bool:
+    return content_type.startswith(COMPRESSIBLE_TYPES)
+
+
+class CompressionMiddleware:
+    def __init__(
+        self,
+        app: ASGIApp,
+        minimum_size: Optional[int] = None,
+        threadpool_min_bytes: Optional[int] = None,
+        cache_min_bytes: Optional[int] = None,
+        cache_max_bytes: Optional[int] = None,
+        encodings: Optional[Sequence[str]] = None
+    ):
+        self.app = app
+        self.minimum_size = settings.COMPRESSION_MINIMUM_SIZE if minimum_size is None else minimum_size
+        self.threadpool_min_bytes = (
+            settings.COMPRESSION_THREADPOOL_MIN_BYTES if threadpool_min_bytes is None else threadpool_min_bytes
+        )
+        self.cache_min_bytes = settings.COMPRESSION_CACHE_MIN_BYTES if cache_min_bytes is None else cache_min_bytes
+        self.cache = CompressedBodyCache(
+            settings.COMPRESSION_CACHE_MAX_BYTES if cache_max_bytes is None else cache_max_bytes
+        )
+        self.encodings = available_encodings(encodings)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        encoding = negotiate(Headers(scope=scope).get("accept-encoding", ""), self.encodings)
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+
+        start_message: Optional[Message] = None
+        # None: 아직 결정 전, False: 그대로 통과, StreamCompressor: 스트리밍 압축 중
+        mode = None
+
+        async def send_wrapper(message: Message):
+            nonlocal start_message, mode
+            if message["type"] == "http.response.start":
+                start_message = message
+                return
+            if message["type"] != "http.response.body":
+                await send(message)
+                return
+
+            if mode is False:
+                await send(message)
+                return
+            if mode is not None:
+                body = mode.compress(message.get("body", b""))
+                if not message.get("more_body", False):
+                    body += mode.finish()
+                await send({**message, "body": body})
+                return
+
+            body = message.get("body", b"")
+            more_body = message.get("more_body", False)
+            headers = MutableHeaders(raw=start_message["headers"])
+            if (
+                "content-encoding" in headers
+                or start_message["status"] in (204, 304)
+                or not is_compressible(headers.get("content-type", ""))
+                or (not more_body and len(body) < self.minimum_size)
+            ):
+                mode = False
+                await send(start_message)
+                await send(message)
+                return
+
+            headers["Content-Encoding"] = encoding
+            headers.add_vary_header("Accept-Encoding")
+            etag = headers.get("etag")
+            if etag and not etag.startswith("W/"):
+                # 인코딩이 다른 표현이므로 약한 ETag로 (If-None-Match 비교는 그대로 동작)
+                headers["ETag"] = "W/" + etag
+
+            if more_body:
+                mode = StreamCompressor(encoding, STREAM_LEVELS[encoding])
+                del headers["Content-Length"]
+                await send(start_message)
+                await send({**message, "body": mode.compress(body)})
+                return
+
+            mode = False
+            compressed = await self._compress_body(body, encoding)
+            headers["Content-Length"] = str(len(compressed))
+            await send(start_message)
+            await send({**message, "body": compressed})
+
+        await self.app(scope, receive, send_wrapper)
+
+    async def _compress_body(self, body: bytes, encoding: str) -> bytes:
+        level = level_for(encoding, len(body))
+        key = None
+        if len(body) >= self.cache_min_bytes:
+            key = (encoding, level, hashlib.blake2b(body, digest_size=16).digest())
+            cached = self.cache.get(key)
+            if cached is not None:
+                return cached
+
+        if len(body) >= self.threadpool_min_bytes:
+            compressed = await run_in_threadpool(compress, body, encoding, level)
+        else:
+            compressed = compress(body, encoding, level)
+
+        if key is not None:
+            self.cache.put(key, compressed)
+        return compressed
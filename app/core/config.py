@@ -1,6 +1,6 @@
 from pydantic_settings import BaseSettings
 from functools import lru_cache
-from typing import Optional
+from typing import List, Optional
 import os
 
 class Settings(BaseSettings):
@@ -15,15 +15,108 @@ class Settings(BaseSettings):
     POSTGRES_DB: str = "mhp_db"
     SQLALCHEMY_DATABASE_URL: Optional[str] = None
 
+    # Database 커넥션 풀 (워커 프로세스당 하나의 엔진)
+    DB_POOL_SIZE: int = 5
+    DB_MAX_OVERFLOW: int = 10
+    DB_POOL_TIMEOUT: float = 30.0        # 풀에서 커넥션을 기다리는 최대 시간(초)
+    DB_POOL_RECYCLE: int = 1800          # 커넥션 재생성 주기(초), -1이면 비활성화
+    DB_POOL_PRE_PING: bool = True        # checkout 시 끊어진 커넥션 감지
+    DB_STATEMENT_TIMEOUT_MS: int = 30000  # PostgreSQL statement_timeout, 0이면 비활성화
+    DB_APPLICATION_NAME: str = "goodmorning-api"
+
+    # 읽기 복제본 (쉼표로 구분한 URL 목록, 비어 있으면 모든 읽기를 primary로)
+    DB_REPLICA_URLS: str = ""
+    DB_READ_YOUR_WRITES_SECONDS: float = 5.0    # 쓰기 직후 해당 사용자의 읽기를 primary로 고정하는 시간
+    DB_REPLICA_MAX_LAG_SECONDS: float = 10.0    # 이보다 지연된 복제본은 라우팅에서 제외
+    DB_REPLICA_LAG_CHECK_INTERVAL: float = 5.0  # 복제 지연 재측정 주기(초)
+
+    # messages 월별 파티션 (PostgreSQL)
+    MESSAGE_PARTITION_MONTHS_AHEAD: int = 3      # 미리 생성해 둘 미래 월 파티션 수
+    MESSAGE_PARTITION_RETAIN_MONTHS: int = 12    # 이보다 오래된 파티션은 보관 대상
+    MESSAGE_PARTITION_CHECK_INTERVAL: float = 86400.0  # 파티션 유지보수 주기(초)
+    # 오래된 메시지 아카이브 (채팅방/월별 압축 파일, 조회 시 자동 폴백)
+    MESSAGE_ARCHIVE_DIR: str = "archive/messages"
+    MESSAGE_ARCHIVE_AFTER_DAYS: int = 365
+
+    # WebSocket
+    # 클라이언트가 제안하면 permessage-deflate(RFC 7692) 압축을 협상
+    WS_PER_MESSAGE_DEFLATE: bool = True
+    # ConnectionManager 채팅방 레지스트리 샤드 수 (room_id 해시 기준)
+    WS_CONNECTION_SHARDS: int = 16
+    # 핸드셰이크(accept ~ 인증 완료) 입장 제어
+    WS_MAX_CONCURRENT_HANDSHAKES: int = 200
+    WS_HANDSHAKE_RATE_PER_IP: float = 2.0   # IP별 초당 핸드셰이크 수
+    WS_HANDSHAKE_BURST_PER_IP: float = 10.0  # IP별 순간 허용량
+    WS_RETRY_AFTER_SECONDS: float = 5.0     # 거절 시 재시도 대기 기본값 (지터 적용)
+    WS_AUTH_TIMEOUT_SECONDS: float = 10.0   # 인증 메시지 대기 시간
+    # X-Real-IP / X-Forwarded-For를 신뢰할 프록시 주소 (쉼표로 구분, IP 또는 CIDR)
+    # 그 밖의 주소에서 온 연결은 헤더를 무시하고 소켓 주소를 클라이언트 IP로 사용
+    WS_TRUSTED_PROXIES: str = "127.0.0.1,::1"
+
+    # 로깅 (큐 기반, 출력은 별도 스레드)
+    LOG_LEVEL: str = "INFO"
+    LOG_FORMAT: str = "text"                 # text | json (구조화 로그)
+    LOG_FILE: str = "app.log"
+    LOG_MAX_BYTES: int = 50 * 1024 * 1024    # 이 크기를 넘으면 회전
+    LOG_BACKUP_COUNT: int = 10
+    LOG_ROTATE_INTERVAL_HOURS: float = 24.0  # 이 시간이 지나면 회전, 0이면 크기 기준만
+    # 로거별 샘플링 비율 (WARNING 미만에만 적용), 예: "app.core.firebase=0.01,mhp-api.access=0.1"
+    LOG_SAMPLING: str = ""
+
+    # 메트릭 (/metrics, Prometheus 텍스트 형식, 워커 프로세스 단위)
+    METRICS_ENABLED: bool = True
+    METRICS_MAX_ROOM_SERIES: int = 50        # 채팅방별 접속 수는 접속자가 많은 상위 N개 방만 노출
+
+    # 응답 압축 (br/zstd는 brotli/zstandard 패키지가 설치된 경우에만)
+    COMPRESSION_ENCODINGS: str = "br,zstd,gzip"          # 서버 선호 순서
+    COMPRESSION_MINIMUM_SIZE: int = 1000                 # 이보다 작은 본문은 압축하지 않음
+    COMPRESSION_THREADPOOL_MIN_BYTES: int = 64 * 1024    # 이 이상은 스레드풀에서 압축
+    COMPRESSION_CACHE_MIN_BYTES: int = 8 * 1024          # 이 이상인 본문의 압축 결과를 LRU에 보관
+    COMPRESSION_CACHE_MAX_BYTES: int = 32 * 1024 * 1024
+
+    # HTTP 캐시 (ETag 조건부 요청, 라우트별 Cache-Control)
+    HTTP_CACHE_CONTROL_CHATROOM_LIST: str = "public, max-age=5, must-revalidate"  # 목록은 5초까지 재사용
+    HTTP_CACHE_CONTROL_CHATROOM_DETAIL: str = "public, no-cache"                # 항상 재검증 (304)
+    HTTP_CACHE_CONTROL_PROFILE: str = "private, no-cache"                       # 인증이 필요한 응답
+
+    # 공개 응답 캐시 (채팅방 목록/검색, 변경 이벤트로 무효화)
+    RESPONSE_CACHE_MAX_ENTRIES: int = 256
+    RESPONSE_CACHE_TTL_SECONDS: float = 30.0   # 이벤트로 잡지 못한 변경에 대한 안전장치
+    RESPONSE_CACHE_REDIS_URL: str = ""         # 예: redis://redis:6379/0 (비어 있으면 프로세스 내 캐시만)
+    RESPONSE_CACHE_MESSAGE_INVALIDATE_DELAY: float = 1.0  # 메시지 생성 후 채팅방 카드 갱신/목록 무효화를 묶는 시간(초)
+
+    # 요청별 SQL 프로파일링 (개발/스테이징 전용, Server-Timing 헤더 + N+1 경고)
+    SQL_PROFILING_ENABLED: bool = False
+    SQL_PROFILING_REPEAT_THRESHOLD: int = 5  # 한 요청에서 같은 SQL이 이 횟수를 넘으면 경고
+
     # Firebase
     FIREBASE_CREDENTIALS_PATH: str = os.getenv("FIREBASE_CREDENTIALS_PATH", "docker/firebase-adminsdk.json")
 
+    # 인증 공급자: firebase | local (로컬 JWT, 오프라인 테스트/부하 테스트 전용)
+    AUTH_PROVIDER: str = "firebase"
+    AUTH_LOCAL_ALGORITHM: str = "HS256"          # HS256 | RS256
+    AUTH_LOCAL_KEY_PATH: str = "docker/local-auth.key"  # 없으면 처음 사용할 때 생성
+    AUTH_LOCAL_SECRET: str = ""                  # HS256 비밀값 (비어 있으면 키 파일 사용)
+    AUTH_LOCAL_ISSUER: str = "mhp-local"
+    AUTH_LOCAL_AUDIENCE: str = "mhp-api"
+    AUTH_LOCAL_TOKEN_TTL_SECONDS: int = 3600
+    # 관리자 UID 목록 (쉼표로 구분, 비어 있으면 관리자 전용 API는 모두 403)
+    ADMIN_UIDS: str = ""
+
     @property
     def get_database_url(self) -> str:
         if self.SQLALCHEMY_DATABASE_URL:
             return self.SQLALCHEMY_DATABASE_URL
         return f"postgresql://{self.POSTGRES_USER}:{self.POSTGRES_PASSWORD}@{self.POSTGRES_SERVER}/{self.POSTGRES_DB}"
 
+    @property
+    def get_replica_urls(self) -> List[str]:
+        return [url.strip() for url in self.DB_REPLICA_URLS.split(",") if url.strip()]
+
+    @property
+    def get_admin_uids(self) -> List[str]:
+        return [uid.strip() for uid in self.ADMIN_UIDS.split(",") if uid.strip()]
+
     class Config:
         case_sensitive = True
 
@@ -1,18 +1,89 @@
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import Engine, make_url
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 from app.core.config import settings
+from app.core.db_pool import PoolMonitor, TimedQueuePool
+from app.core.db_router import SessionRouter
+from app.core.metrics import count_query, registry
+from typing import Any, Dict
 
 SQLALCHEMY_DATABASE_URL = settings.SQLALCHEMY_DATABASE_URL
 
-engine = create_engine(SQLALCHEMY_DATABASE_URL)
+
+def create_db_engine(database_url: str) -> Engine:
+    """
+    Settings 값으로 풀 크기, 재활용 주기, pre-ping, statement timeout을 설정한 엔진을 생성합니다.
+
+    워커 프로세스마다 엔진(풀)은 하나만 만들어야 합니다.
+    """
+    url = make_url(database_url)
+    engine_kwargs: Dict[str, Any] = {
+        "pool_pre_ping": settings.DB_POOL_PRE_PING,
+    }
+
+    # 메모리 SQLite는 SingletonThreadPool을 사용하므로 풀 설정을 적용하지 않음
+    if url.get_backend_name() != "sqlite" or url.database not in (None, "", ":memory:"):
+        engine_kwargs.update(
+            poolclass=TimedQueuePool,
+            pool_size=settings.DB_POOL_SIZE,
+            max_overflow=settings.DB_MAX_OVERFLOW,
+            pool_timeout=settings.DB_POOL_TIMEOUT,
+            pool_recycle=settings.DB_POOL_RECYCLE,
+        )
+
+    if url.get_backend_name() == "postgresql":
+        connect_args = {"application_name": settings.DB_APPLICATION_NAME}
+        if settings.DB_STATEMENT_TIMEOUT_MS > 0:
+            connect_args["options"] = f"-c statement_timeout={settings.DB_STATEMENT_TIMEOUT_MS}"
+        engine_kwargs["connect_args"] = connect_args
+
+    return create_engine(url, **engine_kwargs)
+
+
+engine = create_db_engine(SQLALCHEMY_DATABASE_URL)
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 Base = declarative_base()
 
+# 커넥션 풀 점유 및 checkout 대기 시간 계측
+pool_monitor = PoolMonitor(engine, max_overflow=settings.DB_MAX_OVERFLOW)
+
+
+registry.callback_gauge(
+    "db_pool_checked_out", "Connections currently checked out of the primary pool", (),
+    lambda: [((), pool_monitor.checked_out)]
+)
+
+
+# 요청별 SQL 실행 수 계측 (primary/복제본 모든 엔진)
+@event.listens_for(Engine, "before_cursor_execute")
+def _count_request_query(conn, cursor, statement, parameters, context, executemany):
+    count_query()
+
+# 읽기 복제본 라우팅 (DB_REPLICA_URLS가 비어 있으면 모든 읽기를 primary로)
+session_router = SessionRouter(
+    primary_factory=SessionLocal,
+    replica_engines={
+        f"replica-{index}": create_db_engine(url)
+        for index, url in enumerate(settings.get_replica_urls)
+    },
+    read_your_writes_seconds=settings.DB_READ_YOUR_WRITES_SECONDS,
+    max_lag_seconds=settings.DB_REPLICA_MAX_LAG_SECONDS,
+    lag_check_interval=settings.DB_REPLICA_LAG_CHECK_INTERVAL
+)
+
 # Dependency
 def get_db():
     db = SessionLocal()
     try:
         yield db
     finally:
-        db.close() 
\ No newline at end of file
+        db.close()
+
+# 읽기 전용 Dependency (복제본 우선)
+def get_read_db():
+    db = session_router.read_session()
+    try:
+        yield db
+    finally:
+        db.close()
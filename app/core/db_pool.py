@@ -0,0 +1,114 @@
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from sqlalchemy.pool import QueuePool
+from app.core.metrics import db_pool_checkout_wait
+from typing import Any, Dict, Optional
+import threading
+import time
+
+# checkout 대기 시간 측정용 (connect() 호출, 새 커넥션 생성, checkout 이벤트는 같은 스레드에서 연속으로 실행됨)
+_checkout_wait = threading.local()
+
+
+class TimedQueuePool(QueuePool):
+    """
+    풀에서 커넥션을 얻기까지 기다린 시간을 측정하는 QueuePool.
+
+    공개 API인 connect()의 시작 시각만 기록하고, 대기 시간은 PoolMonitor가
+    공개 풀 이벤트(do_connect/connect/checkout)로 계산합니다.
+    """
+
+    def connect(self):
+        _checkout_wait.started = time.perf_counter()
+        _checkout_wait.connect_seconds = 0.0
+        try:
+            return super().connect()
+        finally:
+            _checkout_wait.started = None
+
+
+class PoolMonitor:
+    """
+    커넥션 풀 점유 현황 계측기.
+
+    checkout/checkin 이벤트로 현재 사용 중인 커넥션 수와 최대치,
+    checkout 대기 시간을 추적하여 워커 수에 맞는 풀 크기를 산정할 수 있게 합니다.
+    대기 시간에서 새 DB 커넥션을 여는 시간(do_connect ~ connect 이벤트)은 제외합니다.
+    이벤트는 스레드풀의 여러 스레드에서 동시에 실행되므로 카운터는 잠금으로 보호합니다.
+    """
+
+    def __init__(self, engine: Engine, max_overflow: Optional[int] = None):
+        self.engine = engine
+        self.max_overflow = max_overflow
+        self._lock = threading.Lock()
+        self.checked_out = 0
+        self.peak_checked_out = 0
+        self.total_checkouts = 0
+        # checkout 대기 시간 (TimedQueuePool 사용 시)
+        self.total_wait_seconds = 0.0
+        self.max_wait_seconds = 0.0
+
+        event.listen(engine, "do_connect", self._on_do_connect)
+        event.listen(engine, "connect", self._on_connect)
+        event.listen(engine, "checkout", self._on_checkout)
+        event.listen(engine, "checkin", self._on_checkin)
+
+    def _on_do_connect(self, dialect, connection_record, cargs, cparams):
+        # 새 DBAPI 커넥션 생성 시작 (None을 반환하면 기본 connect 진행)
+        _checkout_wait.connect_started = time.perf_counter()
+
+    def _on_connect(self, dbapi_connection, connection_record):
+        started = getattr(_checkout_wait, "connect_started", None)
+        if started is not None and getattr(_checkout_wait, "started", None) is not None:
+            _checkout_wait.connect_seconds += time.perf_counter() - started
+        _checkout_wait.connect_started = None
+
+    def _on_checkout(self, dbapi_connection, connection_record, connection_proxy):
+        wait = None
+        started = getattr(_checkout_wait, "started", None)
+        if started is not None:
+            _checkout_wait.started = None
+            wait = max(0.0, time.perf_counter() - started - _checkout_wait.connect_seconds)
+            db_pool_checkout_wait.observe(wait)
+
+        with self._lock:
+            self.checked_out += 1
+            self.total_checkouts += 1
+            if self.checked_out > self.peak_checked_out:
+                self.peak_checked_out = self.checked_out
+            if wait is not None:
+                self.total_wait_seconds += wait
+                if wait > self.max_wait_seconds:
+                    self.max_wait_seconds = wait
+
+    def _on_checkin(self, dbapi_connection, connection_record):
+        with self._lock:
+            if self.checked_out > 0:
+                self.checked_out -= 1
+
+    def reset_peak(self):
+        with self._lock:
+            self.peak_checked_out = self.checked_out
+            self.max_wait_seconds = 0.0
+
+    def stats(self) -> Dict[str, Any]:
+        pool = self.engine.pool
+        with self._lock:
+            stats: Dict[str, Any] = {
+                "checked_out": self.checked_out,
+                "peak_checked_out": self.peak_checked_out,
+                "total_checkouts": self.total_checkouts,
+                "avg_checkout_wait_ms": round(
+                    self.total_wait_seconds / self.total_checkouts * 1000, 3
+                ) if self.total_checkouts else 0.0,
+                "max_checkout_wait_ms": round(self.max_wait_seconds * 1000, 3),
+            }
+        stats["status"] = pool.status()
+        # QueuePool인 경우 크기 정보 추가 (공개 메서드만 사용)
+        if isinstance(pool, QueuePool):
+            stats["pool_size"] = pool.size()
+            stats["pool_checked_out"] = pool.checkedout()
+            stats["overflow"] = pool.overflow()
+            if self.max_overflow is not None:
+                stats["max_overflow"] = self.max_overflow
+        return stats
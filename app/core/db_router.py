@@ -0,0 +1,175 @@
+from sqlalchemy import text
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session, sessionmaker
+from typing import Any, Callable, Dict, List, Optional
+import asyncio
+import itertools
+import logging
+import time
+
+logger = logging.getLogger(__name__)
+
+# 복제본의 재생(replay) 지연(초). WAL을 모두 재생했다면 0
+REPLICA_LAG_QUERY = text(
+    "SELECT CASE WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0 "
+    "ELSE EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()) END"
+)
+
+
+class ReplicaTarget:
+    """읽기 복제본 하나와 마지막으로 측정한 복제 지연"""
+
+    def __init__(self, name: str, engine: Engine):
+        self.name = name
+        self.engine = engine
+        self.session_factory = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+        self.lag_seconds: Optional[float] = None
+        self.healthy = True
+        self.checked_at = 0.0
+        self.routed = 0
+
+
+class SessionRouter:
+    """
+    읽기 전용 요청을 복제본으로 분산하는 세션 라우터.
+
+    - 복제본은 라운드 로빈으로 선택하며, 지연이 한도를 넘거나 응답이 없으면 제외
+    - 복제 지연은 요청 경로가 아닌 run_lag_monitor() 백그라운드 작업에서 주기적으로 측정하며,
+      아직 측정하지 않았거나 측정이 오래된 복제본도 제외
+    - 사용자가 쓰기를 한 직후에는 일정 시간 동안 해당 사용자의 읽기를 primary로 고정
+      (read-your-writes, 워커 프로세스 단위)
+    - 복제본이 없으면 모든 읽기가 primary로 감
+    """
+
+    def __init__(
+        self,
+        primary_factory: Callable[[], Session],
+        replica_engines: Dict[str, Engine],
+        read_your_writes_seconds: float,
+        max_lag_seconds: float,
+        lag_check_interval: float
+    ):
+        self.primary_factory = primary_factory
+        self.replicas: List[ReplicaTarget] = [
+            ReplicaTarget(name, engine) for name, engine in replica_engines.items()
+        ]
+        self.read_your_writes_seconds = read_your_writes_seconds
+        self.max_lag_seconds = max_lag_seconds
+        self.lag_check_interval = lag_check_interval
+
+        self._round_robin = itertools.count()
+        # {user_id: primary 고정 만료 시각(monotonic)}
+        self._recent_writers: Dict[str, float] = {}
+
+        # 라우팅 통계
+        self.routed_primary = 0
+        self.sticky_reads = 0
+        self.lag_fallbacks = 0
+
+    def mark_write(self, user_id: Optional[str]):
+        """사용자의 쓰기를 기록하여 이후 짧은 기간 읽기를 primary로 보냅니다."""
+        if not user_id or not self.replicas:
+            return
+        now = time.monotonic()
+        self._recent_writers[user_id] = now + self.read_your_writes_seconds
+        # 만료된 항목 정리
+        if len(self._recent_writers) > 10_000:
+            self._recent_writers = {
+                uid: expires for uid, expires in self._recent_writers.items() if expires > now
+            }
+
+    def _is_sticky(self, user_id: Optional[str], now: float) -> bool:
+        if not user_id:
+            return False
+        expires = self._recent_writers.get(user_id)
+        if expires is None:
+            return False
+        if expires <= now:
+            self._recent_writers.pop(user_id, None)
+            return False
+        return True
+
+    def is_sticky(self, user_id: Optional[str]) -> bool:
+        """user_id의 읽기가 지금 primary로 고정되어 있는지 (공유 로드 키를 라우팅별로 나눌 때 사용)"""
+        return bool(self.replicas) and self._is_sticky(user_id, time.monotonic())
+
+    def _measure_lag(self, replica: ReplicaTarget):
+        """복제 지연을 측정합니다. (블로킹 쿼리 - 백그라운드 작업에서만 호출)"""
+        try:
+            with replica.engine.connect() as connection:
+                lag = connection.execute(REPLICA_LAG_QUERY).scalar()
+            replica.lag_seconds = float(lag) if lag is not None else 0.0
+            replica.healthy = True
+        except Exception as e:
+            logger.warning(f"Replica {replica.name} lag check failed: {str(e)}")
+            replica.lag_seconds = None
+            replica.healthy = False
+        replica.checked_at = time.monotonic()
+
+    def refresh_lags(self):
+        """모든 복제본의 복제 지연을 다시 측정합니다."""
+        for replica in self.replicas:
+            self._measure_lag(replica)
+
+    async def run_lag_monitor(self):
+        """주기적으로 복제 지연을 측정하는 백그라운드 루프 (복제본이 있을 때만 시작)"""
+        from starlette.concurrency import run_in_threadpool
+
+        while True:
+            try:
+                await run_in_threadpool(self.refresh_lags)
+            except Exception as e:
+                logger.error(f"Replica lag monitor failed: {str(e)}")
+            await asyncio.sleep(self.lag_check_interval)
+
+    def _is_eligible(self, replica: ReplicaTarget, now: float) -> bool:
+        # 측정 전이거나 측정 작업이 멈춰 값이 오래되었으면(주기의 3배) 지연을 알 수 없으므로 제외
+        if not replica.checked_at or now - replica.checked_at > self.lag_check_interval * 3:
+            return False
+        return replica.healthy and (replica.lag_seconds or 0.0) <= self.max_lag_seconds
+
+    def _pick_replica(self, now: float) -> Optional[ReplicaTarget]:
+        for _ in range(len(self.replicas)):
+            replica = self.replicas[next(self._round_robin) % len(self.replicas)]
+            if self._is_eligible(replica, now):
+                return replica
+        return None
+
+    def read_session(self, user_id: Optional[str] = None) -> Session:
+        """읽기 전용 작업에 사용할 세션을 반환합니다."""
+        if not self.replicas:
+            self.routed_primary += 1
+            return self.primary_factory()
+
+        now = time.monotonic()
+        if self._is_sticky(user_id, now):
+            self.sticky_reads += 1
+            self.routed_primary += 1
+            return self.primary_factory()
+
+        replica = self._pick_replica(now)
+        if replica is None:
+            self.lag_fallbacks += 1
+            self.routed_primary += 1
+            return self.primary_factory()
+
+        replica.routed += 1
+        return replica.session_factory()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "routed_primary": self.routed_primary,
+            "sticky_reads": self.sticky_reads,
+            "lag_fallbacks": self.lag_fallbacks,
+            "sticky_users": len(self._recent_writers),
+            "max_lag_seconds": self.max_lag_seconds,
+            "replicas": [
+                {
+                    "name": replica.name,
+                    "routed": replica.routed,
+                    "healthy": replica.healthy,
+                    "lag_seconds": replica.lag_seconds
+                }
+                for replica in self.replicas
+            ]
+        }
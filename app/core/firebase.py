@@ -2,15 +2,15 @@
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
 from sqlalchemy.orm import Session
-from app.db import SessionLocal
+from app.db import SessionLocal, session_router, get_read_db
 from app.core.config import settings
-import firebase_admin
-from firebase_admin import credentials, auth
+from app.core.auth_providers import get_auth_provider
+from app.core.metrics import token_verify_duration
+from typing import Optional
 import logging
 import time
 
 # 로깅 설정
-logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 # OAuth2PasswordBearer 스키마 정의
@@ -18,19 +18,16 @@ oauth2_scheme = OAuth2PasswordBearer(
     tokenUrl="/api/auth/token",
     description="Firebase ID Token을 입력하세요"
 )
+# 토큰이 없어도 되는 공개 API용 (토큰이 있으면 사용자 식별)
+optional_oauth2_scheme = OAuth2PasswordBearer(
+    tokenUrl="/api/auth/token",
+    description="Firebase ID Token (선택)",
+    auto_error=False
+)
 
-# Firebase Admin SDK 초기화
+# 인증 공급자 초기화 (AUTH_PROVIDER=firebase이면 Firebase Admin SDK 초기화)
 def initialize_firebase():
-    try:
-        # 이미 초기화되어 있는지 확인
-        firebase_admin.get_app()
-        logger.info("Firebase Admin SDK already initialized")
-    except ValueError:
-        # 초기화되어 있지 않은 경우에만 초기화
-        logger.info("Initializing Firebase Admin SDK")
-        cred = credentials.Certificate(settings.FIREBASE_CREDENTIALS_PATH)
-        firebase_admin.initialize_app(cred)
-        logger.info("Firebase Admin SDK initialized successfully")
+    get_auth_provider().initialize()
 
 # 데이터베이스 세션 의존성
 def get_db():
@@ -40,24 +37,27 @@ def get_db():
     finally:
         db.close()
 
+def verify_id_token(token: str) -> dict:
+    """
+    설정된 인증 공급자(Firebase 또는 로컬 JWT)로 토큰을 검증하고 소요 시간을 메트릭에 기록합니다.
+    """
+    started = time.perf_counter()
+    result = "error"
+    try:
+        decoded_token = get_auth_provider().verify(token)
+        result = "ok"
+        return decoded_token
+    finally:
+        token_verify_duration.labels(result).observe(time.perf_counter() - started)
+
 # 토큰 검증 함수
 async def verify_token(token: str):
     try:
-        logger.info(f"Verifying token: {token[:20]}...")
+        logger.debug("Verifying token")
         
-        # 시간 동기화 문제 해결을 위해 check_revoked=False로 설정하고
-        # 시간 검증을 더 관대하게 처리
-        try:
-            decoded_token = auth.verify_id_token(token, check_revoked=False)
-        except Exception as e:
-            if "Token used too early" in str(e):
-                logger.warning(f"Token timing issue detected, retrying in 2 seconds: {str(e)}")
-                time.sleep(2)
-                decoded_token = auth.verify_id_token(token, check_revoked=False)
-            else:
-                raise e
+        decoded_token = verify_id_token(token)
                 
-        logger.info(f"Token verified successfully. UID: {decoded_token.get('uid')}")
+        logger.debug(f"Token verified successfully. UID: {decoded_token.get('uid')}")
         return decoded_token
     except Exception as e:
         logger.error(f"Token verification failed: {str(e)}")
@@ -80,21 +80,12 @@ async def get_current_user_id(token: str = Depends(oauth2_scheme)):
         str: Firebase UID
     """
     try:
-        logger.info(f"Getting current user ID from token: {token[:20]}...")
+        logger.debug("Getting current user ID from token")
         
-        # 시간 동기화 문제 해결을 위한 재시도 로직
-        try:
-            decoded_token = auth.verify_id_token(token, check_revoked=False)
-        except Exception as e:
-            if "Token used too early" in str(e):
-                logger.warning(f"Token timing issue detected, retrying in 2 seconds: {str(e)}")
-                time.sleep(2)
-                decoded_token = auth.verify_id_token(token, check_revoked=False)
-            else:
-                raise e
+        decoded_token = verify_id_token(token)
                 
         uid = decoded_token["uid"]
-        logger.info(f"Current user ID: {uid}")
+        logger.debug(f"Current user ID: {uid}")
         return uid
     except Exception as e:
         logger.error(f"Failed to get current user ID: {str(e)}")
@@ -102,4 +93,43 @@ async def get_current_user_id(token: str = Depends(oauth2_scheme)):
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail=f"Invalid authentication credentials: {str(e)}",
             headers={"WWW-Authenticate": "Bearer"},
-        )
\ No newline at end of file
+        )
+
+# 현재 사용자 ID 가져오기 (선택)
+async def get_optional_user_id(token: Optional[str] = Depends(optional_oauth2_scheme)) -> Optional[str]:
+    """
+    공개 API에서 토큰이 있으면 사용자 ID를, 없으면 None을 반환합니다.
+    방금 쓰기를 한 사용자의 읽기를 primary로 보내는(read-your-writes) 데 사용하며,
+    토큰이 있지만 유효하지 않으면 401을 반환합니다.
+    """
+    if not token:
+        return None
+    return await get_current_user_id(token)
+
+# 관리자 사용자 ID 가져오기
+async def get_admin_user_id(current_user_id: str = Depends(get_current_user_id)):
+    """
+    현재 사용자가 관리자(ADMIN_UIDS)인지 확인하고 UID를 반환합니다.
+    관리자가 아니면 403을 반환합니다.
+    """
+    if current_user_id not in settings.get_admin_uids:
+        logger.warning(f"관리자 전용 API 접근 거부: {current_user_id}")
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="관리자 권한이 필요합니다"
+        )
+    return current_user_id
+
+# 읽기 전용 데이터베이스 세션 의존성 (로그인 사용자 - read-your-writes 보장)
+def get_user_read_db(current_user_id: str = Depends(get_current_user_id)):
+    """
+    복제본으로 라우팅되는 읽기 전용 세션을 제공합니다.
+    
+    같은 요청의 get_current_user_id 결과를 재사용하며, 해당 사용자가 방금 쓰기를 했다면
+    복제 지연으로 인해 변경 사항이 안 보이지 않도록 primary 세션을 반환합니다.
+    """
+    db = session_router.read_session(current_user_id)
+    try:
+        yield db
+    finally:
+        db.close()
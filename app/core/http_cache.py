@@ -0,0 +1,104 @@
+# app/core/http_cache.py
+"""
+HTTP 조건부 요청 (ETag / If-None-Match → 304)
+
+자주 조회되지만 거의 바뀌지 않는 GET 응답(채팅방 목록/상세, 프로필)에 사용합니다.
+채팅방 상세/프로필의 ETag는 응답 본문이 아니라 변경 시각(updated_at), 최신 메시지 id 같은
+가벼운 검증 값으로 만들기 때문에, 일치하면 참여자/메시지 조회와 직렬화를 하기 전에 304로
+응답할 수 있습니다. 응답 캐시에 본문이 있는 목록/검색은 본문 해시(body_etag)를 사용합니다.
+
+- ETag는 약한 ETag(W/"...")로 발급합니다. 본문이 아니라 의미상 같은 표현을 나타내고,
+  CompressionMiddleware가 인코딩별로 바꾸지 않아도 되기 때문입니다.
+- Cache-Control은 라우트마다 CachePolicy로 지정합니다 (Settings.HTTP_CACHE_CONTROL_*).
+- 결과는 http_cache_requests{route,result} 카운터와 http_cache_hit_ratio 게이지로 노출합니다.
+
+사용 예:
+    etag = make_etag(chatroom.updated_at, latest_message_id)
+    not_modified = CHATROOM_DETAIL_CACHE.check(request, etag)
+    if not_modified is not None:
+        return not_modified
+    ...
+    return CHATROOM_DETAIL_CACHE.apply(model_response(...), etag)
+"""
+from fastapi import Request
+from starlette.responses import Response
+from typing import Any, Dict, Optional
+import hashlib
+
+from app.core.config import settings
+from app.core.metrics import http_cache_requests, registry
+
+
+def make_etag(*parts: Any) -> str:
+    """검증 값들로 약한 ETag를 만듭니다. (datetime 등은 str()로 표현)"""
+    digest = hashlib.blake2b(digest_size=12)
+    for part in parts:
+        digest.update(str(part).encode("utf-8"))
+        digest.update(b"\x1f")
+    return f'W/"{digest.hexdigest()}"'
+
+
+def body_etag(body: bytes) -> str:
+    """이미 만들어 둔 응답 본문(응답 캐시 항목)의 ETag"""
+    return f'W/"{hashlib.blake2b(body, digest_size=12).hexdigest()}"'
+
+
+def _opaque_tag(etag: str) -> str:
+    return etag[2:] if etag.startswith("W/") else etag
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """If-None-Match 헤더가 etag와 일치하는지 (약한 비교, RFC 9110 13.1.2)"""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    target = _opaque_tag(etag)
+    return any(_opaque_tag(tag.strip()) == target for tag in if_none_match.split(","))
+
+
+class CachePolicy:
+    """라우트별 Cache-Control과 조건부 요청 처리"""
+
+    def __init__(self, route: str, cache_control: str):
+        self.route = route
+        self.cache_control = cache_control
+
+    def headers(self, etag: str) -> Dict[str, str]:
+        return {"ETag": etag, "Cache-Control": self.cache_control}
+
+    def check(self, request: Request, etag: str) -> Optional[Response]:
+        """If-None-Match가 etag와 일치하면 304 응답을, 아니면 None을 반환합니다."""
+        if_none_match = request.headers.get("if-none-match")
+        if etag_matches(if_none_match, etag):
+            http_cache_requests.labels(self.route, "hit").inc()
+            return Response(status_code=304, headers=self.headers(etag))
+        http_cache_requests.labels(self.route, "miss" if if_none_match else "unconditional").inc()
+        return None
+
+    def apply(self, response: Response, etag: str) -> Response:
+        response.headers.update(self.headers(etag))
+        return response
+
+
+CHATROOM_LIST_CACHE = CachePolicy("chatroom_list", settings.HTTP_CACHE_CONTROL_CHATROOM_LIST)
+CHATROOM_SEARCH_CACHE = CachePolicy("chatroom_search", settings.HTTP_CACHE_CONTROL_CHATROOM_LIST)
+CHATROOM_DETAIL_CACHE = CachePolicy("chatroom_detail", settings.HTTP_CACHE_CONTROL_CHATROOM_DETAIL)
+PROFILE_CACHE = CachePolicy("user_profile", settings.HTTP_CACHE_CONTROL_PROFILE)
+
+
+def _hit_ratios():
+    totals: Dict[str, float] = {}
+    hits: Dict[str, float] = {}
+    for (route, result), value in http_cache_requests.samples():
+        totals[route] = totals.get(route, 0.0) + value
+        if result == "hit":
+            hits[route] = hits.get(route, 0.0) + value
+    return [((route,), hits.get(route, 0.0) / total) for route, total in totals.items() if total]
+
+
+# 메트릭: 라우트별 304 비율 (프로세스 시작 이후 누적)
+registry.callback_gauge(
+    "http_cache_hit_ratio", "Share of cacheable GET requests answered with 304 Not Modified", ("route",),
+    _hit_ratios
+)
@@ -0,0 +1,171 @@
+# app/core/logging_config.py
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
+from datetime import datetime, timezone
+from typing import Dict, Optional
+import atexit
+import json
+import logging
+import queue
+import random
+import time
+
+from app.core.config import settings
+
+LOG_FORMAT = "%(asctime)s - %(name)s - %(levelname)s - %(message)s"
+
+# JSON 출력에서 제외할 LogRecord 기본 속성 (나머지는 extra 필드로 출력)
+_RESERVED_ATTRS = frozenset(vars(logging.LogRecord("", 0, "", 0, "", (), None))) | {"message", "asctime"}
+
+_listener: Optional[QueueListener] = None
+
+
+class DeferredQueueHandler(QueueHandler):
+    """
+    레코드를 큐에 넣기만 하는 핸들러.
+
+    기본 QueueHandler는 호출한 스레드에서 메시지를 포맷하지만, 같은 프로세스의
+    리스너 스레드가 소비하므로 포맷과 디스크 쓰기를 모두 리스너 스레드로 미룹니다.
+    """
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        return record
+
+
+class JSONFormatter(logging.Formatter):
+    """한 줄에 하나의 JSON 객체로 출력하는 구조화 로그 포매터"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "ts": datetime.fromtimestamp(record.created, tz=timezone.utc).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        for key, value in record.__dict__.items():
+            if key not in _RESERVED_ATTRS and not key.startswith("_"):
+                entry[key] = value
+        if record.exc_info:
+            entry["exc_info"] = self.formatException(record.exc_info)
+        return json.dumps(entry, ensure_ascii=False, default=str)
+
+
+class SamplingFilter(logging.Filter):
+    """
+    로거별 샘플링 필터.
+
+    rates는 {로거 이름 접두사: 통과 비율(0~1)} 이며 가장 긴 접두사가 적용됩니다.
+    WARNING 이상은 항상 통과합니다.
+    """
+
+    def __init__(self, rates: Dict[str, float]):
+        super().__init__()
+        self.rates = rates
+        self._resolved: Dict[str, float] = {}
+
+    def _rate_for(self, name: str) -> float:
+        rate = self._resolved.get(name)
+        if rate is None:
+            rate = 1.0
+            matched = -1
+            for prefix, prefix_rate in self.rates.items():
+                if (name == prefix or name.startswith(prefix + ".")) and len(prefix) > matched:
+                    rate, matched = prefix_rate, len(prefix)
+            self._resolved[name] = rate
+        return rate
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno >= logging.WARNING:
+            return True
+        rate = self._rate_for(record.name)
+        return rate >= 1.0 or random.random() < rate
+
+
+class SizeAndTimeRotatingFileHandler(RotatingFileHandler):
+    """크기(maxBytes) 또는 시간 간격(interval_seconds) 중 먼저 도달한 조건으로 회전하는 파일 핸들러"""
+
+    def __init__(self, filename: str, max_bytes: int, backup_count: int, interval_seconds: float):
+        super().__init__(filename, maxBytes=max_bytes, backupCount=backup_count, encoding="utf-8", delay=True)
+        self.interval_seconds = interval_seconds
+        self.next_rollover = time.time() + interval_seconds if interval_seconds > 0 else None
+
+    def shouldRollover(self, record: logging.LogRecord) -> bool:
+        if self.next_rollover is not None and record.created >= self.next_rollover:
+            return True
+        return bool(super().shouldRollover(record))
+
+    def doRollover(self):
+        super().doRollover()
+        if self.next_rollover is not None:
+            self.next_rollover = time.time() + self.interval_seconds
+
+
+def parse_sampling(spec: str) -> Dict[str, float]:
+    """'app.core.firebase=0.01,mhp-api.access=0.1' 형식을 파싱합니다."""
+    rates = {}
+    for item in spec.split(","):
+        if "=" in item:
+            name, rate = item.split("=", 1)
+            rates[name.strip()] = min(1.0, max(0.0, float(rate)))
+    return rates
+
+
+def setup_logging(
+    level: Optional[str] = None,
+    log_file: Optional[str] = None,
+    log_format: Optional[str] = None
+) -> QueueListener:
+    """
+    루트 로거를 큐 기반으로 설정합니다.
+
+    이벤트 루프 스레드에서는 샘플링 필터를 거쳐 큐에 넣기만 하고, 포맷과
+    콘솔/파일 출력(회전 포함)은 QueueListener 스레드에서 처리합니다.
+    uvicorn 로거도 같은 큐로 보냅니다. 여러 번 호출해도 한 번만 설정됩니다.
+    """
+    global _listener
+    if _listener is not None:
+        return _listener
+
+    level = level or settings.LOG_LEVEL
+    log_file = log_file or settings.LOG_FILE
+    log_format = log_format or settings.LOG_FORMAT
+
+    formatter = JSONFormatter() if log_format == "json" else logging.Formatter(LOG_FORMAT)
+    stream_handler = logging.StreamHandler()
+    file_handler = SizeAndTimeRotatingFileHandler(
+        log_file,
+        max_bytes=settings.LOG_MAX_BYTES,
+        backup_count=settings.LOG_BACKUP_COUNT,
+        interval_seconds=settings.LOG_ROTATE_INTERVAL_HOURS * 3600
+    )
+    for handler in (stream_handler, file_handler):
+        handler.setFormatter(formatter)
+
+    log_queue: queue.SimpleQueue = queue.SimpleQueue()
+    queue_handler = DeferredQueueHandler(log_queue)
+    sampling = parse_sampling(settings.LOG_SAMPLING)
+    if sampling:
+        queue_handler.addFilter(SamplingFilter(sampling))
+
+    root = logging.getLogger()
+    root.handlers = [queue_handler]
+    root.setLevel(level)
+
+    # uvicorn 로거도 큐로 (접근 로그는 TimingMiddleware가 기록하므로 경고 이상만)
+    for name in ("uvicorn", "uvicorn.error", "uvicorn.access"):
+        uvicorn_logger = logging.getLogger(name)
+        uvicorn_logger.handlers = []
+        uvicorn_logger.propagate = True
+    logging.getLogger("uvicorn.access").setLevel(logging.WARNING)
+
+    _listener = QueueListener(log_queue, stream_handler, file_handler, respect_handler_level=True)
+    _listener.start()
+    atexit.register(stop_logging)
+    return _listener
+
+
+def stop_logging():
+    """큐에 남은 로그를 모두 출력하고 리스너를 종료합니다."""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
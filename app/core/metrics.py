@@ -0,0 +1,306 @@
+# app/core/metrics.py
+"""
+프로세스 내 메트릭 레지스트리 (Prometheus 텍스트 형식)
+
+외부 의존성 없이 Counter / Gauge / Histogram을 제공하고 /metrics 에서 텍스트로 노출합니다.
+레이블은 라우트 템플릿, 상태 코드 계열처럼 값의 종류가 적은 것만 사용하며,
+메트릭마다 시계열 수 상한(max_series)을 넘는 레이블 조합은 "other"로 합칩니다.
+값은 워커 프로세스 단위입니다.
+"""
+from contextvars import ContextVar
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+import math
+import threading
+
+CONTENT_TYPE_LATEST = "text/plain; version=0.0.4; charset=utf-8"
+
+DEFAULT_LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+DEFAULT_COUNT_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100, 200)
+
+OVERFLOW_LABEL = "other"
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _format_value(value: float) -> str:
+    if value == math.inf:
+        return "+Inf"
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return repr(value)
+
+
+class _Metric:
+    metric_type = "untyped"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (), max_series: int = 500):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.max_series = max_series
+        self._lock = threading.Lock()
+        self._series: Dict[Tuple[str, ...], object] = {}
+
+    def _new_child(self):
+        raise NotImplementedError
+
+    def labels(self, *values: str):
+        key = tuple(str(value) for value in values)
+        child = self._series.get(key)
+        if child is None:
+            with self._lock:
+                child = self._series.get(key)
+                if child is None:
+                    if len(self._series) >= self.max_series:
+                        key = (OVERFLOW_LABEL,) * len(self.labelnames)
+                        child = self._series.get(key)
+                    if child is None:
+                        child = self._series[key] = self._new_child()
+        return child
+
+    def _header(self) -> List[str]:
+        return [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.metric_type}"]
+
+    def render(self) -> List[str]:
+        raise NotImplementedError
+
+
+class _CounterChild:
+    __slots__ = ("value", "_lock")
+
+    def __init__(self):
+        self.value = 0.0
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1.0):
+        with self._lock:
+            self.value += amount
+
+
+class Counter(_Metric):
+    metric_type = "counter"
+
+    def _new_child(self):
+        return _CounterChild()
+
+    def inc(self, amount: float = 1.0):
+        self.labels().inc(amount)
+
+    def samples(self) -> List[Tuple[Tuple[str, ...], float]]:
+        """(레이블 값, 누적값) 목록 (다른 메트릭을 계산할 때 사용)"""
+        return [(key, child.value) for key, child in list(self._series.items())]
+
+    def render(self) -> List[str]:
+        lines = self._header()
+        for key, child in list(self._series.items()):
+            lines.append(f"{self.name}_total{_format_labels(self.labelnames, key)} {_format_value(child.value)}")
+        return lines
+
+
+class _GaugeChild:
+    __slots__ = ("value",)
+
+    def __init__(self):
+        self.value = 0.0
+
+    def set(self, value: float):
+        self.value = value
+
+
+class Gauge(_Metric):
+    metric_type = "gauge"
+
+    def _new_child(self):
+        return _GaugeChild()
+
+    def set(self, value: float):
+        self.labels().set(value)
+
+    def render(self) -> List[str]:
+        lines = self._header()
+        for key, child in list(self._series.items()):
+            lines.append(f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(child.value)}")
+        return lines
+
+
+class CallbackGauge(_Metric):
+    """수집 시점에 콜백으로 값을 읽는 게이지 (예: 채팅방별 접속 수)"""
+
+    metric_type = "gauge"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str],
+        callback: Callable[[], Iterable[Tuple[Sequence[str], float]]]
+    ):
+        super().__init__(name, documentation, labelnames)
+        self.callback = callback
+
+    def render(self) -> List[str]:
+        lines = self._header()
+        for values, value in self.callback():
+            lines.append(f"{self.name}{_format_labels(self.labelnames, values)} {_format_value(float(value))}")
+        return lines
+
+
+class _HistogramChild:
+    __slots__ = ("buckets", "counts", "sum", "count", "_lock")
+
+    def __init__(self, buckets: Tuple[float, ...]):
+        self.buckets = buckets
+        self.counts = [0] * len(buckets)
+        self.sum = 0.0
+        self.count = 0
+        self._lock = threading.Lock()
+
+    def observe(self, value: float):
+        with self._lock:
+            self.sum += value
+            self.count += 1
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    self.counts[i] += 1
+                    break
+
+
+class Histogram(_Metric):
+    metric_type = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_LATENCY_BUCKETS,
+        max_series: int = 500
+    ):
+        super().__init__(name, documentation, labelnames, max_series)
+        self.buckets = tuple(sorted(buckets))
+
+    def _new_child(self):
+        return _HistogramChild(self.buckets)
+
+    def observe(self, value: float):
+        self.labels().observe(value)
+
+    def render(self) -> List[str]:
+        lines = self._header()
+        for key, child in list(self._series.items()):
+            with child._lock:
+                counts, total, count = list(child.counts), child.sum, child.count
+            inf_le = 'le="+Inf"'
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets, counts):
+                cumulative += bucket_count
+                le = f'le="{_format_value(float(bound))}"'
+                lines.append(f"{self.name}_bucket{_format_labels(self.labelnames, key, le)} {cumulative}")
+            lines.append(f"{self.name}_bucket{_format_labels(self.labelnames, key, inf_le)} {count}")
+            lines.append(f"{self.name}_sum{_format_labels(self.labelnames, key)} {_format_value(total)}")
+            lines.append(f"{self.name}_count{_format_labels(self.labelnames, key)} {count}")
+        return lines
+
+
+class MetricsRegistry:
+    def __init__(self):
+        self._metrics: Dict[str, _Metric] = {}
+
+    def register(self, metric: _Metric) -> _Metric:
+        if metric.name in self._metrics:
+            raise ValueError(f"Metric already registered: {metric.name}")
+        self._metrics[metric.name] = metric
+        # 레이블이 없는 메트릭은 관측 전에도 0으로 노출
+        if not metric.labelnames and not isinstance(metric, CallbackGauge):
+            metric.labels()
+        return metric
+
+    def counter(self, name: str, documentation: str, labelnames: Sequence[str] = (), **kwargs) -> Counter:
+        return self.register(Counter(name, documentation, labelnames, **kwargs))
+
+    def gauge(self, name: str, documentation: str, labelnames: Sequence[str] = (), **kwargs) -> Gauge:
+        return self.register(Gauge(name, documentation, labelnames, **kwargs))
+
+    def histogram(self, name: str, documentation: str, labelnames: Sequence[str] = (), **kwargs) -> Histogram:
+        return self.register(Histogram(name, documentation, labelnames, **kwargs))
+
+    def callback_gauge(self, name: str, documentation: str, labelnames: Sequence[str], callback) -> CallbackGauge:
+        return self.register(CallbackGauge(name, documentation, labelnames, callback))
+
+    def render(self) -> str:
+        lines: List[str] = []
+        for metric in self._metrics.values():
+            try:
+                lines.extend(metric.render())
+            except Exception as e:
+                lines.append(f"# {metric.name} collection failed: {_escape(str(e))}")
+        return "\n".join(lines) + "\n"
+
+
+# 글로벌 레지스트리
+registry = MetricsRegistry()
+
+# HTTP (TimingMiddleware)
+http_requests = registry.counter(
+    "http_requests", "HTTP requests by route template and status", ("method", "route", "status")
+)
+http_request_duration = registry.histogram(
+    "http_request_duration_seconds", "HTTP request latency by route template", ("method", "route")
+)
+http_request_queries = registry.histogram(
+    "http_request_db_queries", "SQL statements executed per HTTP request", ("method", "route"),
+    buckets=DEFAULT_COUNT_BUCKETS
+)
+
+# HTTP 조건부 요청 (app.core.http_cache, result: hit=304 | miss=ETag 불일치 | unconditional)
+http_cache_requests = registry.counter(
+    "http_cache_requests", "Cacheable GET requests by ETag validation result", ("route", "result")
+)
+
+# 공개 응답 캐시 (app.core.response_cache, result: hit | shared_hit | miss)
+response_cache_requests = registry.counter(
+    "response_cache_requests", "Response cache lookups by namespace and result", ("namespace", "result")
+)
+
+# 동일 조회 합치기 (app.core.single_flight, result: leader=실제 로드 | coalesced=진행 중인 로드에 합류)
+single_flight_calls = registry.counter(
+    "single_flight_calls", "Single-flight calls by name and whether they ran the load", ("name", "result")
+)
+
+# WebSocket
+ws_broadcast_duration = registry.histogram(
+    "ws_broadcast_duration_seconds", "Time to fan a message out to every socket in a room"
+)
+ws_broadcast_recipients = registry.histogram(
+    "ws_broadcast_recipients", "Sockets per room broadcast",
+    buckets=(1, 2, 5, 10, 25, 50, 100, 250, 500, 1000)
+)
+
+# 인증
+token_verify_duration = registry.histogram(
+    "auth_token_verify_duration_seconds", "ID token verification latency", ("result",)
+)
+
+# DB
+db_pool_checkout_wait = registry.histogram(
+    "db_pool_checkout_wait_seconds", "Time spent waiting for a pooled connection",
+    buckets=(0.0001, 0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0, 30.0)
+)
+
+# 요청별 SQL 실행 수 (TimingMiddleware가 요청마다 [0]을 설정, SQL 이벤트에서 증가)
+request_query_count: ContextVar[Optional[List[int]]] = ContextVar("request_query_count", default=None)
+
+
+def count_query():
+    counter = request_query_count.get()
+    if counter is not None:
+        counter[0] += 1
@@ -0,0 +1,85 @@
+# app/core/middleware.py
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+from app.core.metrics import http_request_duration, http_request_queries, http_requests, request_query_count
+from app.core.responses import UnicodeJSONResponse
+import logging
+import time
+
+logger = logging.getLogger("mhp-api.access")
+
+
+def route_template(scope: Scope, root_path: str = "") -> str:
+    """
+    매칭된 라우트의 경로 템플릿 (/api/chat/{room_id})을 반환합니다.
+
+    라우터가 scope에 기록한 route를 사용하므로 요청이 처리된 뒤에 호출해야 합니다.
+    마운트된 앱(/static 등)은 마운트 경로로, 매칭되지 않은 요청은 "unmatched"로 묶습니다.
+    """
+    route = scope.get("route")
+    if route is not None:
+        return getattr(route, "path_format", None) or getattr(route, "path", "unmatched")
+    mount_path = scope.get("root_path", "")
+    if mount_path != root_path:
+        return mount_path[len(root_path):] + "/{path}"
+    return "unmatched"
+
+
+class TimingMiddleware:
+    """
+    요청 메서드, 라우트 템플릿, 상태 코드, 처리 시간을 기록하는 순수 ASGI 미들웨어.
+
+    BaseHTTPMiddleware와 달리 요청마다 태스크/메모리 스트림을 만들지 않고
+    send만 감싸서 응답 시작 시 상태 코드를 읽습니다.
+    같은 값으로 라우트별 요청 수/지연 시간/SQL 실행 수 메트릭을 기록합니다.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        start_time = time.perf_counter()
+        root_path = scope.get("root_path", "")
+        status_code = 500
+        response_started = False
+        query_count = [0]
+        token = request_query_count.set(query_count)
+
+        async def send_wrapper(message: Message):
+            nonlocal status_code, response_started
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                response_started = True
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        except Exception as e:
+            duration = time.perf_counter() - start_time
+            route = route_template(scope, root_path)
+            self._observe(scope["method"], route, 500, duration, query_count[0])
+            logger.error(f"{scope['method']} {route} 오류: {str(e)} ({duration:.3f}s)")
+            if response_started:
+                raise
+            response = UnicodeJSONResponse(
+                status_code=500,
+                content={"detail": "Internal server error"}
+            )
+            await response(scope, receive, send)
+            return
+        finally:
+            request_query_count.reset(token)
+
+        duration = time.perf_counter() - start_time
+        route = route_template(scope, root_path)
+        self._observe(scope["method"], route, status_code, duration, query_count[0])
+        logger.info(f"{scope['method']} {route} {status_code} ({duration * 1000:.1f}ms)")
+
+    @staticmethod
+    def _observe(method: str, route: str, status_code: int, duration: float, queries: int):
+        http_requests.labels(method, route, status_code).inc()
+        http_request_duration.labels(method, route).observe(duration)
+        http_request_queries.labels(method, route).observe(queries)
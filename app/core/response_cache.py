@@ -0,0 +1,290 @@
+# app/core/response_cache.py
+"""
+공개 응답 캐시 (채팅방 목록/검색처럼 모든 호출자에게 같은 응답)
+
+- 키: 네임스페이스 + 정규화한 쿼리 파라미터 (None 제외, 이름순 정렬)
+- 1단계: 프로세스 내 LRU (RESPONSE_CACHE_MAX_ENTRIES, RESPONSE_CACHE_TTL_SECONDS)
+- 2단계(선택): Redis (RESPONSE_CACHE_REDIS_URL, redis 패키지 필요) - 워커/인스턴스 간 공유
+- 무효화: 채팅방 생성/참여/나가기/삭제, 메시지 생성 등 변경 이벤트에서 invalidate(namespace)를
+  호출하면 네임스페이스의 세대(generation)가 올라가 이전 항목은 더 이상 조회되지 않습니다.
+  Redis를 사용하면 세대를 Redis에서 올리고 pub/sub으로 다른 워커에 알립니다.
+  호출한 쪽(이벤트 루프 포함)에서는 로컬 세대만 올리고, Redis INCR/PUBLISH는 백그라운드
+  스레드가 모아서 보냅니다. 보내기 전까지 이 워커는 해당 네임스페이스의 공유 캐시를 건너뜁니다.
+- 잦은 변경은 invalidate(namespace, delay=...)로 delay 동안의 무효화를 한 번으로 묶을 수 있습니다.
+  메시지 생성은 채팅방 카드 갱신(app.utils.room_cards.room_card_refresher)이 delay 동안 모은 뒤
+  한 번 무효화하므로, 목록의 최근 메시지는 최대 delay만큼 늦게 보일 수 있지만 메시지마다
+  목록 캐시 전체가 비워져 항상 미스가 나는 것을 막습니다.
+- 같은 키의 캐시 미스가 동시에 몰리면 한 요청만 응답을 만들고 나머지는 그 결과를 기다립니다.
+  (SingleFlight, 이름 "response_cache")
+
+TTL은 이벤트로 잡지 못하는 변경(직접 SQL 수정 등)에 대한 안전장치입니다.
+"""
+from collections import OrderedDict
+from fastapi.concurrency import run_in_threadpool
+from typing import Any, Callable, Dict, NamedTuple, Optional, Set, Tuple
+import hashlib
+import logging
+import threading
+import time
+
+from app.core.config import settings
+from app.core.metrics import response_cache_requests
+from app.core.single_flight import SingleFlight
+
+try:
+    import redis
+except ImportError:  # 선택 의존성 (공유 캐시를 쓸 때만 필요)
+    redis = None
+
+logger = logging.getLogger(__name__)
+
+# 채팅방 목록 / 검색 응답 (참여자 프로필과 최근 메시지 포함)
+CHATROOM_LISTINGS = "chatrooms"
+
+
+class CachedResponse(NamedTuple):
+    body: bytes
+    etag: str
+
+
+def cache_key(params: Dict[str, Any]) -> str:
+    """쿼리 파라미터를 정규화한 키 (순서 무관, None 제외)"""
+    normalized = "&".join(f"{name}={params[name]}" for name in sorted(params) if params[name] is not None)
+    return hashlib.blake2b(normalized.encode("utf-8"), digest_size=16).hexdigest()
+
+
+class ResponseCache:
+    def __init__(
+        self,
+        max_entries: int,
+        ttl_seconds: float,
+        redis_url: str = "",
+        key_prefix: str = "mhp:response-cache"
+    ):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.key_prefix = key_prefix
+        self._lock = threading.Lock()
+        # (namespace, generation, key) → (만료 시각, 응답)
+        self._entries: "OrderedDict[Tuple[str, str, str], Tuple[float, CachedResponse]]" = OrderedDict()
+        self._local_generations: Dict[str, int] = {}
+        self._shared_generations: Dict[str, int] = {}
+        self._flight = SingleFlight("response_cache")
+        # 무효화 작업 스레드: 지연 무효화(namespace → 적용 시각)와 Redis에 보낼 네임스페이스
+        self._deferred: Dict[str, float] = {}
+        self._publish_pending: Set[str] = set()
+        self._publishing: Set[str] = set()
+        self._wakeup = threading.Event()
+        self._worker: Optional[threading.Thread] = None
+        self._stopping = False
+
+        self._redis = None
+        self._pubsub_thread = None
+        if redis_url:
+            if redis is None:
+                logger.warning("RESPONSE_CACHE_REDIS_URL이 설정되었지만 redis 패키지가 없어 로컬 캐시만 사용합니다.")
+            else:
+                self._redis = redis.Redis.from_url(redis_url, socket_timeout=0.5, socket_connect_timeout=0.5)
+
+    @property
+    def channel(self) -> str:
+        return f"{self.key_prefix}:invalidate"
+
+    def start(self):
+        """다른 워커의 무효화 이벤트 구독 시작 (Redis를 사용할 때만)"""
+        if self._redis is None or self._pubsub_thread is not None:
+            return
+        try:
+            pubsub = self._redis.pubsub(ignore_subscribe_messages=True)
+            pubsub.subscribe(**{self.channel: self._on_invalidate_message})
+            self._pubsub_thread = pubsub.run_in_thread(sleep_time=1.0, daemon=True)
+        except Exception as e:
+            logger.warning(f"응답 캐시 무효화 구독 실패, 로컬 캐시만 사용합니다: {str(e)}")
+            self._redis = None
+
+    def stop(self):
+        if self._pubsub_thread is not None:
+            self._pubsub_thread.stop()
+            self._pubsub_thread = None
+        if self._worker is not None:
+            self._stopping = True
+            self._wakeup.set()
+            self._worker.join(timeout=2.0)
+            self._worker = None
+            self._stopping = False
+
+    def _on_invalidate_message(self, message):
+        namespace, _, generation = message["data"].decode("utf-8").rpartition(":")
+        with self._lock:
+            self._shared_generations[namespace] = max(self._shared_generations.get(namespace, 0), int(generation))
+            self._local_generations[namespace] = self._local_generations.get(namespace, 0) + 1
+
+    def invalidate(self, namespace: str, delay: float = 0.0):
+        """
+        namespace의 모든 캐시 항목을 무효화합니다. 네트워크 호출 없이 바로 반환하므로
+        이벤트 루프와 스레드풀(WebSocket 메시지 저장 등) 어디서든 호출할 수 있습니다.
+
+        delay > 0이면 delay 안에 들어온 무효화를 묶어 delay 뒤에 한 번 적용합니다.
+        """
+        if delay > 0:
+            with self._lock:
+                self._deferred.setdefault(namespace, time.monotonic() + delay)
+            self._wake_worker()
+            return
+        with self._lock:
+            self._local_generations[namespace] = self._local_generations.get(namespace, 0) + 1
+            if self._redis is None:
+                return
+            self._publish_pending.add(namespace)
+        self._wake_worker()
+
+    def _wake_worker(self):
+        with self._lock:
+            if self._worker is None:
+                self._worker = threading.Thread(target=self._run_worker, name="response-cache-invalidate", daemon=True)
+                self._worker.start()
+        self._wakeup.set()
+
+    def _run_worker(self):
+        """지연 무효화를 적용하고 Redis 세대 증가/알림을 보내는 백그라운드 스레드"""
+        timeout = None
+        while True:
+            self._wakeup.wait(timeout)
+            self._wakeup.clear()
+            if self._stopping:
+                return
+
+            with self._lock:
+                now = time.monotonic()
+                due = [namespace for namespace, at in self._deferred.items() if at <= now]
+                for namespace in due:
+                    del self._deferred[namespace]
+            for namespace in due:
+                self.invalidate(namespace)
+
+            with self._lock:
+                self._publishing, self._publish_pending = self._publish_pending, set()
+            for namespace in self._publishing:
+                self._publish(namespace)
+            with self._lock:
+                self._publishing = set()
+                next_at = min(self._deferred.values(), default=None)
+            timeout = None if next_at is None else max(0.0, next_at - time.monotonic())
+
+    def _publish(self, namespace: str):
+        try:
+            generation = self._redis.incr(f"{self.key_prefix}:{namespace}:generation")
+            with self._lock:
+                self._shared_generations[namespace] = max(self._shared_generations.get(namespace, 0), generation)
+            self._redis.publish(self.channel, f"{namespace}:{generation}")
+        except Exception as e:
+            logger.warning(f"공유 응답 캐시 무효화 실패 ({namespace}): {str(e)}")
+
+    def _shared_pending(self, namespace: str) -> bool:
+        """무효화를 아직 Redis에 보내지 못해 공유 캐시의 세대가 낡았는지"""
+        with self._lock:
+            return namespace in self._publish_pending or namespace in self._publishing
+
+    def _shared_generation(self, namespace: str) -> int:
+        """(스레드풀에서 호출, 처음 한 번만 Redis 조회)"""
+        generation = self._shared_generations.get(namespace)
+        if generation is None:
+            generation = int(self._redis.get(f"{self.key_prefix}:{namespace}:generation") or 0)
+            with self._lock:
+                generation = self._shared_generations.setdefault(namespace, generation)
+        return generation
+
+    def _get_local(self, slot) -> Optional[CachedResponse]:
+        with self._lock:
+            item = self._entries.get(slot)
+            if item is None:
+                return None
+            expires_at, response = item
+            if expires_at < time.monotonic():
+                del self._entries[slot]
+                return None
+            self._entries.move_to_end(slot)
+            return response
+
+    def _put_local(self, slot, response: CachedResponse):
+        with self._lock:
+            self._entries[slot] = (time.monotonic() + self.ttl_seconds, response)
+            self._entries.move_to_end(slot)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def _get_shared(self, namespace: str, key: str) -> Tuple[int, Optional[CachedResponse]]:
+        """(공유 세대, 공유 캐시 응답) - 스레드풀에서 호출"""
+        generation = self._shared_generation(namespace)
+        value = self._redis.get(f"{self.key_prefix}:{namespace}:{generation}:{key}")
+        if value is None:
+            return generation, None
+        etag, _, body = value.partition(b"\n")
+        return generation, CachedResponse(body=body, etag=etag.decode("ascii"))
+
+    def _put_shared(self, namespace: str, key: str, generation: int, response: CachedResponse):
+        self._redis.setex(
+            f"{self.key_prefix}:{namespace}:{generation}:{key}",
+            max(1, int(self.ttl_seconds)),
+            response.etag.encode("ascii") + b"\n" + response.body
+        )
+
+    async def get_or_build(
+        self,
+        namespace: str,
+        params: Dict[str, Any],
+        build: Callable[[], CachedResponse]
+    ) -> CachedResponse:
+        """
+        캐시된 응답을 반환하고, 없으면 build()를 스레드풀에서 한 번만 실행해 채웁니다.
+        build는 DB 세션을 사용하는 동기 함수입니다.
+        """
+        key = cache_key(params)
+        slot = (namespace, str(self._local_generations.get(namespace, 0)), key)
+        response = self._get_local(slot)
+        if response is not None:
+            response_cache_requests.labels(namespace, "hit").inc()
+            return response
+
+        return await self._flight.run(slot, lambda: self._load(namespace, key, slot, build))
+
+    async def _load(self, namespace: str, key: str, slot, build: Callable[[], CachedResponse]) -> CachedResponse:
+        shared_generation = None
+        if self._redis is not None and not self._shared_pending(namespace):
+            try:
+                shared_generation, response = await run_in_threadpool(self._get_shared, namespace, key)
+                if response is not None:
+                    response_cache_requests.labels(namespace, "shared_hit").inc()
+                    self._put_local(slot, response)
+                    return response
+            except Exception as e:
+                logger.warning(f"공유 응답 캐시 조회 실패 ({namespace}): {str(e)}")
+                shared_generation = None
+
+        response_cache_requests.labels(namespace, "miss").inc()
+        response = await run_in_threadpool(build)
+        self._put_local(slot, response)
+        if shared_generation is not None:
+            try:
+                await run_in_threadpool(self._put_shared, namespace, key, shared_generation, response)
+            except Exception as e:
+                logger.warning(f"공유 응답 캐시 저장 실패 ({namespace}): {str(e)}")
+        return response
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "inflight": self._flight.in_flight,
+                "generations": dict(self._local_generations),
+                "deferred": len(self._deferred),
+                "shared": self._redis is not None
+            }
+
+
+# 글로벌 응답 캐시
+response_cache = ResponseCache(
+    max_entries=settings.RESPONSE_CACHE_MAX_ENTRIES,
+    ttl_seconds=settings.RESPONSE_CACHE_TTL_SECONDS,
+    redis_url=settings.RESPONSE_CACHE_REDIS_URL
+)
@@ -0,0 +1,60 @@
+# app/core/responses.py
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel, TypeAdapter
+from functools import lru_cache
+from typing import Any, Optional, Sequence, Type, Union
+import orjson
+
+JSON_MEDIA_TYPE = "application/json; charset=utf-8"
+
+
+def _orjson_default(value: Any) -> Any:
+    """orjson이 기본으로 처리하지 못하는 타입 변환"""
+    if isinstance(value, BaseModel):
+        return value.model_dump(mode="json", by_alias=True)
+    if isinstance(value, (set, frozenset)):
+        return list(value)
+    raise TypeError(f"Type is not JSON serializable: {type(value).__name__}")
+
+
+def dumps(content: Any) -> bytes:
+    """한국어 등 유니코드 문자를 이스케이프하지 않는 UTF-8 JSON 직렬화"""
+    return orjson.dumps(content, default=_orjson_default, option=orjson.OPT_NON_STR_KEYS)
+
+
+# 프로젝트 전체 기본 JSON Response 클래스 - 한국어 처리 + orjson
+class UnicodeJSONResponse(JSONResponse):
+    media_type = JSON_MEDIA_TYPE
+
+    def render(self, content) -> bytes:
+        if isinstance(content, bytes):
+            # 이미 직렬화된 본문 (model_response)
+            return content
+        return dumps(content)
+
+
+@lru_cache(maxsize=None)
+def _list_adapter(model_class: Type[BaseModel]) -> TypeAdapter:
+    return TypeAdapter(list[model_class])
+
+
+def model_response(
+    content: Union[BaseModel, Sequence[BaseModel]],
+    status_code: int = 200,
+    headers: Optional[dict] = None
+) -> UnicodeJSONResponse:
+    """
+    pydantic 모델(또는 같은 타입의 모델 목록)을 jsonable_encoder를 거치지 않고
+    pydantic 직렬화기로 바로 JSON 바이트로 만들어 응답합니다.
+
+    엔드포인트가 Response를 반환하면 response_model 재검증을 건너뛰므로,
+    이미 검증된 모델을 반환하는 목록/상세 엔드포인트에서 사용합니다.
+    (response_model은 OpenAPI 문서용으로 그대로 둠)
+    """
+    if isinstance(content, BaseModel):
+        body = content.model_dump_json(by_alias=True).encode("utf-8")
+    elif content:
+        body = _list_adapter(type(content[0])).dump_json(list(content), by_alias=True)
+    else:
+        body = b"[]"
+    return UnicodeJSONResponse(content=body, status_code=status_code, headers=headers)
@@ -0,0 +1,86 @@
+# app/core/single_flight.py
+"""
+동일한 조회 합치기 (single-flight)
+
+인기 채팅방이 열릴 때처럼 같은 조회가 동시에 수백 번 들어오면, 키가 같은 호출은
+먼저 시작된 한 번의 로드 결과를 함께 기다립니다. 로드는 별도 태스크에서 실행되므로
+먼저 요청한 클라이언트가 끊겨도 기다리는 다른 요청에는 영향이 없습니다.
+
+- 결과는 여러 요청이 공유하므로 ORM 객체가 아닌 값(pydantic 모델, dict, bytes)을 반환하고,
+  호출한 쪽에서 결과를 수정하지 않아야 합니다.
+- 로드는 요청의 세션(Depends(get_db))을 넘겨받지 말고 자체 세션을 열고 닫아야 합니다.
+  먼저 요청한 클라이언트의 세션은 그 요청이 끝날 때 닫히는데, 로드는 그 뒤에도 실행될 수 있습니다.
+- 로드가 끝나면 키는 바로 지워집니다 (결과를 캐시하지 않음).
+- 쓰기 직후에는 forget()으로 진행 중인 로드를 떼어내, 이후 요청이 쓰기 이전에 시작된
+  로드 결과를 받지 않도록 합니다.
+- 호출 수는 single_flight_calls{name,result=leader|coalesced}, 합쳐진 비율은
+  single_flight_coalesced_ratio{name}로 노출합니다.
+
+사용 예:
+    profile_flight = SingleFlight("user_profile")
+    profile = await profile_flight.run_sync(("profile", uid), load_profile, uid)  # load_profile이 세션을 직접 엶
+"""
+from fastapi.concurrency import run_in_threadpool
+from typing import Any, Awaitable, Callable, Dict, Hashable, Tuple, TypeVar
+import asyncio
+
+from app.core.metrics import registry, single_flight_calls
+
+T = TypeVar("T")
+
+
+class SingleFlight:
+    def __init__(self, name: str):
+        self.name = name
+        self._calls: Dict[Hashable, asyncio.Task] = {}
+
+    async def run(self, key: Hashable, load: Callable[[], Awaitable[T]]) -> T:
+        """key에 대해 진행 중인 load가 있으면 그 결과를, 없으면 load()를 시작해 결과를 반환합니다."""
+        task = self._calls.get(key)
+        if task is not None:
+            single_flight_calls.labels(self.name, "coalesced").inc()
+        else:
+            single_flight_calls.labels(self.name, "leader").inc()
+            task = asyncio.ensure_future(load())
+            self._calls[key] = task
+            task.add_done_callback(lambda done: self._finish(key, done))
+        return await asyncio.shield(task)
+
+    async def run_sync(self, key: Hashable, func: Callable[..., T], *args: Any) -> T:
+        """동기 함수(DB 조회)를 스레드풀에서 실행하는 run()"""
+        return await self.run(key, lambda: run_in_threadpool(func, *args))
+
+    def forget(self, *prefix: Any):
+        """
+        키가 prefix로 시작하는(튜플 키) 진행 중인 로드를 떼어냅니다. 이미 기다리는 요청은
+        그대로 결과를 받고, 이후 요청은 새로 로드합니다. 이벤트 루프에서 호출해야 합니다.
+        """
+        for key in list(self._calls):
+            if key[:len(prefix)] == prefix:
+                del self._calls[key]
+
+    def _finish(self, key: Hashable, task: asyncio.Task):
+        if self._calls.get(key) is task:
+            del self._calls[key]
+        if not task.cancelled():
+            # 기다리던 요청이 모두 취소된 경우 "Task exception was never retrieved" 경고 방지
+            task.exception()
+
+    @property
+    def in_flight(self) -> int:
+        return len(self._calls)
+
+
+def _coalesced_ratios():
+    counts: Dict[str, Tuple[float, float]] = {}
+    for (name, result), value in single_flight_calls.samples():
+        coalesced, total = counts.get(name, (0.0, 0.0))
+        counts[name] = (coalesced + (value if result == "coalesced" else 0.0), total + value)
+    return [((name,), coalesced / total) for name, (coalesced, total) in counts.items() if total]
+
+
+# 메트릭: 이름별 합쳐진 호출 비율 (프로세스 시작 이후 누적)
+registry.callback_gauge(
+    "single_flight_coalesced_ratio", "Share of calls that joined an in-flight identical load", ("name",),
+    _coalesced_ratios
+)
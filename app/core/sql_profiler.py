@@ -0,0 +1,159 @@
+# app/core/sql_profiler.py
+"""
+요청별 SQL 프로파일러 (개발/스테이징용, SQL_PROFILING_ENABLED)
+
+SQLAlchemy before/after_cursor_execute 이벤트로 요청마다 쿼리 수, DB 시간,
+리터럴을 제거한 문장 지문(fingerprint)별 실행 횟수를 모읍니다.
+응답에는 Server-Timing 헤더를 붙이고, 한 요청에서 같은 지문이
+SQL_PROFILING_REPEAT_THRESHOLD 회를 넘게 반복되면 N+1 의심 경고를 남깁니다.
+"""
+from collections import Counter
+from contextvars import ContextVar
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+from typing import Dict, List, Optional, Tuple
+import logging
+import re
+import time
+
+from app.core.config import settings
+from app.core.middleware import route_template
+
+logger = logging.getLogger(__name__)
+
+_STRING_LITERAL = re.compile(r"'(?:[^']|'')*'")
+_NUMBER_LITERAL = re.compile(r"\b\d+(?:\.\d+)?\b")
+_PARAM = r"(?:\?|%\(\w+\)s|%s|(?<!:):\w+)"
+_PARAM_LIST = re.compile(r"\(\s*" + _PARAM + r"(?:\s*,\s*" + _PARAM + r")*\s*\)")
+_PARAM_MARKER = re.compile(_PARAM)
+_WHITESPACE = re.compile(r"\s+")
+
+_installed = False
+
+
+def fingerprint(statement: str) -> str:
+    """
+    리터럴과 바인드 파라미터를 ?로 바꾸고 IN 목록을 하나로 접은 정규화 SQL을 반환합니다.
+
+    같은 쿼리를 다른 값으로 반복 실행하면 같은 지문이 됩니다.
+    """
+    normalized = _STRING_LITERAL.sub("?", statement)
+    normalized = _NUMBER_LITERAL.sub("?", normalized)
+    normalized = _PARAM_LIST.sub("(?)", normalized)
+    normalized = _PARAM_MARKER.sub("?", normalized)
+    return _WHITESPACE.sub(" ", normalized).strip()
+
+
+class QueryProfile:
+    """한 요청 동안 실행된 SQL 통계"""
+
+    __slots__ = ("count", "total_seconds", "fingerprints", "slowest")
+
+    def __init__(self):
+        self.count = 0
+        self.total_seconds = 0.0
+        self.fingerprints: Counter = Counter()
+        self.slowest: Tuple[float, str] = (0.0, "")
+
+    def record(self, statement: str, seconds: float):
+        self.count += 1
+        self.total_seconds += seconds
+        key = fingerprint(statement)
+        self.fingerprints[key] += 1
+        if seconds > self.slowest[0]:
+            self.slowest = (seconds, key)
+
+    def repeated(self, threshold: int) -> List[Tuple[str, int]]:
+        """threshold 회를 넘게 반복된 지문 목록 (많은 순)"""
+        return [(key, count) for key, count in self.fingerprints.most_common() if count > threshold]
+
+    def summary(self) -> Dict[str, object]:
+        return {
+            "queries": self.count,
+            "db_ms": round(self.total_seconds * 1000, 3),
+            "distinct": len(self.fingerprints),
+            "slowest_ms": round(self.slowest[0] * 1000, 3),
+            "slowest": self.slowest[1],
+        }
+
+    def server_timing(self) -> str:
+        return f'db;dur={self.total_seconds * 1000:.1f};desc="{self.count} queries"'
+
+
+current_profile: ContextVar[Optional[QueryProfile]] = ContextVar("current_profile", default=None)
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if current_profile.get() is not None:
+        conn.info.setdefault("query_start_time", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    profile = current_profile.get()
+    if profile is None:
+        return
+    starts = conn.info.get("query_start_time")
+    if starts:
+        profile.record(statement, time.perf_counter() - starts.pop())
+
+
+def install_sql_profiler():
+    """모든 엔진(primary/복제본)에 프로파일링 이벤트를 등록합니다. 여러 번 호출해도 한 번만 등록됩니다."""
+    global _installed
+    if _installed:
+        return
+    event.listen(Engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(Engine, "after_cursor_execute", _after_cursor_execute)
+    _installed = True
+
+
+class SQLProfilerMiddleware:
+    """
+    요청마다 QueryProfile을 만들어 SQL 통계를 모으는 순수 ASGI 미들웨어.
+
+    응답 시작 시점까지의 DB 시간을 Server-Timing 헤더로 내보내고(스트리밍 응답은
+    이후 쿼리가 빠짐), 요청이 끝나면 반복 지문을 경고로 기록합니다.
+    """
+
+    def __init__(self, app: ASGIApp, repeat_threshold: Optional[int] = None):
+        self.app = app
+        self.repeat_threshold = (
+            settings.SQL_PROFILING_REPEAT_THRESHOLD if repeat_threshold is None else repeat_threshold
+        )
+        install_sql_profiler()
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        profile = QueryProfile()
+        token = current_profile.set(profile)
+        root_path = scope.get("root_path", "")
+
+        async def send_wrapper(message: Message):
+            if message["type"] == "http.response.start":
+                MutableHeaders(scope=message).append("Server-Timing", profile.server_timing())
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            current_profile.reset(token)
+            if profile.count:
+                self._report(scope["method"], route_template(scope, root_path), profile)
+
+    def _report(self, method: str, route: str, profile: QueryProfile):
+        summary = profile.summary()
+        logger.debug(
+            f"{method} {route} SQL {summary['queries']}건 ({summary['db_ms']}ms, "
+            f"고유 {summary['distinct']}건, 최장 {summary['slowest_ms']}ms)",
+            extra={"sql_profile": summary}
+        )
+        for key, count in profile.repeated(self.repeat_threshold):
+            logger.warning(
+                f"N+1 의심: {method} {route} 에서 같은 SQL이 {count}회 실행됨: {key[:300]}",
+                extra={"route": route, "repeat": count, "fingerprint": key}
+            )
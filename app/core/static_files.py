@@ -0,0 +1,198 @@
+# app/core/static_files.py
+"""
+/static 정적 파일 제공
+
+운영에서는 nginx가 static/ 디렉토리를 디스크에서 직접(sendfile) 제공하고, 앱의
+CachedStaticFiles는 nginx 없이 실행할 때(로컬 개발, 테스트)를 위한 대체 경로입니다.
+
+- ETag / Last-Modified 조건부 요청은 304로 응답 (StaticFiles 기본 동작)
+- 파일명에 콘텐츠 해시가 들어간 자산(styles.3f2a9c1b.css)은 1년 + immutable,
+  나머지는 매번 재검증(no-cache)하도록 Cache-Control 지정
+- ASGI 서버가 http.response.pathsend 확장을 지원하면 FileResponse가 경로만 넘겨
+  서버가 sendfile로 전송합니다.
+- 미리 압축된 사본(.br/.zst/.gz)이 원본보다 새로우면 Accept-Encoding에 맞춰 그 사본을 제공
+
+해시 파일명 생성 / 미리 압축:
+    python -m app.core.static_files fingerprint [--directory static]
+    python -m app.core.static_files precompress [--directory static]
+"""
+from starlette.datastructures import Headers
+from starlette.responses import FileResponse, Response
+from starlette.staticfiles import NotModifiedResponse, StaticFiles
+from starlette.types import Scope
+from typing import Dict, Optional
+import argparse
+import hashlib
+import json
+import mimetypes
+import os
+import re
+import shutil
+
+from app.core.compression import ENCODING_EXTENSIONS, available_encodings, compress, is_compressible, negotiate
+
+# name.<8~64자리 16진수>.ext
+FINGERPRINT_PATTERN = re.compile(r"\.[0-9a-f]{8,64}\.[A-Za-z0-9]+$")
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+REVALIDATE_CACHE_CONTROL = "public, no-cache"
+MANIFEST_NAME = "manifest.json"
+FILE_CHUNK_SIZE = 256 * 1024
+PRECOMPRESS_MIN_BYTES = 1024
+PRECOMPRESS_LEVELS = {"br": 11, "zstd": 19, "gzip": 9}
+
+
+def is_fingerprinted(path: str) -> bool:
+    return FINGERPRINT_PATTERN.search(path) is not None
+
+
+class CachedStaticFiles(StaticFiles):
+    """Cache-Control을 붙이고 큰 청크로 전송하는 StaticFiles"""
+
+    def file_response(
+        self,
+        full_path,
+        stat_result: os.stat_result,
+        scope: Scope,
+        status_code: int = 200,
+    ) -> Response:
+        response = self._precompressed_response(str(full_path), stat_result, scope, status_code)
+        if response is None:
+            response = super().file_response(full_path, stat_result, scope, status_code)
+        response.headers["Cache-Control"] = (
+            IMMUTABLE_CACHE_CONTROL if is_fingerprinted(str(full_path)) else REVALIDATE_CACHE_CONTROL
+        )
+        if isinstance(response, FileResponse):
+            response.chunk_size = FILE_CHUNK_SIZE
+        return response
+
+    def _precompressed_response(
+        self,
+        full_path: str,
+        stat_result: os.stat_result,
+        scope: Scope,
+        status_code: int
+    ) -> Optional[Response]:
+        request_headers = Headers(scope=scope)
+        encodings = [
+            encoding for encoding in available_encodings()
+            if os.path.exists(full_path + ENCODING_EXTENSIONS[encoding])
+        ]
+        encoding = negotiate(request_headers.get("accept-encoding", ""), encodings)
+        if encoding is None:
+            return None
+        variant_path = full_path + ENCODING_EXTENSIONS[encoding]
+        variant_stat = os.stat(variant_path)
+        if variant_stat.st_mtime < stat_result.st_mtime:
+            # 원본이 더 새로우면 오래된 사본은 무시
+            return None
+
+        response = FileResponse(
+            variant_path,
+            status_code=status_code,
+            stat_result=variant_stat,
+            media_type=mimetypes.guess_type(full_path)[0] or "text/plain"
+        )
+        response.headers["Content-Encoding"] = encoding
+        response.headers.add_vary_header("Accept-Encoding")
+        if self.is_not_modified(response.headers, request_headers):
+            return NotModifiedResponse(response.headers)
+        return response
+
+
+def fingerprint_directory(directory: str) -> Dict[str, str]:
+    """
+    directory 아래 파일마다 콘텐츠 해시가 들어간 사본을 만들고 원래 경로 → 해시 경로
+    매핑을 manifest.json에 기록합니다. 이미 해시가 붙은 파일과 HTML은 건너뜁니다.
+    """
+    manifest: Dict[str, str] = {}
+    for root, _, files in os.walk(directory):
+        for name in sorted(files):
+            path = os.path.join(root, name)
+            relative = os.path.relpath(path, directory).replace(os.sep, "/")
+            if (
+                name == MANIFEST_NAME
+                or name.endswith(".html")
+                or name.endswith(tuple(ENCODING_EXTENSIONS.values()))
+                or is_fingerprinted(name)
+            ):
+                continue
+            with open(path, "rb") as f:
+                digest = hashlib.sha256(f.read()).hexdigest()[:12]
+            stem, ext = os.path.splitext(name)
+            hashed_name = f"{stem}.{digest}{ext}"
+            hashed_path = os.path.join(root, hashed_name)
+            if not os.path.exists(hashed_path):
+                shutil.copy2(path, hashed_path)
+            manifest[relative] = os.path.relpath(hashed_path, directory).replace(os.sep, "/")
+
+    with open(os.path.join(directory, MANIFEST_NAME), "w", encoding="utf-8") as f:
+        json.dump(manifest, f, ensure_ascii=False, indent=2, sort_keys=True)
+    return manifest
+
+
+def precompress_directory(directory: str) -> Dict[str, int]:
+    """
+    압축할 만한 파일마다 최고 레벨로 미리 압축한 사본(.br/.zst/.gz)을 만듭니다.
+    원본보다 새로운 사본은 다시 만들지 않습니다. 반환값은 인코딩별 생성 수입니다.
+    """
+    created = {encoding: 0 for encoding in available_encodings(("br", "zstd", "gzip"))}
+    compressed_extensions = tuple(ENCODING_EXTENSIONS.values())
+    for root, _, files in os.walk(directory):
+        for name in files:
+            path = os.path.join(root, name)
+            content_type = mimetypes.guess_type(name)[0] or ""
+            if name.endswith(compressed_extensions) or not is_compressible(content_type):
+                continue
+            stat_result = os.stat(path)
+            if stat_result.st_size < PRECOMPRESS_MIN_BYTES:
+                continue
+            with open(path, "rb") as f:
+                body = f.read()
+            for encoding in created:
+                variant_path = path + ENCODING_EXTENSIONS[encoding]
+                if os.path.exists(variant_path) and os.stat(variant_path).st_mtime >= stat_result.st_mtime:
+                    continue
+                compressed = compress(body, encoding, PRECOMPRESS_LEVELS[encoding])
+                if len(compressed) >= len(body):
+                    continue
+                with open(variant_path, "wb") as f:
+                    f.write(compressed)
+                created[encoding] += 1
+    return created
+
+
+_manifest: Optional[Dict[str, str]] = None
+
+
+def static_url(path: str, directory: str = "static") -> str:
+    """manifest.json이 있으면 해시 파일명의 /static URL을, 없으면 원래 URL을 반환합니다."""
+    global _manifest
+    if _manifest is None:
+        try:
+            with open(os.path.join(directory, MANIFEST_NAME), encoding="utf-8") as f:
+                _manifest = json.load(f)
+        except (OSError, ValueError):
+            _manifest = {}
+    return "/static/" + _manifest.get(path, path)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="정적 파일 도구")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    fingerprint = subparsers.add_parser("fingerprint", help="콘텐츠 해시 파일명 사본과 manifest.json 생성")
+    fingerprint.add_argument("--directory", default="static")
+    precompress = subparsers.add_parser("precompress", help="미리 압축한 사본(.br/.zst/.gz) 생성")
+    precompress.add_argument("--directory", default="static")
+    args = parser.parse_args()
+
+    if args.command == "fingerprint":
+        manifest = fingerprint_directory(args.directory)
+        for original, hashed in manifest.items():
+            print(f"{original} -> {hashed}")
+    else:
+        for encoding, count in precompress_directory(args.directory).items():
+            print(f"{encoding}: {count} files")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,17 +1,9 @@
-from sqlalchemy import create_engine
-from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker
-from app.core.config import settings
+# 엔진과 세션 팩토리는 app.core.database에서 워커당 하나만 생성
+from app.core.database import (
+    SQLALCHEMY_DATABASE_URL, engine, SessionLocal, pool_monitor, session_router, get_db, get_read_db
+)
 
-SQLALCHEMY_DATABASE_URL = settings.SQLALCHEMY_DATABASE_URL
-
-engine = create_engine(SQLALCHEMY_DATABASE_URL)
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
-
-# Dependency
-def get_db():
-    db = SessionLocal()
-    try:
-        yield db
-    finally:
-        db.close() 
\ No newline at end of file
+__all__ = [
+    "SQLALCHEMY_DATABASE_URL", "engine", "SessionLocal", "pool_monitor", "session_router",
+    "get_db", "get_read_db"
+]
@@ -1,29 +1,32 @@
 from fastapi import FastAPI, Request, status
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse, HTMLResponse
-from fastapi.staticfiles import StaticFiles
-from fastapi.middleware.gzip import GZipMiddleware
+from fastapi.responses import JSONResponse, HTMLResponse, Response
+from fastapi.encoders import jsonable_encoder
+from fastapi.exceptions import RequestValidationError
+from starlette.exceptions import HTTPException as StarletteHTTPException
 from fastapi.security import HTTPBearer
 from app.core.firebase import initialize_firebase
 from app.api import router as api_router
 from app.utils.init_data import init_application_data
+from app.utils.partitions import run_partition_maintenance
+from app.utils.room_cards import room_card_refresher
+from app.core.config import settings
+from app.core.responses import UnicodeJSONResponse
+from app.core.logging_config import setup_logging
+from app.core.compression import CompressionMiddleware
+from app.core.middleware import TimingMiddleware
+from app.core.static_files import CachedStaticFiles
+from app.core.metrics import CONTENT_TYPE_LATEST, registry
+from app.core.response_cache import response_cache
+from app.db import session_router
+import asyncio
 import logging
-import time
 import os
-from starlette.middleware.base import BaseHTTPMiddleware
 import uvicorn
 from fastapi.openapi.utils import get_openapi
-import json
 
-# 로깅 설정 - UTF-8 인코딩 강화
-logging.basicConfig(
-    level=logging.INFO,
-    format="%(asctime)s - %(name)s - %(levelname)s - %(message)s",
-    handlers=[
-        logging.StreamHandler(),
-        logging.FileHandler("app.log", encoding="utf-8")
-    ]
-)
+# 로깅 설정 - 큐 기반 (콘솔/파일 출력은 별도 스레드에서, UTF-8)
+setup_logging()
 logger = logging.getLogger("mhp-api")
 
 # 보안 스키마 정의
@@ -74,55 +77,16 @@ app = FastAPI(
     version="1.0.0",
     docs_url="/api/docs",
     redoc_url="/api/redoc",
-    openapi_url="/api/openapi.json"
+    openapi_url="/api/openapi.json",
+    default_response_class=UnicodeJSONResponse
 )
 
-# 커스텀 JSON Response 클래스 - 한국어 처리 강화
-class UnicodeJSONResponse(JSONResponse):
-    def __init__(self, content, **kwargs):
-        super().__init__(content, **kwargs)
-        
-    def render(self, content) -> bytes:
-        return json.dumps(
-            content,
-            ensure_ascii=False,  # 한국어 유니코드 문자 그대로 출력
-            allow_nan=False,
-            indent=None,
-            separators=(",", ":"),
-        ).encode("utf-8")
-
-# 미들웨어: 요청 로깅 및 UTF-8 응답 처리
-class LoggingMiddleware(BaseHTTPMiddleware):
-    async def dispatch(self, request: Request, call_next):
-        start_time = time.time()
-        
-        try:
-            response = await call_next(request)
-            process_time = time.time() - start_time
-            
-            # UTF-8 Content-Type 헤더 추가
-            if "application/json" in response.headers.get("content-type", ""):
-                response.headers["content-type"] = "application/json; charset=utf-8"
-            
-            logger.info(
-                f"{request.method} {request.url.path} "
-                f"완료: {response.status_code} ({process_time:.3f}s)"
-            )
-            return response
-        except Exception as e:
-            process_time = time.time() - start_time
-            logger.error(
-                f"{request.method} {request.url.path} "
-                f"오류: {str(e)} ({process_time:.3f}s)"
-            )
-            return UnicodeJSONResponse(
-                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-                content={"detail": "Internal server error"}
-            )
-
-# 미들웨어 등록
-app.add_middleware(LoggingMiddleware)
-app.add_middleware(GZipMiddleware, minimum_size=1000)
+# 미들웨어 등록 (나중에 등록한 것이 바깥쪽, 처리 시간에 압축 시간까지 포함)
+app.add_middleware(CompressionMiddleware)
+app.add_middleware(TimingMiddleware)
+if settings.SQL_PROFILING_ENABLED:
+    from app.core.sql_profiler import SQLProfilerMiddleware
+    app.add_middleware(SQLProfilerMiddleware)
 
 # CORS 설정 - 한국어 헤더 처리 포함
 app.add_middleware(
@@ -148,13 +112,28 @@ if not os.path.exists(static_dir):
     except Exception as e:
         logger.warning(f"정적 파일 디렉토리 생성 실패: {str(e)}")
 
-# 정적 파일 제공
+# 정적 파일 제공 (운영에서는 nginx가 디스크에서 직접 제공, 앱은 로컬/대체 경로)
 try:
-    app.mount("/static", StaticFiles(directory=static_dir), name="static")
+    app.mount("/static", CachedStaticFiles(directory=static_dir), name="static")
     logger.info("정적 파일 제공 경로가 설정되었습니다: /static")
 except Exception as e:
     logger.warning(f"정적 파일 서비스 설정 실패: {str(e)}")
 
+# HTTP 예외/검증 오류 응답도 UTF-8 charset을 명시하는 응답 클래스로 (FastAPI 기본 핸들러와 동일한 본문)
+@app.exception_handler(StarletteHTTPException)
+async def http_exception_handler(request: Request, exc: StarletteHTTPException):
+    headers = getattr(exc, "headers", None)
+    if exc.status_code in (204, 304) or exc.status_code < 200:
+        return Response(status_code=exc.status_code, headers=headers)
+    return UnicodeJSONResponse(status_code=exc.status_code, content={"detail": exc.detail}, headers=headers)
+
+@app.exception_handler(RequestValidationError)
+async def validation_exception_handler(request: Request, exc: RequestValidationError):
+    return UnicodeJSONResponse(
+        status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+        content={"detail": jsonable_encoder(exc.errors())}
+    )
+
 # 전역 예외 처리 - 한국어 메시지 지원
 @app.exception_handler(Exception)
 async def global_exception_handler(request: Request, exc: Exception):
@@ -171,9 +150,9 @@ async def startup_event():
     logger.info("🌅 Project GoodMorning API 시작됨")
     logger.info("한국어 지원이 활성화되었습니다")
     
-    # Firebase 초기화
+    # 인증 공급자 초기화 (Firebase 또는 로컬 JWT)
     initialize_firebase()
-    logger.info("Firebase 초기화 완료")
+    logger.info(f"인증 공급자 초기화 완료 ({settings.AUTH_PROVIDER})")
     
     # 기본 데이터 초기화 (기본 채팅방 생성)
     try:
@@ -182,11 +161,33 @@ async def startup_event():
     except Exception as e:
         logger.error(f"기본 데이터 초기화 실패: {str(e)}")
 
+    # messages 월별 파티션 유지보수 (미래 파티션 미리 생성)
+    app.state.partition_task = asyncio.create_task(run_partition_maintenance())
+
+    # 읽기 복제본 지연 측정 (DB_REPLICA_URLS 설정 시, 요청 경로에서는 측정하지 않음)
+    if session_router.replicas:
+        app.state.replica_lag_task = asyncio.create_task(session_router.run_lag_monitor())
+
+    # 공유 응답 캐시 무효화 이벤트 구독 (RESPONSE_CACHE_REDIS_URL 설정 시)
+    response_cache.start()
+
 @app.on_event("shutdown")
 async def shutdown_event():
     """애플리케이션 종료 시 실행되는 이벤트"""
     logger.info("🌙 Project GoodMorning API 종료됨")
 
+    partition_task = getattr(app.state, "partition_task", None)
+    if partition_task:
+        partition_task.cancel()
+
+    replica_lag_task = getattr(app.state, "replica_lag_task", None)
+    if replica_lag_task:
+        replica_lag_task.cancel()
+
+    # 예약된 채팅방 카드 갱신을 마저 반영
+    room_card_refresher.stop()
+    response_cache.stop()
+
 # API 라우터 등록
 app.include_router(api_router, prefix="/api")
 
@@ -224,6 +225,12 @@ async def health_check():
         }
     )
 
+# 메트릭 엔드포인트 (Prometheus 스크레이프용, 외부에는 nginx에서 차단)
+if settings.METRICS_ENABLED:
+    @app.get("/metrics", include_in_schema=False)
+    async def metrics():
+        return Response(content=registry.render(), media_type=CONTENT_TYPE_LATEST)
+
 # 한국어 테스트 엔드포인트
 @app.get("/api/test/korean")
 async def korean_test():
@@ -276,4 +283,11 @@ app.openapi = custom_openapi
 
 # 직접 실행 시 서버 구동
 if __name__ == "__main__":
-    uvicorn.run("app.main:app", host="0.0.0.0", port=8000, reload=True)
\ No newline at end of file
+    uvicorn.run(
+        "app.main:app",
+        host="0.0.0.0",
+        port=8000,
+        reload=True,
+        ws="websockets",
+        ws_per_message_deflate=settings.WS_PER_MESSAGE_DEFLATE
+    )
\ No newline at end of file
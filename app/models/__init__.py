@@ -1,5 +1,5 @@
 from app.models.user_models import User, UserBase, UserCreate, Token, TokenData, SignupData, Base
-from app.models.chatroom import ChatroomDB, MessageDB
+from app.models.chatroom import ChatroomDB, ChatroomCardDB, MessageDB
 
 __all__ = [
     "User",
@@ -9,6 +9,7 @@ __all__ = [
     "TokenData",
     "SignupData",
     "ChatroomDB",
+    "ChatroomCardDB",
     "MessageDB",
     "Base"
 ] 
\ No newline at end of file
@@ -1,5 +1,6 @@
-from sqlalchemy import Column, Integer, String, Boolean, ForeignKey, DateTime, Table, Float, Text, UUID
-from sqlalchemy.orm import relationship
+from sqlalchemy import Column, Integer, String, Boolean, ForeignKey, DateTime, Table, Float, Text, UUID, Index, JSON, cast, type_coerce
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.orm import Session, relationship
 from sqlalchemy.sql import func
 from app.models.user_models import Base  # 공통 Base 사용
 from datetime import datetime
@@ -17,9 +18,20 @@ chatroom_participants = Table(
     Column('user_id', UUID, ForeignKey('users.id'))
 )
 
+# JSON 배열 컬럼: PostgreSQL에서는 JSONB(GIN 인덱스로 @> 검색), 그 밖의 DB에서는 JSON 텍스트
+# 로드할 때 한 번 파이썬 리스트로 디코딩되므로 호출하는 쪽에서 문자열을 파싱하지 않습니다.
+JSONList = JSON().with_variant(JSONB(), "postgresql")
+
 # SQLAlchemy 모델 (DB 스키마에 맞춤)
 class ChatroomDB(Base):
     __tablename__ = "chatrooms"
+    __table_args__ = (
+        # 참여 채팅방 조회(participants @> '["uid"]')용 GIN 인덱스 (PostgreSQL)
+        Index(
+            "ix_chatrooms_participants", "participants",
+            postgresql_using="gin", postgresql_ops={"participants": "jsonb_path_ops"}
+        ),
+    )
 
     id = Column(String, primary_key=True, index=True)
     title = Column(String(100), nullable=False)
@@ -27,26 +39,20 @@ class ChatroomDB(Base):
     created_at = Column(DateTime, default=datetime.utcnow)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     created_by = Column(String(50), nullable=False)
-    participants = Column(Text, default="[]")  # JSON 형식의 문자열로 저장
-    connection = Column(Text, default="[]")    # JSON 형식의 문자열로 저장
+    participants = Column(JSONList, nullable=False, default=list)  # 참가자 firebase_uid 목록
+    connection = Column(JSONList, nullable=False, default=list)    # 좌표 목록 ({latitude, longitude})
     is_active = Column(Boolean, default=True)
     
     # MessageDB와의 관계
     messages = relationship("MessageDB", back_populates="chatroom", cascade="all, delete-orphan")
 
     def get_participants(self):
-        """참가자 목록을 JSON 형식에서 파싱하여 반환"""
-        try:
-            return json.loads(self.participants)
-        except:
-            return []
+        """참가자 목록 (아직 저장되지 않은 객체는 빈 목록)"""
+        return self.participants or []
 
     def get_connection(self):
-        """좌표 정보를 JSON 형식에서 파싱하여 반환"""
-        try:
-            return json.loads(self.connection)
-        except:
-            return []
+        """좌표 정보 목록"""
+        return self.connection or []
 
     def to_api_model(self, user_profiles, recent_messages=None):
         """API 응답 모델로 변환"""
@@ -62,8 +68,43 @@ class ChatroomDB(Base):
             messages=[msg.to_api_model() for msg in recent_messages[:10]]
         )
 
+class ChatroomCardDB(Base):
+    """
+    채팅방 목록용 비정규화 카드 (app.utils.room_cards에서 관리)
+    card에는 목록 응답의 원소(Chatroom, 참여자 프로필/최근 메시지 포함) JSON을 그대로 저장합니다.
+    """
+    __tablename__ = "chatroom_cards"
+    __table_args__ = (
+        Index("ix_chatroom_cards_listing", "is_active", "created_at", "chatroom_id"),
+    )
+
+    chatroom_id = Column(String, ForeignKey("chatrooms.id", ondelete="CASCADE"), primary_key=True)
+    title = Column(String(100), nullable=False)
+    is_active = Column(Boolean, nullable=False, default=True)
+    created_at = Column(DateTime, nullable=True)
+    card = Column(Text, nullable=False)
+    # 카드에 반영된 최신 메시지 (시작 시 일관성 검사에서 messages의 최신 메시지와 비교)
+    last_message_id = Column(String, nullable=True)
+    last_message_at = Column(DateTime, nullable=True)
+    refreshed_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+def has_participant(db: Session, uid: str):
+    """
+    uid가 참여한 채팅방 조건
+    PostgreSQL은 JSONB 포함 연산(participants @> '["uid"]', GIN 인덱스 사용),
+    그 밖의 DB는 JSON 텍스트에서 '"uid"'를 찾습니다.
+    (LIKE로 찾으므로 uid의 %, _ 가 와일드카드로 동작하지 않도록 이스케이프)
+    """
+    if db.get_bind().dialect.name == "postgresql":
+        return type_coerce(ChatroomDB.participants, JSONB).contains([uid])
+    return cast(ChatroomDB.participants, Text).contains(json.dumps(uid), autoescape=True)
+
 class MessageDB(Base):
     __tablename__ = "messages"
+    # PostgreSQL에서는 timestamp 기준 월별 파티션 테이블 (DB의 PK는 (id, timestamp))
+    __table_args__ = (
+        Index("ix_messages_chatroom_id_timestamp", "chatroom_id", "timestamp"),
+    )
 
     id = Column(String, primary_key=True, index=True)
     content = Column(Text, nullable=False)
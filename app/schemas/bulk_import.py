@@ -0,0 +1,59 @@
+from pydantic import BaseModel, Field, field_validator
+from typing import List, Optional, Any
+from datetime import datetime
+import json
+
+from app.schemas.chatroom import Coordinate
+
+
+def _parse_json_list(value: Any) -> Any:
+    """CSV 컬럼처럼 문자열로 들어온 JSON 배열을 파싱합니다."""
+    if value is None or value == "":
+        return []
+    if isinstance(value, str):
+        return json.loads(value)
+    return value
+
+
+class MessageImportRow(BaseModel):
+    id: Optional[str] = Field(None, description="메시지 ID (없으면 생성)")
+    chatroom_id: str = Field(..., min_length=1, description="채팅방 ID")
+    sender_id: str = Field(..., min_length=1, max_length=50, description="발신자 ID")
+    content: str = Field(..., min_length=1, description="메시지 내용")
+    timestamp: Optional[datetime] = Field(None, description="전송 시간 (없으면 현재 시각)")
+    is_read: bool = Field(False, description="읽음 여부")
+
+
+class ChatroomImportRow(BaseModel):
+    id: Optional[str] = Field(None, description="채팅방 ID (없으면 생성)")
+    title: str = Field(..., min_length=1, max_length=100, description="채팅방 제목")
+    description: Optional[str] = Field(None, description="채팅방 설명")
+    created_by: str = Field(..., min_length=1, max_length=50, description="생성자 ID")
+    created_at: Optional[datetime] = Field(None, description="생성 시간 (없으면 현재 시각)")
+    participants: List[str] = Field(default_factory=list, description="참가자 ID 목록")
+    connection: List[Coordinate] = Field(default_factory=list, description="위치 정보")
+    is_active: bool = Field(True, description="활성 여부")
+
+    @field_validator("participants", "connection", mode="before")
+    @classmethod
+    def parse_json_list(cls, value):
+        return _parse_json_list(value)
+
+
+class ImportRowError(BaseModel):
+    line: int = Field(..., description="입력 데이터의 행 번호 (1부터)")
+    error: str = Field(..., description="검증 오류 내용")
+
+
+class ImportProgress(BaseModel):
+    kind: str = Field(..., description="가져오기 대상 (messages / chatrooms)")
+    done: bool = Field(False, description="완료 여부")
+    rows_read: int = Field(0, description="읽은 행 수")
+    rows_invalid: int = Field(0, description="검증 실패 행 수")
+    rows_inserted: int = Field(0, description="삽입된 행 수")
+    rows_skipped: int = Field(0, description="중복 또는 참조 무결성 위반으로 제외된 행 수")
+    chunks: int = Field(0, description="처리한 청크 수")
+    elapsed_seconds: float = Field(0.0, description="경과 시간(초)")
+    rows_per_second: float = Field(0.0, description="초당 처리 행 수")
+    errors: List[ImportRowError] = Field(default_factory=list, description="검증 오류 (최대 100개)")
+    error: Optional[str] = Field(None, description="가져오기가 중단된 경우 오류 내용 (done=true와 함께)")
@@ -13,6 +13,10 @@ class AuthMessage(WebSocketMessage):
     """인증을 위한 메시지"""
     type: Literal["auth"] = "auth"
     token: str = Field(..., description="JWT 인증 토큰")
+    encoding: Literal["json", "msgpack"] = Field(
+        "json",
+        description="서버 → 클라이언트 메시지 인코딩 (json: 텍스트 프레임, msgpack: 바이너리 프레임)"
+    )
 
 # 채팅 메시지 (클라이언트 → 서버)
 class ChatMessage(WebSocketMessage):
@@ -51,6 +55,7 @@ class ErrorMessage(WebSocketMessage):
     code: int = Field(..., description="오류 코드")
     message: str = Field(..., description="오류 메시지")
     details: Optional[str] = Field(None, description="오류 상세 정보")
+    retry_after: Optional[float] = Field(None, description="재연결까지 대기할 시간(초) - 입장 제어로 거절된 경우")
 
 # 성공 응답 메시지
 class SuccessMessage(WebSocketMessage):
@@ -5,7 +5,11 @@ from app.utils.utils import (
     filter_chatrooms,
     create_message,
     verify_chatroom_participant,
-    connection_manager
+    connection_manager,
+    chatroom_flight,
+    message_flight,
+    profile_flight,
+    forget_room_loads
 )
 
 __all__ = [
@@ -14,5 +18,9 @@ __all__ = [
     "filter_chatrooms",
     "create_message",
     "verify_chatroom_participant",
-    "connection_manager"
+    "connection_manager",
+    "chatroom_flight",
+    "message_flight",
+    "profile_flight",
+    "forget_room_loads"
 ]
\ No newline at end of file
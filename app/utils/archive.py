@@ -0,0 +1,332 @@
+"""
+오래된 채팅 메시지 아카이브 (콜드 스토리지)
+
+오래된 메시지를 채팅방별/월별 압축 파일로 내보내고 DB에서 삭제합니다.
+채팅 내역 조회가 DB에 남은 범위를 넘어서면 아카이브 파일에서 이어서 읽습니다.
+
+디렉터리 구조 (MESSAGE_ARCHIVE_DIR):
+    {room_id}/index.json          월별 메시지 수, 최소/최대 timestamp
+    {room_id}/{YYYY-MM}.jsonl.gz  timestamp 오름차순 JSONL (한 줄에 메시지 하나)
+
+사용법:
+    python -m app.utils.archive run [--older-than-days 365] [--batch-size 5000]
+    python -m app.utils.archive stats [room_id]
+"""
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+from collections import deque
+from datetime import datetime, timedelta
+from typing import Deque, Dict, Iterable, Iterator, List, Optional
+import argparse
+import gzip
+import hashlib
+import json
+import logging
+import os
+
+from app.core.config import settings
+from app.models.chatroom import MessageDB
+from app.utils.room_cards import refresh_room_card
+
+logger = logging.getLogger(__name__)
+
+INDEX_FILE = "index.json"
+
+
+def _room_dir(room_id: str, archive_dir: Optional[str] = None) -> str:
+    # room_id는 경로에 그대로 쓰기에 안전하지 않을 수 있으므로 해시로 디렉터리 이름을 만듦
+    digest = hashlib.sha1(room_id.encode("utf-8")).hexdigest()
+    return os.path.join(archive_dir or settings.MESSAGE_ARCHIVE_DIR, digest[:2], digest)
+
+
+def _month_file(room_dir: str, month: str) -> str:
+    return os.path.join(room_dir, f"{month}.jsonl.gz")
+
+
+def _message_to_record(message: MessageDB) -> Dict:
+    return {
+        "id": message.id,
+        "sender_id": message.sender_id,
+        "content": message.content,
+        "timestamp": message.timestamp.isoformat() if message.timestamp else None,
+        "is_read": bool(message.is_read)
+    }
+
+
+def _parse_record(line: bytes) -> Dict:
+    record = json.loads(line)
+    record["timestamp"] = datetime.fromisoformat(record["timestamp"]) if record["timestamp"] else None
+    return record
+
+
+def load_index(room_id: str, archive_dir: Optional[str] = None) -> Dict[str, Dict]:
+    """채팅방 아카이브 인덱스 {"YYYY-MM": {"count", "min_ts", "max_ts"}}를 반환합니다."""
+    path = os.path.join(_room_dir(room_id, archive_dir), INDEX_FILE)
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return {}
+
+
+def _fsync_dir(directory: str):
+    # os.replace로 바꾼 파일 이름까지 디스크에 남도록 디렉터리도 fsync
+    fd = os.open(directory, os.O_RDONLY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+def _write_index(room_dir: str, index: Dict[str, Dict]):
+    path = os.path.join(room_dir, INDEX_FILE)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(index, f, ensure_ascii=False, sort_keys=True)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+    _fsync_dir(room_dir)
+
+
+def iter_month(room_id: str, month: str, archive_dir: Optional[str] = None) -> Iterator[Dict]:
+    """월 아카이브 파일을 한 줄씩 풀면서 읽습니다. (timestamp 오름차순, 월 전체를 메모리에 올리지 않음)"""
+    path = _month_file(_room_dir(room_id, archive_dir), month)
+    try:
+        stream = gzip.open(path, "rb")
+    except FileNotFoundError:
+        return
+    with stream:
+        for line in stream:
+            if line.strip():
+                yield _parse_record(line)
+
+
+def read_month(room_id: str, month: str, archive_dir: Optional[str] = None) -> List[Dict]:
+    """월 아카이브 파일 전체를 읽습니다. (병합해서 다시 쓸 때 사용)"""
+    return list(iter_month(room_id, month, archive_dir))
+
+
+def write_month(
+    room_id: str,
+    month: str,
+    records: Iterable[Dict],
+    archive_dir: Optional[str] = None
+) -> int:
+    """
+    월 아카이브 파일에 메시지를 병합하여 기록합니다.
+
+    이미 파일이 있으면 기존 메시지와 합친 뒤(id 기준 중복 제거) 다시 씁니다.
+    파일을 fsync하여 교체한 뒤에 인덱스를 갱신하므로, 반환된 뒤에는 DB에서 삭제해도 안전하고
+    DB 삭제 전 중단되어 재실행되어도 안전합니다.
+
+    Returns:
+        int: 파일에 기록된 전체 메시지 수
+    """
+    room_dir = _room_dir(room_id, archive_dir)
+    os.makedirs(room_dir, exist_ok=True)
+
+    merged = {record["id"]: record for record in read_month(room_id, month, archive_dir)}
+    for record in records:
+        if isinstance(record.get("timestamp"), str):
+            record = dict(record, timestamp=datetime.fromisoformat(record["timestamp"]))
+        merged[record["id"]] = record
+    if not merged:
+        return 0
+    ordered = sorted(merged.values(), key=lambda r: (r["timestamp"] or datetime.min, r["id"]))
+
+    path = _month_file(room_dir, month)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "wb") as raw:
+        with gzip.GzipFile(fileobj=raw, mode="wb", compresslevel=6) as f:
+            for record in ordered:
+                row = dict(record, timestamp=record["timestamp"].isoformat() if record["timestamp"] else None)
+                f.write(json.dumps(row, ensure_ascii=False, separators=(",", ":")).encode("utf-8"))
+                f.write(b"\n")
+        raw.flush()
+        os.fsync(raw.fileno())
+    os.replace(tmp_path, path)
+
+    index = load_index(room_id, archive_dir)
+    index[month] = {
+        "room_id": room_id,
+        "count": len(ordered),
+        "min_ts": ordered[0]["timestamp"].isoformat() if ordered[0]["timestamp"] else None,
+        "max_ts": ordered[-1]["timestamp"].isoformat() if ordered[-1]["timestamp"] else None
+    }
+    _write_index(room_dir, index)
+    return len(ordered)
+
+
+def has_archive(room_id: str, archive_dir: Optional[str] = None) -> bool:
+    return os.path.exists(os.path.join(_room_dir(room_id, archive_dir), INDEX_FILE))
+
+
+def read_archived_messages(
+    room_id: str,
+    before: Optional[datetime] = None,
+    skip: int = 0,
+    limit: int = 50,
+    archive_dir: Optional[str] = None
+) -> List[Dict]:
+    """
+    아카이브에서 최신순으로 메시지를 읽습니다.
+
+    인덱스의 월별 메시지 수를 이용해 skip 범위에 완전히 포함되는 월은
+    압축을 풀지 않고 건너뜁니다. 읽는 월은 스트리밍하면서 조건에 맞는 마지막
+    skip + limit개만 남기므로 메모리 사용량은 월 크기가 아닌 페이지 크기에 비례합니다.
+    """
+    index = load_index(room_id, archive_dir)
+    results: List[Dict] = []
+    if limit <= 0:
+        return results
+
+    for month in sorted(index.keys(), reverse=True):
+        meta = index[month]
+        min_ts = datetime.fromisoformat(meta["min_ts"]) if meta.get("min_ts") else None
+        max_ts = datetime.fromisoformat(meta["max_ts"]) if meta.get("max_ts") else None
+
+        # 커서보다 최신인 월은 건너뜀
+        if before is not None and min_ts is not None and min_ts >= before:
+            continue
+
+        # 월 전체가 조건에 포함되고 skip 범위 안이면 파일을 읽지 않음
+        whole_month = before is None or (max_ts is not None and max_ts < before)
+        if whole_month and skip >= meta["count"]:
+            skip -= meta["count"]
+            continue
+
+        # 파일은 오름차순이므로 조건에 맞는 행 중 가장 최신 skip + 필요한 수만 유지
+        matched = 0
+        tail: Deque[Dict] = deque(maxlen=skip + limit - len(results))
+        for row in iter_month(room_id, month, archive_dir):
+            if before is not None and row["timestamp"] is not None and row["timestamp"] >= before:
+                continue
+            matched += 1
+            tail.append(row)
+        if skip >= matched:
+            skip -= matched
+            continue
+
+        rows = list(reversed(tail))
+        results.extend(rows[skip:])
+        skip = 0
+        if len(results) >= limit:
+            break
+    return results
+
+
+def archive_messages(
+    db: Session,
+    cutoff: datetime,
+    batch_size: int = 5000,
+    archive_dir: Optional[str] = None
+) -> Dict[str, int]:
+    """
+    cutoff 이전 메시지를 채팅방/월 단위로 아카이브로 내보내고 DB에서 삭제합니다.
+
+    (채팅방, 월) 단위로 batch_size씩 읽어 모은 뒤 월 파일을 한 번만 기록하고
+    (배치마다 다시 쓰면 월 파일 전체를 반복해서 풀고 압축하게 됨), 그 다음 삭제 → 커밋합니다.
+    채팅방마다 마지막으로 채팅방 카드(최근 메시지)를 다시 만듭니다.
+    """
+    month_expr = func.min(MessageDB.timestamp)
+    groups = db.query(MessageDB.chatroom_id, month_expr)\
+        .filter(MessageDB.timestamp < cutoff)\
+        .group_by(MessageDB.chatroom_id)\
+        .all()
+
+    archived_messages = 0
+    archived_files = 0
+    for room_id, oldest in groups:
+        month_start = datetime(oldest.year, oldest.month, 1)
+        while month_start < cutoff:
+            next_month = datetime(month_start.year + month_start.month // 12, month_start.month % 12 + 1, 1)
+            upper = min(next_month, cutoff)
+            month = month_start.strftime("%Y-%m")
+
+            records: List[Dict] = []
+            ids: List[str] = []
+            while True:
+                query = db.query(MessageDB)\
+                    .filter(
+                        MessageDB.chatroom_id == room_id,
+                        MessageDB.timestamp >= month_start,
+                        MessageDB.timestamp < upper
+                    )
+                if ids:
+                    query = query.filter(MessageDB.id > ids[-1])
+                batch = query.order_by(MessageDB.id).limit(batch_size).all()
+                records.extend(_message_to_record(m) for m in batch)
+                ids.extend(m.id for m in batch)
+                if len(batch) < batch_size:
+                    break
+
+            if ids:
+                # 파일이 디스크에 기록된 뒤에만 DB에서 삭제
+                write_month(room_id, month, records, archive_dir)
+                for start in range(0, len(ids), batch_size):
+                    db.query(MessageDB)\
+                        .filter(MessageDB.id.in_(ids[start:start + batch_size]))\
+                        .delete(synchronize_session=False)
+                db.commit()
+                archived_messages += len(ids)
+                archived_files += 1
+            month_start = next_month
+
+        # 카드의 최근 메시지에 아카이브된 메시지가 남지 않도록
+        refresh_room_card(db, room_id)
+        db.commit()
+
+    logger.info(f"메시지 아카이브 완료: {archived_messages}개 메시지, {len(groups)}개 채팅방")
+    return {"rooms": len(groups), "messages": archived_messages, "writes": archived_files}
+
+
+def archive_stats(room_id: Optional[str] = None, archive_dir: Optional[str] = None) -> Dict:
+    base_dir = archive_dir or settings.MESSAGE_ARCHIVE_DIR
+    if room_id is not None:
+        index = load_index(room_id, archive_dir)
+        return {"room_id": room_id, "months": index, "messages": sum(m["count"] for m in index.values())}
+
+    rooms = 0
+    messages = 0
+    size_bytes = 0
+    for dirpath, _, filenames in os.walk(base_dir):
+        for filename in filenames:
+            path = os.path.join(dirpath, filename)
+            size_bytes += os.path.getsize(path)
+            if filename == INDEX_FILE:
+                rooms += 1
+                with open(path, "r", encoding="utf-8") as f:
+                    messages += sum(m["count"] for m in json.load(f).values())
+    return {"rooms": rooms, "messages": messages, "size_bytes": size_bytes}
+
+
+def main():
+    from app.db import SessionLocal
+
+    parser = argparse.ArgumentParser(description="오래된 채팅 메시지 아카이브")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    run_parser = subparsers.add_parser("run", help="기준일 이전 메시지를 아카이브하고 DB에서 삭제")
+    run_parser.add_argument("--older-than-days", type=int, default=settings.MESSAGE_ARCHIVE_AFTER_DAYS)
+    run_parser.add_argument("--batch-size", type=int, default=5000)
+    run_parser.add_argument("--archive-dir", default=settings.MESSAGE_ARCHIVE_DIR)
+
+    stats_parser = subparsers.add_parser("stats", help="아카이브 현황 조회")
+    stats_parser.add_argument("room_id", nargs="?")
+    stats_parser.add_argument("--archive-dir", default=settings.MESSAGE_ARCHIVE_DIR)
+
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO)
+
+    if args.command == "run":
+        cutoff = datetime.utcnow() - timedelta(days=args.older_than_days)
+        with SessionLocal() as db:
+            result = archive_messages(db, cutoff, args.batch_size, args.archive_dir)
+        print(f"{cutoff.isoformat()} 이전 메시지 아카이브: {result}")
+    elif args.command == "stats":
+        print(json.dumps(archive_stats(args.room_id, args.archive_dir), ensure_ascii=False, indent=2))
+
+
+if __name__ == "__main__":
+    main()
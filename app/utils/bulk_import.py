@@ -0,0 +1,386 @@
+"""
+메시지/채팅방 대량 가져오기 (NDJSON, CSV)
+
+레거시 시스템 이관이나 부하 테스트 데이터 준비를 위해 대량의 행을 청크 단위로 검증하고 적재합니다.
+
+- PostgreSQL: 청크를 임시 스테이징 테이블로 COPY 한 뒤 INSERT ... SELECT로 옮기며
+  참조 무결성(채팅방/사용자 존재)을 만족하지 않는 행과 중복 ID는 건너뜀
+- 그 외 DB: 참조 대상 존재 여부를 조회한 뒤 executemany로 삽입
+- 청크마다 진행 상황(ImportProgress)을 반환
+- HTTP 업로드는 BodyChunkStream으로 받는 즉시 적재 스레드에 넘김 (본문 전체를 모아 두지 않음)
+
+사용법:
+    python -m app.utils.bulk_import messages data.ndjson [--chunk-size 10000]
+    python -m app.utils.bulk_import chatrooms rooms.csv
+    cat data.ndjson | python -m app.utils.bulk_import messages - --format ndjson
+"""
+from pydantic import BaseModel, ValidationError
+from sqlalchemy import select
+from sqlalchemy.engine import Connection, Engine
+from sqlalchemy.orm import Session
+from datetime import datetime
+from typing import Any, BinaryIO, Dict, Iterator, List, Optional, Tuple, Type, Union
+import argparse
+import csv
+import io
+import json
+import logging
+import queue
+import sys
+import time
+import uuid
+
+from app.models.chatroom import ChatroomDB, MessageDB
+from app.models.user_models import UserDB
+from app.schemas.bulk_import import ChatroomImportRow, ImportProgress, ImportRowError, MessageImportRow
+from app.utils.room_cards import refresh_room_card
+
+logger = logging.getLogger(__name__)
+
+IMPORT_KINDS = ("messages", "chatrooms")
+IMPORT_FORMATS = ("ndjson", "csv")
+DEFAULT_CHUNK_SIZE = 10_000
+MAX_REPORTED_ERRORS = 100
+
+# IN 절 하나에 넣는 최대 값 수 (SQLite 변수 개수 제한 고려)
+_IN_BATCH = 900
+
+MESSAGE_COLUMNS = ("id", "chatroom_id", "sender_id", "content", "timestamp", "is_read")
+CHATROOM_COLUMNS = (
+    "id", "title", "description", "created_at", "updated_at",
+    "created_by", "participants", "connection", "is_active"
+)
+
+
+class BodyChunkStream(io.RawIOBase):
+    """
+    다른 스레드(요청 본문을 읽는 이벤트 루프)가 feed()로 넣는 청크를 읽는 스트림.
+
+    큐 크기가 정해져 있어 적재가 느리면 feed()가 기다리므로 업로드 속도가 적재 속도를 넘지 않습니다.
+    읽는 쪽이 먼저 끝나면 abandon()으로 이후 청크를 버립니다.
+    본문 수신이 중간에 끊기면 fail()로 알려, 잘린 본문을 정상 종료로 읽지 않게 합니다.
+    """
+
+    def __init__(self, max_chunks: int = 16):
+        super().__init__()
+        self._chunks: "queue.Queue[Union[bytes, Exception, None]]" = queue.Queue(maxsize=max_chunks)
+        self._buffer = memoryview(b"")
+        self._eof = False
+        self._abandoned = False
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, target) -> int:
+        while not self._buffer:
+            if self._eof:
+                return 0
+            chunk = self._chunks.get()
+            if chunk is None:
+                self._eof = True
+                return 0
+            if isinstance(chunk, Exception):
+                self._eof = True
+                raise chunk
+            self._buffer = memoryview(chunk)
+        size = min(len(target), len(self._buffer))
+        target[:size] = self._buffer[:size]
+        self._buffer = self._buffer[size:]
+        return size
+
+    def _put(self, item: Union[bytes, Exception, None]):
+        while not self._abandoned:
+            try:
+                self._chunks.put(item, timeout=0.5)
+                return
+            except queue.Full:
+                continue
+
+    def feed(self, chunk: bytes):
+        """본문 청크를 넣습니다. (큐가 가득 차면 기다림)"""
+        if chunk:
+            self._put(chunk)
+
+    def finish(self):
+        """본문 끝을 알립니다."""
+        self._put(None)
+
+    def fail(self, error: Exception):
+        """본문 수신 실패를 알립니다. (읽는 쪽에서 error가 발생)"""
+        self._put(error)
+
+    def abandon(self):
+        """읽는 쪽이 끝났으므로 이후 feed()/finish()는 기다리지 않고 버립니다."""
+        self._abandoned = True
+
+
+def iter_records(stream: BinaryIO, fmt: str) -> Iterator[Tuple[int, Any]]:
+    """입력 스트림에서 (행 번호, 레코드 dict 또는 파싱 오류 문자열)을 생성합니다."""
+    if fmt == "ndjson":
+        for line_no, line in enumerate(stream, 1):
+            if not line.strip():
+                continue
+            try:
+                yield line_no, json.loads(line)
+            except ValueError as e:
+                yield line_no, f"JSON 파싱 오류: {str(e)}"
+    elif fmt == "csv":
+        text_stream = io.TextIOWrapper(stream, encoding="utf-8-sig", newline="")
+        # 1행은 헤더
+        for line_no, row in enumerate(csv.DictReader(text_stream), 2):
+            yield line_no, {key: value for key, value in row.items() if value != ""}
+    else:
+        raise ValueError(f"지원하지 않는 형식입니다: {fmt}")
+
+
+def _chunks(records: Iterator[Tuple[int, Any]], size: int) -> Iterator[List[Tuple[int, Any]]]:
+    chunk = []
+    for record in records:
+        chunk.append(record)
+        if len(chunk) >= size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def _validate(
+    chunk: List[Tuple[int, Any]],
+    model: Type[BaseModel],
+    progress: ImportProgress
+) -> List[BaseModel]:
+    valid = []
+    for line_no, record in chunk:
+        try:
+            if isinstance(record, str):
+                raise ValueError(record)
+            valid.append(model.model_validate(record))
+        except (ValidationError, ValueError, TypeError) as e:
+            progress.rows_invalid += 1
+            if len(progress.errors) < MAX_REPORTED_ERRORS:
+                if isinstance(e, ValidationError):
+                    first = e.errors()[0]
+                    message = f"{'.'.join(str(loc) for loc in first['loc'])}: {first['msg']}"
+                else:
+                    message = str(e)
+                progress.errors.append(ImportRowError(line=line_no, error=message))
+    return valid
+
+
+def _message_values(row: MessageImportRow, now: datetime) -> Dict[str, Any]:
+    return {
+        "id": row.id or str(uuid.uuid4()),
+        "chatroom_id": row.chatroom_id,
+        "sender_id": row.sender_id,
+        "content": row.content,
+        "timestamp": row.timestamp or now,
+        "is_read": row.is_read
+    }
+
+
+def _chatroom_values(row: ChatroomImportRow, now: datetime) -> Dict[str, Any]:
+    created_at = row.created_at or now
+    return {
+        "id": row.id or str(uuid.uuid4()),
+        "title": row.title,
+        "description": row.description,
+        "created_at": created_at,
+        "updated_at": created_at,
+        "created_by": row.created_by,
+        "participants": row.participants,
+        "connection": [coord.model_dump() for coord in row.connection],
+        "is_active": row.is_active
+    }
+
+
+def _existing(conn: Connection, column, values) -> set:
+    """column 값 중 이미 존재하는 값의 집합을 반환합니다."""
+    values = list(set(values))
+    found = set()
+    for start in range(0, len(values), _IN_BATCH):
+        batch = values[start:start + _IN_BATCH]
+        found.update(conn.execute(select(column).where(column.in_(batch))).scalars())
+    return found
+
+
+def _copy_to_staging(conn: Connection, table: str, columns: Tuple[str, ...], rows: List[Dict[str, Any]]):
+    """rows를 CSV로 직렬화하여 스테이징 테이블로 COPY 합니다."""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    for row in rows:
+        writer.writerow([
+            value.isoformat() if isinstance(value, datetime)
+            else ("true" if value else "false") if isinstance(value, bool)
+            else json.dumps(value) if isinstance(value, list)
+            else value
+            for value in (row[column] for column in columns)
+        ])
+    buffer.seek(0)
+    cursor = conn.connection.cursor()
+    try:
+        cursor.copy_expert(f"COPY {table} ({', '.join(columns)}) FROM STDIN WITH (FORMAT csv)", buffer)
+    finally:
+        cursor.close()
+
+
+def _load_messages_postgres(conn: Connection, rows: List[Dict[str, Any]]) -> int:
+    conn.exec_driver_sql(
+        "CREATE TEMP TABLE IF NOT EXISTS import_messages ("
+        "id VARCHAR, chatroom_id VARCHAR, sender_id VARCHAR(50), content TEXT, "
+        "timestamp TIMESTAMP WITHOUT TIME ZONE, is_read BOOLEAN"
+        ") ON COMMIT DELETE ROWS"
+    )
+    _copy_to_staging(conn, "import_messages", MESSAGE_COLUMNS, rows)
+    result = conn.exec_driver_sql(
+        "INSERT INTO messages (id, chatroom_id, sender_id, content, timestamp, is_read) "
+        "SELECT DISTINCT ON (s.id) s.id, s.chatroom_id, s.sender_id, s.content, s.timestamp, s.is_read "
+        "FROM import_messages s "
+        "WHERE EXISTS (SELECT 1 FROM chatrooms c WHERE c.id = s.chatroom_id) "
+        "AND EXISTS (SELECT 1 FROM users u WHERE u.firebase_uid = s.sender_id) "
+        # 파티션 테이블의 기본 키는 (id, timestamp)이므로 ON CONFLICT만으로는 id 중복을 막지 못함
+        # (청크 안의 중복 id는 DISTINCT ON으로 하나만 남김, 일반 경로와 같은 id 기준 중복 제거)
+        "AND NOT EXISTS (SELECT 1 FROM messages m WHERE m.id = s.id) "
+        "ORDER BY s.id "
+        "ON CONFLICT DO NOTHING"
+    )
+    return result.rowcount
+
+
+def _load_chatrooms_postgres(conn: Connection, rows: List[Dict[str, Any]]) -> int:
+    conn.exec_driver_sql(
+        "CREATE TEMP TABLE IF NOT EXISTS import_chatrooms ("
+        "id VARCHAR, title VARCHAR(100), description TEXT, "
+        "created_at TIMESTAMP WITHOUT TIME ZONE, updated_at TIMESTAMP WITHOUT TIME ZONE, "
+        "created_by VARCHAR(50), participants TEXT, connection TEXT, is_active BOOLEAN"
+        ") ON COMMIT DELETE ROWS"
+    )
+    _copy_to_staging(conn, "import_chatrooms", CHATROOM_COLUMNS, rows)
+    # 스테이징 테이블의 JSON 텍스트는 JSONB 컬럼으로 캐스팅
+    select_columns = [
+        f"{column}::jsonb" if column in ("participants", "connection") else column
+        for column in CHATROOM_COLUMNS
+    ]
+    result = conn.exec_driver_sql(
+        f"INSERT INTO chatrooms ({', '.join(CHATROOM_COLUMNS)}) "
+        f"SELECT {', '.join(select_columns)} FROM import_chatrooms "
+        f"ON CONFLICT DO NOTHING"
+    )
+    return result.rowcount
+
+
+def _load_messages_generic(conn: Connection, rows: List[Dict[str, Any]]) -> int:
+    rooms = _existing(conn, ChatroomDB.id, (row["chatroom_id"] for row in rows))
+    users = _existing(conn, UserDB.firebase_uid, (row["sender_id"] for row in rows))
+    duplicates = _existing(conn, MessageDB.id, (row["id"] for row in rows))
+
+    accepted = {}
+    for row in rows:
+        if row["chatroom_id"] in rooms and row["sender_id"] in users and row["id"] not in duplicates:
+            accepted.setdefault(row["id"], row)
+    if accepted:
+        conn.execute(MessageDB.__table__.insert(), list(accepted.values()))
+    return len(accepted)
+
+
+def _load_chatrooms_generic(conn: Connection, rows: List[Dict[str, Any]]) -> int:
+    duplicates = _existing(conn, ChatroomDB.id, (row["id"] for row in rows))
+    accepted = {}
+    for row in rows:
+        if row["id"] not in duplicates:
+            accepted.setdefault(row["id"], row)
+    if accepted:
+        conn.execute(ChatroomDB.__table__.insert(), list(accepted.values()))
+    return len(accepted)
+
+
+_IMPORTERS = {
+    "messages": (MessageImportRow, _message_values, _load_messages_postgres, _load_messages_generic),
+    "chatrooms": (ChatroomImportRow, _chatroom_values, _load_chatrooms_postgres, _load_chatrooms_generic),
+}
+
+# 청크를 적재한 뒤 카드를 다시 만들 채팅방 id
+_CARD_ROOM_KEYS = {"messages": "chatroom_id", "chatrooms": "id"}
+
+
+def _refresh_cards(engine: Engine, room_ids: set):
+    with Session(engine) as db:
+        for room_id in room_ids:
+            refresh_room_card(db, room_id)
+        db.commit()
+
+
+def iter_import(
+    stream: BinaryIO,
+    kind: str,
+    fmt: str = "ndjson",
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    engine: Optional[Engine] = None
+) -> Iterator[ImportProgress]:
+    """
+    입력 스트림을 청크 단위로 검증/적재하며 청크마다 진행 상황을 반환합니다.
+
+    각 청크는 별도 트랜잭션으로 커밋되므로 중간에 실패해도 앞선 청크는 유지됩니다.
+    마지막으로 done=True인 진행 상황을 반환합니다.
+    """
+    if kind not in _IMPORTERS:
+        raise ValueError(f"지원하지 않는 가져오기 대상입니다: {kind}")
+    if engine is None:
+        from app.db import engine
+
+    model, to_values, load_postgres, load_generic = _IMPORTERS[kind]
+    load = load_postgres if engine.dialect.name == "postgresql" else load_generic
+
+    progress = ImportProgress(kind=kind)
+    started = time.perf_counter()
+    for chunk in _chunks(iter_records(stream, fmt), chunk_size):
+        progress.rows_read += len(chunk)
+        valid = _validate(chunk, model, progress)
+        if valid:
+            now = datetime.utcnow()
+            rows = [to_values(row, now) for row in valid]
+            with engine.begin() as conn:
+                inserted = load(conn, rows)
+            if inserted:
+                _refresh_cards(engine, {row[_CARD_ROOM_KEYS[kind]] for row in rows})
+            progress.rows_inserted += inserted
+            progress.rows_skipped += len(rows) - inserted
+        progress.chunks += 1
+        progress.elapsed_seconds = round(time.perf_counter() - started, 3)
+        progress.rows_per_second = round(progress.rows_read / max(progress.elapsed_seconds, 1e-9), 1)
+        yield progress.model_copy()
+
+    progress.done = True
+    logger.info(
+        f"대량 가져오기 완료 ({kind}): 읽음 {progress.rows_read}, 삽입 {progress.rows_inserted}, "
+        f"제외 {progress.rows_skipped}, 오류 {progress.rows_invalid}, {progress.rows_per_second} rows/s"
+    )
+    yield progress
+
+
+def main():
+    parser = argparse.ArgumentParser(description="메시지/채팅방 대량 가져오기")
+    parser.add_argument("kind", choices=IMPORT_KINDS)
+    parser.add_argument("path", help="입력 파일 경로 (- 이면 표준 입력)")
+    parser.add_argument("--format", choices=IMPORT_FORMATS, help="생략하면 확장자로 판단")
+    parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE)
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO)
+
+    fmt = args.format or ("csv" if args.path.endswith(".csv") else "ndjson")
+    stream = sys.stdin.buffer if args.path == "-" else open(args.path, "rb")
+    try:
+        for progress in iter_import(stream, args.kind, fmt, args.chunk_size):
+            print(
+                f"[{'완료' if progress.done else progress.chunks}] 읽음 {progress.rows_read:,} / "
+                f"삽입 {progress.rows_inserted:,} / 제외 {progress.rows_skipped:,} / "
+                f"오류 {progress.rows_invalid:,} ({progress.rows_per_second:,.0f} rows/s)"
+            )
+        for error in progress.errors:
+            print(f"  {error.line}행: {error.error}")
+    finally:
+        if stream is not sys.stdin.buffer:
+            stream.close()
+
+
+if __name__ == "__main__":
+    main()
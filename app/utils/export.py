@@ -0,0 +1,78 @@
+"""
+채팅 내역 NDJSON 내보내기
+
+채팅방의 전체 메시지를 오래된 순서로 한 줄에 하나씩 JSON으로 내보냅니다.
+아카이브된 메시지(app.utils.archive)를 먼저, 이어서 DB에 남은 메시지를 내보내며
+DB는 서버 사이드 커서(yield_per)로 읽어 채팅방 크기와 무관하게 메모리 사용량이 일정합니다.
+"""
+from sqlalchemy import select
+from typing import Dict, Iterator, Optional
+import json
+import logging
+
+from app.db import session_router
+from app.models.chatroom import MessageDB
+from app.utils.archive import iter_month, load_index
+
+logger = logging.getLogger(__name__)
+
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+
+# 한 번에 가져오는 DB 행 수 / 한 번에 내보내는 청크 크기(바이트)
+EXPORT_FETCH_SIZE = 2000
+EXPORT_CHUNK_BYTES = 64 * 1024
+
+
+def _ndjson_line(message_id: str, sender_id: str, content: str, timestamp, is_read) -> bytes:
+    record: Dict = {
+        "id": message_id,
+        "senderId": sender_id,
+        "content": content,
+        "timestamp": timestamp.isoformat() if timestamp else None,
+        "isRead": bool(is_read)
+    }
+    return json.dumps(record, ensure_ascii=False, separators=(",", ":")).encode("utf-8") + b"\n"
+
+
+def iter_room_ndjson(room_id: str, user_id: Optional[str] = None) -> Iterator[bytes]:
+    """
+    채팅방 전체 내역을 NDJSON 청크로 생성합니다.
+
+    StreamingResponse가 스레드풀에서 순회하며, 요청 의존성 세션은 응답 전송 전에
+    닫히므로 여기서 읽기 세션을 직접 열고 닫습니다.
+    """
+    buffer = bytearray()
+    exported = 0
+
+    # 1) 아카이브 (월 오름차순)
+    for month in sorted(load_index(room_id).keys()):
+        for record in iter_month(room_id, month):
+            buffer += _ndjson_line(
+                record["id"], record["sender_id"], record["content"], record["timestamp"], record.get("is_read")
+            )
+            exported += 1
+            if len(buffer) >= EXPORT_CHUNK_BYTES:
+                yield bytes(buffer)
+                buffer.clear()
+
+    # 2) DB (서버 사이드 커서로 스트리밍)
+    statement = select(
+        MessageDB.id, MessageDB.sender_id, MessageDB.content, MessageDB.timestamp, MessageDB.is_read
+    ).where(MessageDB.chatroom_id == room_id).order_by(MessageDB.timestamp, MessageDB.id)
+
+    db = session_router.read_session(user_id)
+    try:
+        result = db.execute(statement, execution_options={"yield_per": EXPORT_FETCH_SIZE})
+        for row in result:
+            buffer += _ndjson_line(*row)
+            exported += 1
+            if len(buffer) >= EXPORT_CHUNK_BYTES:
+                yield bytes(buffer)
+                buffer.clear()
+        result.close()
+    finally:
+        db.close()
+
+    if buffer:
+        yield bytes(buffer)
+    logger.info(f"채팅 내역 내보내기 완료: room={room_id}, messages={exported}")
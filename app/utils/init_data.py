@@ -1,7 +1,7 @@
 from sqlalchemy.orm import Session
 from app.models.chatroom import ChatroomDB
 from app.core.firebase import get_db
-import json
+from app.utils.room_cards import ensure_room_cards, refresh_room_card
 import uuid
 from datetime import datetime
 from typing import List, Dict, Any
@@ -95,11 +95,12 @@ def create_default_chatrooms(db: Session) -> None:
                 created_at=datetime.utcnow(),
                 updated_at=datetime.utcnow(),
                 is_active=True,
-                participants=json.dumps([]),  # 빈 참여자 목록으로 시작
-                connection=json.dumps(chatroom_data['connection'])
+                participants=[],  # 빈 참여자 목록으로 시작
+                connection=chatroom_data['connection']
             )
             
             db.add(new_chatroom)
+            refresh_room_card(db, new_chatroom.id)
             created_count += 1
         
         db.commit()
@@ -132,6 +133,9 @@ async def init_application_data():
         # 기본 채팅방 생성
         create_default_chatrooms(db)
         
+        # 채팅방 카드가 비어 있거나 어긋나 있으면 (마이그레이션 직후 등) 다시 생성
+        ensure_room_cards(db)
+        
         logger.info("애플리케이션 초기 데이터 설정이 완료되었습니다.")
         
     except Exception as e:
@@ -0,0 +1,100 @@
+# app/utils/membership.py
+"""
+채팅방 참여자 추가/제거 (원자적 UPDATE)
+
+참여자 목록을 읽어 파이썬에서 고친 뒤 다시 쓰면, 인기 채팅방에 동시에 참여할 때
+나중에 커밋한 요청이 앞선 변경을 덮어써 참여자가 사라집니다.
+여기서는 변경을 UPDATE 문 하나로 수행합니다.
+
+- PostgreSQL: participants || '["uid"]' / participants - 'uid' (JSONB 연산자).
+  같은 행을 동시에 고치는 UPDATE는 행 잠금 뒤 최신 값에 다시 적용되므로 유실되지 않습니다.
+- SQLite: json_insert / json_each (JSON1 함수)
+- 그 밖의 DB: 행을 잠그고(SELECT ... FOR UPDATE) 읽은 뒤 수정
+
+참여 여부 확인도 같은 UPDATE의 WHERE 조건으로 처리하므로, 반환값으로 실제 변경 여부를 알 수 있습니다.
+커밋은 호출한 쪽에서 합니다 (채팅방 카드 갱신과 같은 트랜잭션).
+"""
+from sqlalchemy import DateTime, bindparam, text
+from sqlalchemy.orm import Session
+from datetime import datetime
+
+from app.models.chatroom import ChatroomDB
+
+_ADD = {
+    "postgresql": """
+        UPDATE chatrooms
+        SET participants = participants || jsonb_build_array(CAST(:uid AS text)), updated_at = :now
+        WHERE id = :room_id AND NOT participants @> jsonb_build_array(CAST(:uid AS text))
+    """,
+    "sqlite": """
+        UPDATE chatrooms
+        SET participants = json_insert(coalesce(participants, '[]'), '$[#]', :uid), updated_at = :now
+        WHERE id = :room_id
+          AND NOT EXISTS (SELECT 1 FROM json_each(chatrooms.participants) WHERE value = :uid)
+    """,
+}
+
+_REMOVE = {
+    "postgresql": """
+        UPDATE chatrooms
+        SET participants = participants - CAST(:uid AS text),
+            is_active = CASE WHEN participants - CAST(:uid AS text) = '[]'::jsonb THEN false ELSE is_active END,
+            updated_at = :now
+        WHERE id = :room_id AND participants @> jsonb_build_array(CAST(:uid AS text))
+    """,
+    "sqlite": """
+        UPDATE chatrooms
+        SET participants = (
+                SELECT json_group_array(value) FROM json_each(chatrooms.participants) WHERE value != :uid
+            ),
+            is_active = CASE
+                WHEN NOT EXISTS (SELECT 1 FROM json_each(chatrooms.participants) WHERE value != :uid)
+                THEN 0 ELSE is_active END,
+            updated_at = :now
+        WHERE id = :room_id
+          AND EXISTS (SELECT 1 FROM json_each(chatrooms.participants) WHERE value = :uid)
+    """,
+}
+
+
+def _execute(db: Session, statements, chatroom: ChatroomDB, uid: str) -> bool:
+    statement = text(statements[db.get_bind().dialect.name]).bindparams(bindparam("now", type_=DateTime))
+    result = db.execute(statement, {"room_id": chatroom.id, "uid": uid, "now": datetime.utcnow()})
+    # 세션의 채팅방 객체는 UPDATE 이전 값이므로 다음 접근 시 다시 읽도록 함
+    db.expire(chatroom)
+    return result.rowcount > 0
+
+
+def add_participant(db: Session, chatroom: ChatroomDB, uid: str) -> bool:
+    """uid를 참여자로 추가합니다. 추가되었으면 True, 이미 참여 중이면 False."""
+    if db.get_bind().dialect.name in _ADD:
+        return _execute(db, _ADD, chatroom, uid)
+
+    db.refresh(chatroom, with_for_update=True)
+    participants = chatroom.get_participants()
+    if uid in participants:
+        return False
+    chatroom.participants = participants + [uid]
+    chatroom.updated_at = datetime.utcnow()
+    db.flush()
+    return True
+
+
+def remove_participant(db: Session, chatroom: ChatroomDB, uid: str) -> bool:
+    """
+    uid를 참여자에서 제거합니다. 제거되었으면 True, 참여 중이 아니면 False.
+    마지막 참여자가 나가면 채팅방을 비활성화합니다.
+    """
+    if db.get_bind().dialect.name in _REMOVE:
+        return _execute(db, _REMOVE, chatroom, uid)
+
+    db.refresh(chatroom, with_for_update=True)
+    participants = chatroom.get_participants()
+    if uid not in participants:
+        return False
+    chatroom.participants = [participant for participant in participants if participant != uid]
+    chatroom.updated_at = datetime.utcnow()
+    if not chatroom.participants:
+        chatroom.is_active = False
+    db.flush()
+    return True
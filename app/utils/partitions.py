@@ -0,0 +1,314 @@
+"""
+messages 월별 파티션 관리
+
+- ensure: 앞으로 N개월 파티션을 미리 생성 (애플리케이션 시작 시 및 하루 주기로 자동 실행)
+- archive: 보존 기간이 지난 파티션을 분리(DETACH)하고, 메시지 아카이브(app.utils.archive)로 내보낸 뒤 삭제
+  분리는 짧은 트랜잭션으로 먼저 커밋하므로 messages의 ACCESS EXCLUSIVE 잠금은 분리하는 동안만 걸리고,
+  내보내기는 분리된 단독 테이블에서 읽습니다. 테이블은 아카이브 파일과 인덱스가 디스크에 기록된 뒤에 삭제합니다.
+  (분리된 메시지가 있던 채팅방의 카드는 분리 직후 다시 만듦)
+  --keep-detached로 분리만 하면 해당 메시지는 messages에도 아카이브에도 없으므로 채팅 내역 조회에서 보이지 않습니다.
+  이렇게 남은 테이블(및 중단된 이전 실행이 남긴 테이블)은 다음 archive 실행 때 함께 내보내고 삭제합니다.
+- status: 파티션 목록과 행 수 조회
+
+사용법:
+    python -m app.utils.partitions status
+    python -m app.utils.partitions ensure [--months-ahead 3]
+    python -m app.utils.partitions archive [--retain-months 12] [--archive-dir archive/messages] [--keep-detached]
+"""
+from sqlalchemy import text
+from sqlalchemy.engine import Connection, Engine
+from sqlalchemy.orm import Session
+from datetime import datetime
+from typing import Dict, List, Optional
+import argparse
+import asyncio
+import logging
+import re
+
+from app.core.config import settings
+from app.utils.archive import write_month
+from app.utils.room_cards import refresh_room_card
+
+logger = logging.getLogger(__name__)
+
+PARENT_TABLE = "messages"
+DEFAULT_PARTITION = "messages_default"
+PARTITION_NAME_RE = re.compile(r"^messages_y(\d{4})m(\d{2})$")
+
+
+def month_floor(value: datetime) -> datetime:
+    return datetime(value.year, value.month, 1)
+
+
+def add_months(month_start: datetime, months: int) -> datetime:
+    month_index = month_start.year * 12 + month_start.month - 1 + months
+    return datetime(month_index // 12, month_index % 12 + 1, 1)
+
+
+def partition_name(month_start: datetime) -> str:
+    return f"{PARENT_TABLE}_y{month_start:%Y}m{month_start:%m}"
+
+
+def is_partitioned(conn: Connection) -> bool:
+    """messages가 파티션 테이블인지 확인합니다. (PostgreSQL이 아니면 False)"""
+    if conn.dialect.name != "postgresql":
+        return False
+    return bool(conn.execute(text(
+        "SELECT 1 FROM pg_partitioned_table p JOIN pg_class c ON c.oid = p.partrelid "
+        "WHERE c.relname = :name"
+    ), {"name": PARENT_TABLE}).scalar())
+
+
+def _month_partitions(names: List[str]) -> List[Dict]:
+    partitions = []
+    for name in names:
+        match = PARTITION_NAME_RE.match(name)
+        if match:
+            month = datetime(int(match.group(1)), int(match.group(2)), 1)
+            partitions.append({"name": name, "month": month})
+    return sorted(partitions, key=lambda p: p["month"])
+
+
+def list_partitions(conn: Connection) -> List[Dict]:
+    """월 파티션 목록을 오래된 순으로 반환합니다."""
+    rows = conn.execute(text(
+        "SELECT c.relname FROM pg_inherits i "
+        "JOIN pg_class c ON c.oid = i.inhrelid "
+        "JOIN pg_class p ON p.oid = i.inhparent "
+        "WHERE p.relname = :name"
+    ), {"name": PARENT_TABLE}).scalars().all()
+    return _month_partitions(rows)
+
+
+def list_detached_partitions(conn: Connection) -> List[Dict]:
+    """분리된 뒤 아직 삭제되지 않은 월 테이블 목록을 오래된 순으로 반환합니다. (--keep-detached, 중단된 실행)"""
+    rows = conn.execute(text(
+        "SELECT c.relname FROM pg_class c "
+        "JOIN pg_namespace n ON n.oid = c.relnamespace "
+        "WHERE c.relkind = 'r' AND n.nspname = current_schema() "
+        "AND NOT EXISTS (SELECT 1 FROM pg_inherits i WHERE i.inhrelid = c.oid)"
+    )).scalars().all()
+    return _month_partitions(rows)
+
+
+def create_month_partition(conn: Connection, month_start: datetime) -> bool:
+    """월 파티션을 생성합니다. 이미 있으면 False를 반환합니다."""
+    name = partition_name(month_start)
+    exists = conn.execute(text("SELECT to_regclass(:name)"), {"name": name}).scalar()
+    if exists:
+        return False
+    next_month = add_months(month_start, 1)
+    conn.execute(text(
+        f"CREATE TABLE {name} PARTITION OF {PARENT_TABLE} "
+        f"FOR VALUES FROM ('{month_start:%Y-%m-%d}') TO ('{next_month:%Y-%m-%d}')"
+    ))
+    logger.info(f"메시지 파티션 생성: {name}")
+    return True
+
+
+def ensure_future_partitions(conn: Connection, months_ahead: Optional[int] = None) -> List[str]:
+    """이번 달부터 months_ahead개월 뒤까지의 파티션이 있는지 확인하고 없으면 생성합니다."""
+    if months_ahead is None:
+        months_ahead = settings.MESSAGE_PARTITION_MONTHS_AHEAD
+    if not is_partitioned(conn):
+        return []
+
+    created = []
+    current = month_floor(datetime.utcnow())
+    for offset in range(months_ahead + 1):
+        month = add_months(current, offset)
+        if create_month_partition(conn, month):
+            created.append(partition_name(month))
+
+    # DEFAULT 파티션에 행이 쌓였다면 미리 생성이 누락된 것
+    default_rows = conn.execute(text(
+        f"SELECT count(*) FROM {DEFAULT_PARTITION}"
+    )).scalar() if conn.execute(text("SELECT to_regclass(:name)"), {"name": DEFAULT_PARTITION}).scalar() else 0
+    if default_rows:
+        logger.warning(f"{DEFAULT_PARTITION}에 {default_rows}개의 메시지가 있습니다. 파티션 범위를 확인하세요.")
+    return created
+
+
+def ensure_partitions_once() -> List[str]:
+    """엔진에서 트랜잭션을 열어 미래 파티션을 확인합니다. (스레드풀에서 호출)"""
+    from app.db import engine
+
+    with engine.begin() as conn:
+        return ensure_future_partitions(conn)
+
+
+async def run_partition_maintenance():
+    """주기적으로 미래 월 파티션을 확인하는 백그라운드 루프"""
+    from starlette.concurrency import run_in_threadpool
+
+    while True:
+        try:
+            created = await run_in_threadpool(ensure_partitions_once)
+            if created:
+                logger.info(f"메시지 파티션 유지보수: {created} 생성")
+        except Exception as e:
+            logger.error(f"메시지 파티션 유지보수 실패: {str(e)}")
+        await asyncio.sleep(settings.MESSAGE_PARTITION_CHECK_INTERVAL)
+
+
+def export_partition(conn: Connection, name: str, month: datetime, archive_dir: str) -> int:
+    """파티션 전체를 채팅방별 월 아카이브 파일로 내보냅니다. (app.utils.archive 형식)"""
+    rows = conn.execution_options(stream_results=True).execute(text(
+        f"SELECT id, chatroom_id, sender_id, content, timestamp, is_read FROM {name} "
+        f"ORDER BY chatroom_id, timestamp"
+    ))
+
+    exported = 0
+    current_room = None
+    records: List[Dict] = []
+    for row in rows:
+        if row.chatroom_id != current_room:
+            if records:
+                write_month(current_room, f"{month:%Y-%m}", records, archive_dir)
+            current_room = row.chatroom_id
+            records = []
+        records.append({
+            "id": row.id,
+            "sender_id": row.sender_id,
+            "content": row.content,
+            "timestamp": row.timestamp,
+            "is_read": bool(row.is_read)
+        })
+        exported += 1
+    if records:
+        write_month(current_room, f"{month:%Y-%m}", records, archive_dir)
+    return exported
+
+
+def _refresh_cards(engine: Engine, name: str) -> int:
+    """분리된 테이블에 메시지가 있던 채팅방의 카드를 다시 만듭니다. (messages는 일반 읽기만)"""
+    with engine.connect() as conn:
+        room_ids = conn.execute(text(f"SELECT DISTINCT chatroom_id FROM {name}")).scalars().all()
+    with Session(bind=engine) as db:
+        for room_id in room_ids:
+            refresh_room_card(db, room_id)
+        db.commit()
+    return len(room_ids)
+
+
+def _archive_detached(engine: Engine, partition: Dict, archive_dir: str) -> Dict:
+    """분리된 단독 테이블을 아카이브로 내보낸 뒤 삭제합니다. (부모 테이블 잠금 없음)"""
+    name = partition["name"]
+    with engine.connect() as conn:
+        exported = export_partition(conn, name, partition["month"], archive_dir)
+    # write_month가 파일과 인덱스를 fsync한 뒤에만 삭제 (중간에 실패하면 테이블이 남아 다음 실행에서 다시 내보냄)
+    with engine.begin() as conn:
+        conn.execute(text(f"DROP TABLE {name}"))
+    return {"archived_messages": exported, "dropped": True}
+
+
+def archive_cold_partitions(
+    engine: Engine,
+    retain_months: Optional[int] = None,
+    archive_dir: Optional[str] = None,
+    drop: bool = True
+) -> List[Dict]:
+    """
+    보존 기간이 지난 월 파티션을 분리합니다.
+
+    파티션마다 DETACH만 짧은 트랜잭션으로 커밋한 뒤, 분리된 테이블에 메시지가 있던
+    채팅방의 카드를 다시 만듭니다. drop=True이면 분리된 테이블을 메시지 아카이브로
+    내보낸 뒤 삭제하고, 이전에 분리만 해 둔 테이블도 함께 처리합니다.
+    False이면 분리된 테이블을 그대로 남겨 둡니다. (채팅 내역 조회에서 보이지 않음)
+    """
+    if retain_months is None:
+        retain_months = settings.MESSAGE_PARTITION_RETAIN_MONTHS
+    if archive_dir is None:
+        archive_dir = settings.MESSAGE_ARCHIVE_DIR
+
+    with engine.connect() as conn:
+        if not is_partitioned(conn):
+            return []
+        cutoff = add_months(month_floor(datetime.utcnow()), -retain_months)
+        cold = [p for p in list_partitions(conn) if p["month"] < cutoff]
+        leftover = list_detached_partitions(conn) if drop else []
+
+    archived = []
+    for partition in leftover:
+        result = {"name": partition["name"], "month": partition["month"].strftime("%Y-%m"), "detached": True}
+        result.update(_archive_detached(engine, partition, archive_dir))
+        logger.info(f"이전에 분리된 메시지 파티션 보관 처리: {result}")
+        archived.append(result)
+
+    for partition in cold:
+        name = partition["name"]
+        # ACCESS EXCLUSIVE 잠금은 이 트랜잭션 동안만 유지됨
+        with engine.begin() as conn:
+            conn.execute(text(f"ALTER TABLE {PARENT_TABLE} DETACH PARTITION {name}"))
+        result = {"name": name, "month": partition["month"].strftime("%Y-%m"), "detached": True}
+        result["refreshed_cards"] = _refresh_cards(engine, name)
+        if drop:
+            result.update(_archive_detached(engine, partition, archive_dir))
+        logger.info(f"메시지 파티션 보관 처리: {result}")
+        archived.append(result)
+    return archived
+
+
+def partition_status(conn: Connection) -> List[Dict]:
+    status = []
+    for partition in list_partitions(conn):
+        rows = conn.execute(text(
+            "SELECT reltuples::bigint FROM pg_class WHERE relname = :name"
+        ), {"name": partition["name"]}).scalar()
+        status.append({
+            "name": partition["name"],
+            "month": partition["month"].strftime("%Y-%m"),
+            "estimated_rows": rows
+        })
+    return status
+
+
+def main():
+    from app.db import engine
+
+    parser = argparse.ArgumentParser(description="messages 월별 파티션 관리")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    subparsers.add_parser("status", help="파티션 목록 조회")
+
+    ensure_parser = subparsers.add_parser("ensure", help="앞으로의 월 파티션 미리 생성")
+    ensure_parser.add_argument("--months-ahead", type=int, default=settings.MESSAGE_PARTITION_MONTHS_AHEAD)
+
+    archive_parser = subparsers.add_parser("archive", help="보존 기간이 지난 파티션 분리 및 보관")
+    archive_parser.add_argument("--retain-months", type=int, default=settings.MESSAGE_PARTITION_RETAIN_MONTHS)
+    archive_parser.add_argument("--archive-dir", default=settings.MESSAGE_ARCHIVE_DIR)
+    archive_parser.add_argument(
+        "--keep-detached", action="store_true",
+        help="내보내기/삭제 없이 분리만 수행 (다음 archive 실행 전까지 채팅 내역 조회에서 보이지 않음)"
+    )
+
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO)
+
+    with engine.connect() as conn:
+        partitioned = is_partitioned(conn)
+    if not partitioned:
+        print("messages 테이블이 파티션 테이블이 아닙니다. 먼저 alembic upgrade head를 실행하세요.")
+        return
+
+    if args.command == "archive":
+        # 파티션마다 분리/내보내기/삭제를 각각의 짧은 트랜잭션으로 처리
+        archived = archive_cold_partitions(
+            engine, args.retain_months, args.archive_dir, drop=not args.keep_detached
+        )
+        for row in archived:
+            print(row)
+        print(f"보관 처리된 파티션: {len(archived)}개")
+        return
+
+    with engine.begin() as conn:
+        if args.command == "status":
+            for row in partition_status(conn):
+                print(f"{row['name']:<24}{row['month']:>10}{row['estimated_rows']:>14,}")
+        elif args.command == "ensure":
+            created = ensure_future_partitions(conn, args.months_ahead)
+            print(f"생성된 파티션: {created or '없음'}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,341 @@
+# app/utils/room_cards.py
+"""
+채팅방 목록용 비정규화 카드 (chatroom_cards 테이블)
+
+채팅방 응답(Chatroom)은 채팅방 행, connection JSON, 참여자 프로필 전체, 최근 메시지 10개가
+필요합니다. 카드는 이 응답 JSON을 채팅방마다 미리 만들어 두는 projection으로,
+목록/검색 엔드포인트는 인덱스를 타는 쿼리 한 번으로 카드를 읽어 그대로 이어 붙여 응답합니다.
+
+카드는 변경과 같은 트랜잭션에서 갱신합니다 (호출한 쪽에서 commit):
+- 채팅방 생성/참여/나가기/삭제: refresh_room_card(room_id)
+- 프로필 수정: refresh_user_cards(uid) - 그 사용자가 참여한 채팅방 카드
+- 대량 가져오기 등: rebuild_room_cards()
+
+- 메시지 아카이브/파티션 보관: 메시지가 빠진 채팅방마다 refresh_room_card(room_id)
+
+메시지 생성은 예외로, 메시지 트랜잭션이 카드 행을 잠그지 않도록 커밋 뒤에
+room_card_refresher.schedule(room_id)로 넘기고 백그라운드 스레드가 묶어서 다시 만듭니다.
+
+카드에는 반영된 최신 메시지(last_message_id/at)를 함께 저장하며, 앱 시작 시
+ensure_room_cards()가 채팅방별 최신 메시지와 비교해 어긋난 카드만 다시 만듭니다.
+
+재생성 / 일관성 검사:
+    python -m app.utils.room_cards rebuild
+    python -m app.utils.room_cards check [--fix]
+"""
+from sqlalchemy import exists, func, or_, select
+from sqlalchemy.orm import Session
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+import argparse
+import logging
+import threading
+import time
+
+from app.core.config import settings
+from app.core.response_cache import CHATROOM_LISTINGS, response_cache
+from app.models.chatroom import ChatroomCardDB, ChatroomDB, MessageDB, has_participant
+from app.models.user_models import UserDB
+from app.schemas.chatroom import Chatroom, UserProfile
+
+logger = logging.getLogger(__name__)
+
+RECENT_MESSAGES = 10
+REBUILD_BATCH_SIZE = 500
+
+
+def build_card(db: Session, chatroom: ChatroomDB) -> str:
+    """채팅방 하나의 카드 JSON (목록 응답의 원소와 같은 형태)"""
+    return _build_card(db, chatroom)[0]
+
+
+def _build_card(db: Session, chatroom: ChatroomDB) -> Tuple[str, Optional[MessageDB]]:
+    """(카드 JSON, 최신 메시지)"""
+    participant_ids = chatroom.get_participants()
+    users = {}
+    if participant_ids:
+        users = {
+            user.firebase_uid: user
+            for user in db.query(UserDB).filter(UserDB.firebase_uid.in_(participant_ids))
+        }
+    user_profiles = [
+        UserProfile(
+            uid=users[uid].firebase_uid,
+            nickname=users[uid].name,
+            bio=users[uid].bio,
+            profileImageUrl=users[uid].profile_picture,
+            likes=users[uid].likes or 0
+        )
+        for uid in participant_ids if uid in users
+    ]
+
+    messages = (
+        db.query(MessageDB)
+        .filter(MessageDB.chatroom_id == chatroom.id)
+        .order_by(MessageDB.timestamp.desc())
+        .limit(RECENT_MESSAGES)
+        .all()
+    )
+    card = Chatroom(
+        id=str(chatroom.id),
+        title=chatroom.title,
+        participants=user_profiles,
+        connection=chatroom.get_connection(),
+        createdAt=chatroom.created_at,
+        Message=[msg.to_api_model() for msg in messages]
+    ).model_dump_json(by_alias=True)
+    return card, (messages[0] if messages else None)
+
+
+def _upsert_card(db: Session, chatroom: ChatroomDB, card: str, latest: Optional[MessageDB]):
+    row = db.get(ChatroomCardDB, chatroom.id)
+    if row is None:
+        row = ChatroomCardDB(chatroom_id=chatroom.id)
+        db.add(row)
+    row.title = chatroom.title
+    row.is_active = bool(chatroom.is_active)
+    row.created_at = chatroom.created_at
+    row.card = card
+    row.last_message_id = latest.id if latest else None
+    row.last_message_at = latest.timestamp if latest else None
+
+
+def refresh_room_card(db: Session, room_id: str):
+    """채팅방 카드를 다시 만듭니다. 채팅방이 없으면 카드를 지웁니다."""
+    # 세션은 autoflush=False이므로 아직 반영되지 않은 생성/삭제를 먼저 내보냄
+    db.flush()
+    chatroom = db.get(ChatroomDB, room_id)
+    if chatroom is None:
+        db.query(ChatroomCardDB).filter(ChatroomCardDB.chatroom_id == room_id).delete(synchronize_session=False)
+        return
+    _upsert_card(db, chatroom, *_build_card(db, chatroom))
+
+
+def rooms_with_participant(db: Session, uid: str) -> List[str]:
+    """uid가 참여한 채팅방 id 목록"""
+    return [room_id for (room_id,) in db.query(ChatroomDB.id).filter(has_participant(db, uid))]
+
+
+def refresh_user_cards(db: Session, uid: str):
+    """프로필이 바뀐 사용자가 참여한 채팅방 카드를 다시 만듭니다."""
+    for room_id in rooms_with_participant(db, uid):
+        refresh_room_card(db, room_id)
+
+
+class RoomCardRefresher:
+    """
+    메시지 생성 후 채팅방 카드를 메시지 트랜잭션 밖에서 다시 만드는 백그라운드 작업.
+
+    schedule()은 DB 호출이나 행 잠금 없이 바로 반환합니다. 첫 요청부터 delay 동안 들어온
+    채팅방을 모아 한 번씩 refresh_room_card로 다시 만들고(최근 메시지는 timestamp 순으로
+    다시 읽으므로 저장 순서와 무관), 목록 응답 캐시는 묶음마다 한 번만 무효화합니다.
+    갱신 전에 프로세스가 종료되면 다음 시작 시 ensure_room_cards()가 바로잡습니다.
+    """
+
+    def __init__(self, delay: float):
+        self.delay = delay
+        self._lock = threading.Lock()
+        self._pending: Set[str] = set()
+        self._due_at: Optional[float] = None
+        self._wakeup = threading.Event()
+        self._worker: Optional[threading.Thread] = None
+        self._stopping = False
+
+    def schedule(self, room_id: str):
+        """채팅방 카드 갱신을 예약합니다. (이벤트 루프/스레드풀 어디서든 호출 가능)"""
+        with self._lock:
+            self._pending.add(room_id)
+            if self._due_at is None:
+                self._due_at = time.monotonic() + self.delay
+            if self._worker is None:
+                self._worker = threading.Thread(target=self._run, name="room-card-refresh", daemon=True)
+                self._worker.start()
+        self._wakeup.set()
+
+    def stop(self):
+        """예약된 갱신을 마저 처리하고 작업 스레드를 멈춥니다."""
+        with self._lock:
+            worker = self._worker
+        if worker is None:
+            return
+        self._stopping = True
+        self._wakeup.set()
+        worker.join(timeout=5.0)
+        with self._lock:
+            self._worker = None
+            self._stopping = False
+
+    def _run(self):
+        while True:
+            with self._lock:
+                timeout = None if self._due_at is None else max(0.0, self._due_at - time.monotonic())
+            if not self._stopping:
+                self._wakeup.wait(timeout)
+                self._wakeup.clear()
+
+            with self._lock:
+                stopping = self._stopping
+                if stopping or (self._due_at is not None and self._due_at <= time.monotonic()):
+                    room_ids, self._pending, self._due_at = self._pending, set(), None
+                else:
+                    room_ids = set()
+            if room_ids:
+                self._refresh(room_ids)
+            if stopping:
+                return
+
+    def _refresh(self, room_ids: Set[str]):
+        from app.db import SessionLocal
+
+        refreshed = 0
+        with SessionLocal() as db:
+            for room_id in room_ids:
+                try:
+                    refresh_room_card(db, room_id)
+                    db.commit()
+                    refreshed += 1
+                except Exception as e:
+                    db.rollback()
+                    logger.error(f"채팅방 카드 갱신 실패 ({room_id}): {str(e)}")
+        if refreshed:
+            response_cache.invalidate(CHATROOM_LISTINGS)
+
+
+# 메시지 생성 후 카드 갱신 (RESPONSE_CACHE_MESSAGE_INVALIDATE_DELAY 동안 묶음)
+room_card_refresher = RoomCardRefresher(delay=settings.RESPONSE_CACHE_MESSAGE_INVALIDATE_DELAY)
+
+
+def page_body(cards: Iterable[str]) -> bytes:
+    """카드 JSON들을 목록 응답 본문으로 이어 붙입니다."""
+    return b"[" + b",".join(card.encode("utf-8") for card in cards) + b"]"
+
+
+def _iter_chatrooms(db: Session, batch_size: int):
+    last_id = None
+    while True:
+        query = db.query(ChatroomDB).order_by(ChatroomDB.id)
+        if last_id is not None:
+            query = query.filter(ChatroomDB.id > last_id)
+        batch = query.limit(batch_size).all()
+        if not batch:
+            return
+        yield from batch
+        last_id = batch[-1].id
+
+
+def rebuild_room_cards(db: Session, batch_size: int = REBUILD_BATCH_SIZE) -> int:
+    """모든 카드를 다시 만들고 채팅방이 없는 카드는 지웁니다. 반환값은 카드 수입니다."""
+    count = 0
+    for chatroom in _iter_chatrooms(db, batch_size):
+        _upsert_card(db, chatroom, *_build_card(db, chatroom))
+        count += 1
+        if count % batch_size == 0:
+            db.commit()
+            db.expunge_all()
+    db.query(ChatroomCardDB).filter(
+        ~ChatroomCardDB.chatroom_id.in_(db.query(ChatroomDB.id))
+    ).delete(synchronize_session=False)
+    db.commit()
+    logger.info(f"채팅방 카드 {count}개를 다시 만들었습니다.")
+    return count
+
+
+def check_room_cards(db: Session, batch_size: int = REBUILD_BATCH_SIZE) -> Dict[str, List[str]]:
+    """
+    카드와 원본을 비교합니다.
+    반환값: {"missing": 카드가 없는 채팅방, "stale": 내용이 다른 카드, "orphaned": 채팅방이 없는 카드}
+    """
+    report: Dict[str, List[str]] = {"missing": [], "stale": [], "orphaned": []}
+    cards = {row.chatroom_id: row for row in db.query(ChatroomCardDB)}
+    seen = set()
+    for chatroom in _iter_chatrooms(db, batch_size):
+        seen.add(chatroom.id)
+        row = cards.get(chatroom.id)
+        if row is None:
+            report["missing"].append(chatroom.id)
+        else:
+            card, latest = _build_card(db, chatroom)
+            if (
+                row.card != card
+                or row.is_active != bool(chatroom.is_active)
+                or row.title != chatroom.title
+                or row.last_message_id != (latest.id if latest else None)
+            ):
+                report["stale"].append(chatroom.id)
+    report["orphaned"] = [room_id for room_id in cards if room_id not in seen]
+    return report
+
+
+def stale_room_ids(db: Session) -> List[str]:
+    """
+    카드가 없거나, 카드의 최신 메시지 시각이 messages의 최신 메시지와 다른 채팅방 id 목록.
+    (채팅방마다 (chatroom_id, timestamp) 인덱스로 최신 시각 하나만 조회)
+    """
+    latest_at = (
+        select(func.max(MessageDB.timestamp))
+        .where(MessageDB.chatroom_id == ChatroomDB.id)
+        .correlate(ChatroomDB)
+        .scalar_subquery()
+    )
+    query = (
+        db.query(ChatroomDB.id)
+        .outerjoin(ChatroomCardDB, ChatroomCardDB.chatroom_id == ChatroomDB.id)
+        .filter(or_(
+            ChatroomCardDB.chatroom_id.is_(None),
+            ChatroomCardDB.last_message_at.is_distinct_from(latest_at)
+        ))
+    )
+    return [room_id for (room_id,) in query]
+
+
+def ensure_room_cards(db: Session, batch_size: int = REBUILD_BATCH_SIZE) -> Optional[int]:
+    """
+    어긋난 카드(마이그레이션 직후, 카드 갱신 없이 메시지가 바뀐 경우 등)만 다시 만들고
+    채팅방이 없는 카드는 지웁니다. 다시 만든 카드 수를 반환하며, 모두 맞으면 None입니다.
+    """
+    room_ids = stale_room_ids(db)
+    orphaned = db.query(ChatroomCardDB).filter(
+        ~exists().where(ChatroomDB.id == ChatroomCardDB.chatroom_id)
+    ).delete(synchronize_session=False)
+    if not room_ids and not orphaned:
+        return None
+
+    for count, room_id in enumerate(room_ids, 1):
+        refresh_room_card(db, room_id)
+        if count % batch_size == 0:
+            db.commit()
+            db.expunge_all()
+    db.commit()
+    logger.info(f"채팅방 카드 {len(room_ids)}개를 다시 만들고 {orphaned}개를 지웠습니다.")
+    return len(room_ids)
+
+
+def main():
+    from app.db import SessionLocal
+
+    parser = argparse.ArgumentParser(description="채팅방 카드 관리")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    subparsers.add_parser("rebuild", help="모든 카드 재생성")
+    check = subparsers.add_parser("check", help="카드와 원본 비교")
+    check.add_argument("--fix", action="store_true", help="다른 카드만 다시 만들기")
+    args = parser.parse_args()
+
+    with SessionLocal() as db:
+        if args.command == "rebuild":
+            print(f"rebuilt: {rebuild_room_cards(db)}")
+            return
+        report = check_room_cards(db)
+        for kind, room_ids in report.items():
+            print(f"{kind}: {len(room_ids)}")
+            for room_id in room_ids[:20]:
+                print(f"  {room_id}")
+        if args.fix and any(report.values()):
+            for room_id in report["missing"] + report["stale"] + report["orphaned"]:
+                refresh_room_card(db, room_id)
+            db.commit()
+            print("fixed")
+        if any(report.values()) and not args.fix:
+            raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,11 +1,18 @@
 from fastapi import HTTPException, WebSocket
 from sqlalchemy.orm import Session, Query
 from sqlalchemy import and_, or_
-from typing import Dict, List, Any, Optional, Set
-import json
+from typing import Dict, List, Any, Optional, Set, Tuple
+import heapq
+import time
 import uuid
+import zlib
 from datetime import datetime
+from app.core.config import settings
+from app.core.metrics import registry, ws_broadcast_duration, ws_broadcast_recipients
+from app.core.single_flight import SingleFlight
 from app.models.chatroom import ChatroomDB, MessageDB
+from app.utils.room_cards import room_card_refresher
+from app.utils.ws_codec import WS_ENCODING_JSON, WebSocketFrame, encode_ws_payload, send_ws_frame
 
 # 채팅방 조회 유틸리티
 def get_chatroom_or_404(db: Session, chatroom_id: str) -> ChatroomDB:
@@ -34,8 +41,7 @@ def filter_chatrooms(query: Query, filters: Dict[str, Any]) -> Query:
 # 채팅방 참여자 확인 유틸리티
 def verify_chatroom_participant(chatroom: ChatroomDB, user_id: str) -> bool:
     """사용자가 채팅방 참여자인지 확인합니다."""
-    participants = json.loads(chatroom.participants) if chatroom.participants else []
-    if user_id not in participants:
+    if user_id not in chatroom.get_participants():
         raise HTTPException(status_code=403, detail="You are not a participant in this chatroom")
     return True
 
@@ -55,109 +61,196 @@ def create_message(db: Session, content: str, chatroom_id: str, sender_id: str)
     db.add(message)
     db.commit()
     db.refresh(message)
+    # 채팅방 카드의 최근 메시지는 커밋 뒤 백그라운드에서 묶어서 갱신 (갱신 후 목록 응답 캐시 무효화)
+    room_card_refresher.schedule(chatroom_id)
     
     return message
 
+# 동일 조회 합치기 (키는 (room_id 또는 uid, ...) 튜플)
+chatroom_flight = SingleFlight("chatroom_detail")
+message_flight = SingleFlight("recent_messages")
+profile_flight = SingleFlight("user_profile")
+
+def forget_room_loads(room_id: str):
+    """채팅방 변경 직후, 진행 중인 상세/내역 로드에 새 요청이 합류하지 않도록 합니다. (이벤트 루프에서 호출)"""
+    chatroom_flight.forget(room_id)
+    message_flight.forget(room_id)
+
+# WebSocket 연결 파티션 (샤드)
+class ConnectionShard:
+    """
+    채팅방 레지스트리의 파티션 하나.
+
+    채팅방별 연결 dict는 copy-on-write로 교체되므로, 브로드캐스트처럼
+    await 중에 순회하는 쪽은 잠금 없이 일관된 스냅샷을 보게 됩니다.
+    """
+
+    def __init__(self, index: int):
+        self.index = index
+        # {room_id: {user_id: WebSocket}} - 내부 dict는 변경하지 않고 교체만 함
+        self.rooms: Dict[str, Dict[str, WebSocket]] = {}
+        # 역방향 인덱스: {WebSocket: (room_id, user_id, encoding)}
+        self.sockets: Dict[WebSocket, Tuple[str, str, str]] = {}
+        # 샤드별 통계
+        self.broadcasts = 0
+        self.frames_sent = 0
+        self.send_failures = 0
+
+    def add(self, websocket: WebSocket, room_id: str, user_id: str, encoding: str):
+        users = self.rooms.get(room_id, {})
+        previous = users.get(user_id)
+        if previous is not None and previous is not websocket:
+            # 같은 사용자의 이전 연결은 새 연결로 대체
+            self.sockets.pop(previous, None)
+        updated = dict(users)
+        updated[user_id] = websocket
+        self.rooms[room_id] = updated
+        self.sockets[websocket] = (room_id, user_id, encoding)
+
+    def remove(self, websocket: WebSocket, room_id: str) -> Optional[str]:
+        entry = self.sockets.get(websocket)
+        if entry is None or entry[0] != room_id:
+            return None
+        del self.sockets[websocket]
+        user_id = entry[1]
+
+        users = self.rooms.get(room_id, {})
+        if users.get(user_id) is websocket:
+            updated = dict(users)
+            del updated[user_id]
+            if updated:
+                self.rooms[room_id] = updated
+            else:
+                # 채팅방에 더 이상 연결된 사용자가 없으면 채팅방도 제거
+                del self.rooms[room_id]
+        return user_id
+
+    def stats(self) -> Dict[str, int]:
+        rooms = list(self.rooms.values())
+        return {
+            "shard": self.index,
+            "rooms": len(rooms),
+            "connections": sum(len(users) for users in rooms),
+            "broadcasts": self.broadcasts,
+            "frames_sent": self.frames_sent,
+            "send_failures": self.send_failures
+        }
+
+
 # WebSocket 연결 관리자 클래스
 class ConnectionManager:
-    def __init__(self):
-        # 채팅방별 연결 관리: {room_id: {user_id: WebSocket}}
-        self.active_connections: Dict[str, Dict[str, WebSocket]] = {}
+    def __init__(self, num_shards: int = 16):
+        # room_id 해시로 파티셔닝된 채팅방 레지스트리
+        self.num_shards = max(1, num_shards)
+        self.shards: List[ConnectionShard] = [ConnectionShard(i) for i in range(self.num_shards)]
+    
+    def _shard(self, room_id: str) -> ConnectionShard:
+        """room_id가 속한 샤드를 반환합니다. (프로세스 간에도 안정적인 crc32 사용)"""
+        return self.shards[zlib.crc32(room_id.encode("utf-8")) % self.num_shards]
+    
+    @property
+    def active_connections(self) -> Dict[str, Dict[str, WebSocket]]:
+        """모든 샤드의 채팅방별 연결을 합친 읽기 전용 스냅샷을 반환합니다."""
+        snapshot: Dict[str, Dict[str, WebSocket]] = {}
+        for shard in self.shards:
+            snapshot.update(list(shard.rooms.items()))
+        return snapshot
     
-    async def connect(self, websocket: WebSocket, room_id: str, user_id: str):
+    async def connect(self, websocket: WebSocket, room_id: str, user_id: str, encoding: str = WS_ENCODING_JSON):
         """WebSocket 연결을 등록합니다. (accept는 호출자에서 처리)"""
-        # 채팅방이 없으면 생성
-        if room_id not in self.active_connections:
-            self.active_connections[room_id] = {}
-        
-        # 사용자 연결 등록
-        self.active_connections[room_id][user_id] = websocket
+        self._shard(room_id).add(websocket, room_id, user_id, encoding)
         
         # 접속 알림 메시지 브로드캐스트
         await self.broadcast(f"User {user_id} joined the chat", room_id, "system")
     
     def disconnect(self, websocket: WebSocket, room_id: str) -> Optional[str]:
         """WebSocket 연결을 해제합니다."""
-        if room_id not in self.active_connections:
-            return None
-        
-        # 연결된 사용자 찾기
-        user_id = None
-        for uid, ws in self.active_connections[room_id].items():
-            if ws == websocket:
-                user_id = uid
-                break
-        
-        if user_id:
-            # 연결 해제
-            del self.active_connections[room_id][user_id]
-            
-            # 채팅방에 더 이상 연결된 사용자가 없으면 채팅방도 제거
-            if not self.active_connections[room_id]:
-                del self.active_connections[room_id]
-        
-        return user_id
+        return self._shard(room_id).remove(websocket, room_id)
     
-    async def broadcast(self, message: str, room_id: str, sender: str = "system"):
-        """채팅방의 모든 연결된 클라이언트에게 메시지를 브로드캐스트합니다."""
-        if room_id not in self.active_connections:
+    async def _fan_out(self, payload, room_id: str):
+        """페이로드를 인코딩별로 한 번만 직렬화하여 채팅방 전체에 전송합니다."""
+        shard = self._shard(room_id)
+        # copy-on-write dict이므로 전송 중 connect/disconnect가 일어나도 안전
+        users = shard.rooms.get(room_id)
+        if not users:
             return
         
-        # 채팅방의 모든 클라이언트에게 메시지 전송
-        for user_id, websocket in self.active_connections[room_id].items():
+        shard.broadcasts += 1
+        started = time.perf_counter()
+        frames: Dict[str, WebSocketFrame] = {}
+        for user_id, websocket in users.items():
+            entry = shard.sockets.get(websocket)
+            encoding = entry[2] if entry else WS_ENCODING_JSON
+            if encoding not in frames:
+                frames[encoding] = encode_ws_payload(payload, encoding)
             try:
-                await websocket.send_text(
-                    json.dumps({
-                        "sender": sender,
-                        "content": message,
-                        "timestamp": datetime.utcnow().isoformat()
-                    })
-                )
+                await send_ws_frame(websocket, frames[encoding])
+                shard.frames_sent += 1
             except:
                 # 오류 발생 시 연결 해제
+                shard.send_failures += 1
                 self.disconnect(websocket, room_id)
+        ws_broadcast_duration.observe(time.perf_counter() - started)
+        ws_broadcast_recipients.observe(len(users))
+    
+    async def broadcast(self, message: str, room_id: str, sender: str = "system"):
+        """채팅방의 모든 연결된 클라이언트에게 메시지를 브로드캐스트합니다."""
+        await self._fan_out({
+            "sender": sender,
+            "content": message,
+            "timestamp": datetime.utcnow()
+        }, room_id)
     
     async def broadcast_message(self, message: MessageDB, room_id: str):
         """채팅방의 모든 연결된 클라이언트에게 DB 메시지를 브로드캐스트합니다."""
-        if room_id not in self.active_connections:
-            return
-        
-        # 채팅방의 모든 클라이언트에게 메시지 전송
-        message_data = {
+        await self._fan_out({
             "id": message.id,
             "sender_id": message.sender_id,
             "content": message.content,
-            "timestamp": message.timestamp.isoformat()
-        }
-        
-        for user_id, websocket in self.active_connections[room_id].items():
-            try:
-                await websocket.send_text(json.dumps(message_data))
-            except:
-                # 오류 발생 시 연결 해제
-                self.disconnect(websocket, room_id)
+            "timestamp": message.timestamp
+        }, room_id)
 
     async def broadcast_structured_message(self, message_obj, room_id: str):
         """채팅방의 모든 연결된 클라이언트에게 구조화된 메시지를 브로드캐스트합니다."""
-        if room_id not in self.active_connections:
-            return
-        
-        # Pydantic 모델을 JSON으로 변환
-        message_json = message_obj.model_dump_json()
-        
-        for user_id, websocket in self.active_connections[room_id].items():
-            try:
-                await websocket.send_text(message_json)
-            except:
-                # 오류 발생 시 연결 해제
-                self.disconnect(websocket, room_id)
+        await self._fan_out(message_obj, room_id)
     
     def get_active_users(self, room_id: str) -> List[str]:
         """특정 채팅방에 현재 접속 중인 사용자 목록을 반환합니다."""
-        if room_id not in self.active_connections:
-            return []
-        
-        return list(self.active_connections[room_id].keys())
+        return list(self._shard(room_id).rooms.get(room_id, {}).keys())
+    
+    def snapshot(self) -> Dict[str, List[str]]:
+        """모든 채팅방의 접속 사용자 목록 스냅샷을 반환합니다. (관리자/모니터링용)"""
+        return {
+            room_id: list(users.keys())
+            for room_id, users in self.active_connections.items()
+        }
+    
+    def shard_stats(self) -> List[Dict[str, int]]:
+        """샤드별 채팅방 수, 연결 수, 전송 통계를 반환합니다."""
+        return [shard.stats() for shard in self.shards]
+
+    def connection_count(self) -> int:
+        """전체 WebSocket 연결 수를 반환합니다."""
+        return sum(len(shard.sockets) for shard in self.shards)
+
+    def top_rooms(self, limit: int) -> List[Tuple[str, int]]:
+        """접속자가 많은 순으로 상위 limit개 채팅방의 (room_id, 연결 수)를 반환합니다."""
+        counts = (
+            (room_id, len(users))
+            for shard in self.shards
+            for room_id, users in list(shard.rooms.items())
+        )
+        return heapq.nlargest(limit, counts, key=lambda item: item[1])
 
 # 글로벌 ConnectionManager 인스턴스 생성
-connection_manager = ConnectionManager()
\ No newline at end of file
+connection_manager = ConnectionManager(num_shards=settings.WS_CONNECTION_SHARDS)
+
+# 메트릭: 전체 연결 수와 채팅방별 연결 수 (레이블 수 제한을 위해 상위 N개 방만)
+registry.callback_gauge(
+    "ws_active_connections", "Open WebSocket connections", (),
+    lambda: [((), connection_manager.connection_count())]
+)
+registry.callback_gauge(
+    "ws_room_connections", "Open WebSocket connections per room (busiest rooms only)", ("room",),
+    lambda: [((room_id,), count) for room_id, count in connection_manager.top_rooms(settings.METRICS_MAX_ROOM_SERIES)]
+)
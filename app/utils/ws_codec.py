@@ -0,0 +1,58 @@
+from fastapi import WebSocket
+from pydantic import BaseModel
+from datetime import datetime, timezone
+from typing import Any, Union
+import json
+import msgpack
+
+# 지원하는 WebSocket 송신 인코딩
+# - json: 기존 텍스트 프레임 (기본값, 하위 호환)
+# - msgpack: 바이너리 프레임 (모바일 클라이언트용 압축 포맷)
+WS_ENCODING_JSON = "json"
+WS_ENCODING_MSGPACK = "msgpack"
+SUPPORTED_WS_ENCODINGS = (WS_ENCODING_JSON, WS_ENCODING_MSGPACK)
+
+WebSocketFrame = Union[str, bytes]
+
+
+def _json_default(obj: Any):
+    """json이 기본적으로 처리하지 못하는 타입을 변환합니다."""
+    if isinstance(obj, datetime):
+        return obj.isoformat()
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+def _msgpack_default(obj: Any):
+    """msgpack이 기본적으로 처리하지 못하는 타입을 변환합니다."""
+    if isinstance(obj, datetime):
+        # naive datetime은 UTC로 간주 (서버는 utcnow()를 사용)
+        if obj.tzinfo is None:
+            obj = obj.replace(tzinfo=timezone.utc)
+        # ISO 문자열(26바이트 이상) 대신 msgpack Timestamp 확장 타입(6~10바이트) 사용
+        return msgpack.Timestamp.from_datetime(obj)
+    raise TypeError(f"Object of type {type(obj).__name__} is not msgpack serializable")
+
+
+def encode_ws_payload(payload: Union[BaseModel, dict], encoding: str = WS_ENCODING_JSON) -> WebSocketFrame:
+    """
+    WebSocket 송신 메시지를 지정한 인코딩의 프레임으로 변환합니다.
+
+    - json: 텍스트 프레임 (str). 한국어는 \\uXXXX 이스케이프 없이 UTF-8 그대로 전송
+    - msgpack: 바이너리 프레임 (bytes). None 필드는 생략
+    """
+    if encoding == WS_ENCODING_MSGPACK:
+        if isinstance(payload, BaseModel):
+            payload = payload.model_dump(exclude_none=True)
+        return msgpack.packb(payload, default=_msgpack_default, use_bin_type=True)
+
+    if isinstance(payload, BaseModel):
+        return payload.model_dump_json()
+    return json.dumps(payload, ensure_ascii=False, separators=(",", ":"), default=_json_default)
+
+
+async def send_ws_frame(websocket: WebSocket, frame: WebSocketFrame):
+    """인코딩된 프레임을 타입에 맞게 (텍스트/바이너리) 전송합니다."""
+    if isinstance(frame, bytes):
+        await websocket.send_bytes(frame)
+    else:
+        await websocket.send_text(frame)
@@ -0,0 +1,94 @@
+"""
+메시지 아카이브 스캔 속도 벤치마크
+
+임시 디렉터리에 채팅방 하나의 월별 아카이브를 만든 뒤 다음을 측정합니다.
+- 전체 스캔: 모든 월 파일을 gzip 스트림으로 풀면서 읽는 속도 (메시지/초, 압축 기준 MB/초)
+- 깊은 페이지 조회: skip이 큰 경우 인덱스로 월을 건너뛰는 조회 지연
+- 커서 조회: before 커서로 특정 시점 직전 페이지를 읽는 지연
+
+사용법:
+    python -m benchmarks.archive_scan [--messages 500000] [--months 24]
+"""
+import argparse
+import os
+import shutil
+import statistics
+import tempfile
+import time
+import uuid
+from datetime import datetime, timedelta
+
+from app.utils.archive import _room_dir, load_index, read_archived_messages, read_month, write_month
+
+ROOM_ID = "archive-bench-room"
+
+
+def build_archive(archive_dir: str, messages: int, months: int) -> float:
+    started = time.perf_counter()
+    per_month = messages // months
+    start = datetime(2020, 1, 1)
+    for m in range(months):
+        month_start = datetime(start.year + (start.month - 1 + m) // 12, (start.month - 1 + m) % 12 + 1, 1)
+        step = timedelta(days=28) / per_month
+        records = [
+            {
+                "id": str(uuid.uuid4()),
+                "sender_id": f"user-{i % 50}",
+                "content": f"아카이브 벤치마크 메시지 {m}-{i} 안녕하세요 좋은 아침입니다",
+                "timestamp": month_start + step * i,
+                "is_read": True
+            }
+            for i in range(per_month)
+        ]
+        write_month(ROOM_ID, month_start.strftime("%Y-%m"), records, archive_dir)
+    return time.perf_counter() - started
+
+
+def timed(fn, repeat: int):
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - started) * 1000)
+    return statistics.median(samples), max(samples)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="메시지 아카이브 스캔 속도 벤치마크")
+    parser.add_argument("--messages", type=int, default=500_000)
+    parser.add_argument("--months", type=int, default=24)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    archive_dir = tempfile.mkdtemp(prefix="archive_bench_")
+    try:
+        build_seconds = build_archive(archive_dir, args.messages, args.months)
+        index = load_index(ROOM_ID, archive_dir)
+        total = sum(m["count"] for m in index.values())
+        room_dir = _room_dir(ROOM_ID, archive_dir)
+        compressed = sum(
+            os.path.getsize(os.path.join(room_dir, f)) for f in os.listdir(room_dir) if f.endswith(".gz")
+        )
+        print(f"archive: {total:,} messages in {len(index)} months, {compressed / 1e6:.1f} MB compressed "
+              f"(built in {build_seconds:.1f}s)")
+
+        started = time.perf_counter()
+        scanned = sum(len(read_month(ROOM_ID, month, archive_dir)) for month in sorted(index))
+        elapsed = time.perf_counter() - started
+        print(f"full scan:        {scanned / elapsed:>12,.0f} msg/s  {compressed / 1e6 / elapsed:>8.1f} MB/s  ({elapsed:.2f}s)")
+
+        # 가장 오래된 월 근처까지 skip (인덱스로 대부분의 월을 건너뜀)
+        deep_skip = total - total // args.months // 2
+        p50, worst = timed(lambda: read_archived_messages(ROOM_ID, skip=deep_skip, limit=50, archive_dir=archive_dir), args.repeat)
+        print(f"deep page (skip={deep_skip:,}): p50 {p50:.1f}ms  max {worst:.1f}ms")
+
+        middle_month = sorted(index)[len(index) // 2]
+        cursor = datetime.fromisoformat(index[middle_month]["max_ts"])
+        p50, worst = timed(lambda: read_archived_messages(ROOM_ID, before=cursor, limit=50, archive_dir=archive_dir), args.repeat)
+        print(f"cursor page (before={cursor:%Y-%m-%d}): p50 {p50:.1f}ms  max {worst:.1f}ms")
+    finally:
+        shutil.rmtree(archive_dir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
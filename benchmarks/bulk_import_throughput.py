@@ -0,0 +1,98 @@
+"""
+대량 가져오기 처리량 벤치마크
+
+메시지 NDJSON 파일을 생성한 뒤 app.utils.bulk_import 로 적재하는 속도(rows/s)를 측정합니다.
+
+- 기본값은 임시 SQLite DB (executemany 경로)
+- SQLALCHEMY_DATABASE_URL 로 PostgreSQL을 지정하면 COPY 경로를 측정합니다.
+  (alembic upgrade head 가 적용된 DB여야 하며, 벤치마크용 사용자/채팅방을 추가합니다)
+
+사용법:
+    python -m benchmarks.bulk_import_throughput [--rows 1000000] [--rooms 100] [--chunk-size 10000]
+"""
+import argparse
+import json
+import os
+import tempfile
+import time
+import uuid
+from datetime import datetime, timedelta
+
+_work_dir = tempfile.mkdtemp(prefix="bulk_import_bench_")
+os.environ.setdefault("SQLALCHEMY_DATABASE_URL", f"sqlite:///{_work_dir}/import.db")
+
+import firebase_admin  # noqa: E402
+
+firebase_admin.get_app = lambda *args, **kwargs: None
+
+from sqlalchemy import text  # noqa: E402
+
+from app.db import engine  # noqa: E402
+from app.models.chatroom import ChatroomCardDB, ChatroomDB, MessageDB  # noqa: E402
+from app.models.user_models import UserDB  # noqa: E402
+from app.utils.bulk_import import iter_import  # noqa: E402
+
+RUN_ID = uuid.uuid4().hex[:8]
+SENDERS = 50
+
+
+def prepare_database(rooms: int):
+    with engine.begin() as conn:
+        if engine.dialect.name == "sqlite":
+            # users.id(UUID)는 SQLite에서 컴파일되지 않으므로 참조 확인에 필요한 컬럼만 생성
+            conn.execute(text("CREATE TABLE IF NOT EXISTS users (firebase_uid VARCHAR PRIMARY KEY)"))
+            ChatroomDB.__table__.create(conn, checkfirst=True)
+            MessageDB.__table__.create(conn, checkfirst=True)
+            ChatroomCardDB.__table__.create(conn, checkfirst=True)
+            conn.execute(text("INSERT INTO users (firebase_uid) VALUES (:uid)"),
+                         [{"uid": f"bench-{RUN_ID}-{i}"} for i in range(SENDERS)])
+        else:
+            conn.execute(UserDB.__table__.insert(), [
+                {"id": uuid.uuid4(), "firebase_uid": f"bench-{RUN_ID}-{i}", "email": f"bench-{RUN_ID}-{i}@example.com"}
+                for i in range(SENDERS)
+            ])
+        conn.execute(ChatroomDB.__table__.insert(), [
+            {"id": f"bench-{RUN_ID}-room-{i}", "title": "bulk import", "created_by": "system",
+             "participants": [], "connection": []}
+            for i in range(rooms)
+        ])
+
+
+def write_input(path: str, rows: int, rooms: int):
+    base = datetime.utcnow() - timedelta(days=7)
+    with open(path, "w", encoding="utf-8") as f:
+        for i in range(rows):
+            f.write(json.dumps({
+                "id": f"bench-{RUN_ID}-{i}",
+                "chatroom_id": f"bench-{RUN_ID}-room-{i % rooms}",
+                "sender_id": f"bench-{RUN_ID}-{i % SENDERS}",
+                "content": f"대량 가져오기 메시지 {i} 좋은 아침입니다",
+                "timestamp": (base + timedelta(milliseconds=i)).isoformat()
+            }, ensure_ascii=False))
+            f.write("\n")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="대량 가져오기 처리량 벤치마크")
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--rooms", type=int, default=100)
+    parser.add_argument("--chunk-size", type=int, default=10_000)
+    args = parser.parse_args()
+
+    prepare_database(args.rooms)
+    path = os.path.join(_work_dir, "messages.ndjson")
+    write_input(path, args.rows, args.rooms)
+    print(f"database: {engine.dialect.name}, input: {os.path.getsize(path) / 1e6:.0f} MB, {args.rows:,} rows")
+
+    started = time.perf_counter()
+    with open(path, "rb") as stream:
+        for progress in iter_import(stream, "messages", "ndjson", args.chunk_size):
+            pass
+    elapsed = time.perf_counter() - started
+
+    print(f"inserted {progress.rows_inserted:,} / skipped {progress.rows_skipped:,} / invalid {progress.rows_invalid:,}")
+    print(f"throughput: {progress.rows_read / elapsed:,.0f} rows/s ({elapsed:.1f}s, {progress.chunks} chunks)")
+
+
+if __name__ == "__main__":
+    main()
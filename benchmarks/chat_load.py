@@ -0,0 +1,402 @@
+"""
+채팅 흐름 부하 테스트
+
+같은 프로세스의 uvicorn 서버에 아래 시나리오를 동시에 걸고, 시나리오별 처리량과
+p50/p90/p99 지연 시간, WebSocket 전달 지연(POST 시작 ~ 수신)을 JSON으로 출력합니다.
+- listen:  채팅방마다 --listeners 개의 WebSocket 구독자
+- post:    채팅방마다 --posters 명이 POST /api/chat/{room_id} 반복
+- list:    GET /api/chatrooms/ 반복
+- history: GET /api/chat/{room_id}?skip=&limit=50 무작위 페이지 반복
+
+모든 클라이언트는 대기 시간 없는 closed-loop 이며(--think-ms로 조절), 부하 생성기와
+서버가 같은 프로세스에 있으므로 절대값보다 같은 설정으로 측정한 커밋 간 비교에 사용합니다.
+DB는 기본적으로 임시 SQLite 파일이며 --database-url로 로컬 Postgres를 지정할 수 있습니다
+(스키마가 없으면 생성, 벤치마크 데이터는 load- 접두사 채팅방/사용자).
+인증은 로컬 JWT 공급자(AUTH_PROVIDER=local, HS256)를 사용하므로 Google 서버 지연 없이
+서명 검증까지 포함한 우리 코드의 비용만 측정합니다.
+
+사용법:
+    python -m benchmarks.chat_load [--rooms 5 --listeners 20 --posters 4 --duration 20]
+    python -m benchmarks.chat_load --output results/$(git rev-parse --short HEAD).json
+    python -m benchmarks.chat_load --compare results/before.json results/after.json
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+import uuid
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional
+
+
+def _database_url_from_argv() -> Optional[str]:
+    # 앱 임포트(엔진 생성) 전에 DB URL을 확정해야 하므로 argparse보다 먼저 읽음
+    for index, arg in enumerate(sys.argv):
+        if arg == "--database-url" and index + 1 < len(sys.argv):
+            return sys.argv[index + 1]
+        if arg.startswith("--database-url="):
+            return arg.split("=", 1)[1]
+    return None
+
+
+_db_dir = tempfile.mkdtemp(prefix="chat_load_")
+os.environ["SQLALCHEMY_DATABASE_URL"] = _database_url_from_argv() or f"sqlite:///{_db_dir}/load.db"
+os.environ.setdefault("MESSAGE_ARCHIVE_DIR", os.path.join(_db_dir, "archive"))
+os.environ.setdefault("LOG_FILE", os.path.join(_db_dir, "app.log"))
+os.environ.setdefault("LOG_LEVEL", "WARNING")
+os.environ.setdefault("WS_HANDSHAKE_RATE_PER_IP", "100000")
+os.environ.setdefault("WS_HANDSHAKE_BURST_PER_IP", "100000")
+os.environ.setdefault("WS_MAX_CONCURRENT_HANDSHAKES", "100000")
+os.environ["AUTH_PROVIDER"] = "local"
+os.environ.setdefault("AUTH_LOCAL_KEY_PATH", os.path.join(_db_dir, "local-auth.key"))
+
+import httpx  # noqa: E402
+import uvicorn  # noqa: E402
+import websockets  # noqa: E402
+from sqlalchemy import UUID, inspect  # noqa: E402
+from sqlalchemy.ext.compiler import compiles  # noqa: E402
+
+from app.core.auth_providers import get_auth_provider  # noqa: E402
+from app.db import engine  # noqa: E402
+from app.main import app  # noqa: E402
+from app.models.chatroom import ChatroomDB, MessageDB  # noqa: E402
+from app.models.user_models import Base, UserDB  # noqa: E402
+
+MARKER = "load"
+
+
+@compiles(UUID, "sqlite")
+def _compile_uuid_sqlite(type_, compiler, **kwargs):
+    # users.id(UUID)를 SQLite에서도 생성할 수 있도록 문자열 컬럼으로
+    return "CHAR(36)"
+
+
+def room_id(index: int) -> str:
+    return f"load-room-{index}"
+
+
+def listener_uid(room: int, index: int) -> str:
+    return f"load-listener-{room}-{index}"
+
+
+def poster_uid(room: int, index: int) -> str:
+    return f"load-poster-{room}-{index}"
+
+
+_tokens: Dict[str, str] = {}
+
+
+def token_for(uid: str) -> str:
+    token = _tokens.get(uid)
+    if token is None:
+        token = _tokens[uid] = get_auth_provider().issue_token(uid, ttl_seconds=24 * 3600)
+    return token
+
+
+def auth_headers(uid: str) -> Dict[str, str]:
+    return {"Authorization": f"Bearer {token_for(uid)}"}
+
+
+def prepare_database(args) -> None:
+    Base.metadata.create_all(engine, checkfirst=True)
+    for table in (ChatroomDB.__table__, MessageDB.__table__):
+        if not inspect(engine).has_table(table.name):
+            table.create(engine)
+
+    base = datetime.utcnow() - timedelta(days=7)
+    with engine.begin() as conn:
+        existing = {row[0] for row in conn.execute(ChatroomDB.__table__.select().with_only_columns(ChatroomDB.id))}
+        existing_users = {row[0] for row in conn.execute(UserDB.__table__.select().with_only_columns(UserDB.firebase_uid))}
+        for room in range(args.rooms):
+            uids = [listener_uid(room, i) for i in range(args.listeners)] + [poster_uid(room, i) for i in range(args.posters)]
+            new_users = [uid for uid in uids if uid not in existing_users]
+            if new_users:
+                conn.execute(UserDB.__table__.insert(), [
+                    {"id": uuid.uuid4(), "firebase_uid": uid, "email": f"{uid}@load.test", "name": uid, "likes": 0}
+                    for uid in new_users
+                ])
+            if room_id(room) in existing:
+                continue
+            conn.execute(ChatroomDB.__table__.insert(), [{
+                "id": room_id(room), "title": f"부하 테스트 채팅방 {room}", "created_by": poster_uid(room, 0),
+                "participants": uids, "connection": []
+            }])
+            conn.execute(MessageDB.__table__.insert(), [
+                {
+                    "id": str(uuid.uuid4()), "chatroom_id": room_id(room), "sender_id": poster_uid(room, 0),
+                    "content": f"기존 메시지 {i}", "timestamp": base + timedelta(seconds=i), "is_read": False
+                }
+                for i in range(args.seed_messages)
+            ])
+
+
+def percentile(sorted_values: List[float], q: float) -> float:
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, max(0, int(round(q * (len(sorted_values) - 1)))))
+    return sorted_values[index]
+
+
+def summarize(latencies: List[float], errors: int, elapsed: float) -> Dict[str, float]:
+    values = sorted(latencies)
+    return {
+        "requests": len(values),
+        "errors": errors,
+        "throughput_rps": round(len(values) / elapsed, 1) if elapsed else 0.0,
+        "p50_ms": round(percentile(values, 0.50) * 1000, 2),
+        "p90_ms": round(percentile(values, 0.90) * 1000, 2),
+        "p99_ms": round(percentile(values, 0.99) * 1000, 2),
+        "max_ms": round(values[-1] * 1000, 2) if values else 0.0,
+    }
+
+
+class Recorder:
+    """시나리오별 지연 시간/오류 수집 (측정 구간 밖에서 시작한 요청은 버림)"""
+
+    def __init__(self):
+        self.window_start = float("inf")
+        self.window_end = float("inf")
+        self.latencies: Dict[str, List[float]] = {}
+        self.errors: Dict[str, int] = {}
+
+    def in_window(self, started: float) -> bool:
+        return self.window_start <= started < self.window_end
+
+    def record(self, scenario: str, started: float, seconds: float, ok: bool):
+        if not self.in_window(started):
+            return
+        if ok:
+            self.latencies.setdefault(scenario, []).append(seconds)
+        else:
+            self.errors[scenario] = self.errors.get(scenario, 0) + 1
+
+
+async def timed_request(recorder: Recorder, scenario: str, client: httpx.AsyncClient, method: str, url: str, **kwargs):
+    started = time.perf_counter()
+    try:
+        response = await client.request(method, url, **kwargs)
+        ok = response.status_code < 400
+    except httpx.HTTPError:
+        ok = False
+    recorder.record(scenario, started, time.perf_counter() - started, ok)
+
+
+async def poster(recorder: Recorder, client: httpx.AsyncClient, room: int, index: int, stop: asyncio.Event, think: float):
+    uid = poster_uid(room, index)
+    seq = 0
+    while not stop.is_set():
+        seq += 1
+        # 전달 지연 측정용: 같은 프로세스이므로 perf_counter를 본문에 실어 보냄
+        content = f"{MARKER}:{time.perf_counter():.6f}:{uid}:{seq}"
+        await timed_request(
+            recorder, "post", client, "POST", f"/api/chat/{room_id(room)}",
+            json={"content": content}, headers=auth_headers(uid)
+        )
+        if think:
+            await asyncio.sleep(think)
+
+
+async def lister(recorder: Recorder, client: httpx.AsyncClient, stop: asyncio.Event, think: float):
+    while not stop.is_set():
+        await timed_request(recorder, "list", client, "GET", "/api/chatrooms/", params={"limit": 20})
+        if think:
+            await asyncio.sleep(think)
+
+
+async def history_pager(recorder: Recorder, client: httpx.AsyncClient, args, stop: asyncio.Event, think: float):
+    while not stop.is_set():
+        room = random.randrange(args.rooms)
+        skip = random.randrange(0, max(1, args.seed_messages - 50))
+        await timed_request(
+            recorder, "history", client, "GET", f"/api/chat/{room_id(room)}",
+            params={"skip": skip, "limit": 50}, headers=auth_headers(listener_uid(room, 0))
+        )
+        if think:
+            await asyncio.sleep(think)
+
+
+class Listener:
+    def __init__(self, recorder: Recorder):
+        self.recorder = recorder
+        self.lags: List[float] = []
+        self.received = 0
+
+    async def run(self, url: str, uid: str, ready: asyncio.Event):
+        async with websockets.connect(url, max_queue=None, ping_interval=None, open_timeout=60) as websocket:
+            await websocket.recv()  # 연결 성공 메시지
+            await websocket.send(json.dumps({"type": "auth", "token": token_for(uid)}))
+            await websocket.recv()  # 인증 결과
+            ready.set()
+            try:
+                async for frame in websocket:
+                    self._on_frame(frame)
+            except websockets.ConnectionClosed:
+                pass
+
+    def _on_frame(self, frame):
+        received_at = time.perf_counter()
+        try:
+            content = json.loads(frame).get("content", "")
+        except (ValueError, AttributeError):
+            return
+        if not isinstance(content, str) or not content.startswith(MARKER + ":"):
+            return
+        # 측정 구간에 보낸 메시지만 집계 (구간 종료 후 도착한 것도 포함)
+        sent_at = float(content.split(":", 2)[1])
+        if self.recorder.in_window(sent_at):
+            self.received += 1
+            self.lags.append(received_at - sent_at)
+
+
+async def run(args) -> Dict:
+    config = uvicorn.Config(app, host="127.0.0.1", port=args.port, log_level="warning", ws="websockets")
+    server = uvicorn.Server(config)
+    server_task = asyncio.create_task(server.serve())
+    while not server.started:
+        await asyncio.sleep(0.05)
+
+    recorder = Recorder()
+    stop = asyncio.Event()
+    think = args.think_ms / 1000
+
+    # 구독자 연결
+    listeners: List[Listener] = []
+    listener_tasks = []
+    ready_events = []
+    for room in range(args.rooms):
+        for index in range(args.listeners):
+            listener = Listener(recorder)
+            ready = asyncio.Event()
+            listeners.append(listener)
+            ready_events.append(ready)
+            listener_tasks.append(asyncio.create_task(listener.run(
+                f"ws://127.0.0.1:{args.port}/api/ws/chat/{room_id(room)}", listener_uid(room, index), ready
+            )))
+    await asyncio.wait_for(asyncio.gather(*(event.wait() for event in ready_events)), timeout=120)
+
+    limits = httpx.Limits(max_connections=None, max_keepalive_connections=None)
+    async with httpx.AsyncClient(base_url=f"http://127.0.0.1:{args.port}", limits=limits, timeout=30) as client:
+        workers = [
+            asyncio.create_task(poster(recorder, client, room, index, stop, think))
+            for room in range(args.rooms) for index in range(args.posters)
+        ]
+        workers += [asyncio.create_task(lister(recorder, client, stop, think)) for _ in range(args.list_clients)]
+        workers += [
+            asyncio.create_task(history_pager(recorder, client, args, stop, think)) for _ in range(args.history_clients)
+        ]
+
+        await asyncio.sleep(args.warmup)
+        recorder.window_start = time.perf_counter()
+        await asyncio.sleep(args.duration)
+        recorder.window_end = time.perf_counter()
+        elapsed = recorder.window_end - recorder.window_start
+        stop.set()
+        await asyncio.gather(*workers)
+
+    # 측정 종료 직전에 보낸 메시지가 도착할 시간을 줌
+    await asyncio.sleep(1.0)
+    server.should_exit = True
+    await server_task
+    for task in listener_tasks:
+        task.cancel()
+    await asyncio.gather(*listener_tasks, return_exceptions=True)
+
+    lags = sorted(lag for listener in listeners for lag in listener.lags)
+    posted = len(recorder.latencies.get("post", []))
+    results = {
+        scenario: summarize(recorder.latencies.get(scenario, []), recorder.errors.get(scenario, 0), elapsed)
+        for scenario in ("post", "list", "history")
+    }
+    results["delivery"] = {
+        "expected": posted * args.listeners,
+        "received": sum(listener.received for listener in listeners),
+        "p50_ms": round(percentile(lags, 0.50) * 1000, 2),
+        "p90_ms": round(percentile(lags, 0.90) * 1000, 2),
+        "p99_ms": round(percentile(lags, 0.99) * 1000, 2),
+        "max_ms": round(lags[-1] * 1000, 2) if lags else 0.0,
+    }
+    return results
+
+
+def git_revision() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(baseline_path: str, candidate_path: str) -> None:
+    """두 결과 파일의 시나리오별 처리량/지연 시간 변화를 출력합니다."""
+    with open(baseline_path, encoding="utf-8") as f:
+        baseline = json.load(f)
+    with open(candidate_path, encoding="utf-8") as f:
+        candidate = json.load(f)
+    print(f"baseline  {baseline['meta'].get('revision')}  vs  candidate  {candidate['meta'].get('revision')}")
+    for scenario, before in baseline["results"].items():
+        after = candidate["results"].get(scenario, {})
+        for key in ("throughput_rps", "p50_ms", "p99_ms"):
+            if key in before and key in after and before[key]:
+                change = (after[key] - before[key]) / before[key] * 100
+                print(f"  {scenario:<9} {key:<15} {before[key]:>10} -> {after[key]:>10}  ({change:+.1f}%)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="채팅 흐름 부하 테스트")
+    parser.add_argument("--rooms", type=int, default=5)
+    parser.add_argument("--listeners", type=int, default=20, help="채팅방당 WebSocket 구독자 수")
+    parser.add_argument("--posters", type=int, default=4, help="채팅방당 메시지 전송자 수")
+    parser.add_argument("--list-clients", type=int, default=4, help="채팅방 목록 조회 클라이언트 수")
+    parser.add_argument("--history-clients", type=int, default=4, help="히스토리 페이지 조회 클라이언트 수")
+    parser.add_argument("--seed-messages", type=int, default=2000, help="채팅방당 미리 넣어 둘 메시지 수")
+    parser.add_argument("--think-ms", type=float, default=0.0, help="클라이언트 요청 사이 대기 시간")
+    parser.add_argument("--warmup", type=float, default=3.0, help="측정 전 예열 시간(초)")
+    parser.add_argument("--duration", type=float, default=20.0, help="측정 시간(초)")
+    parser.add_argument("--database-url", default=None, help="기본값: 임시 SQLite 파일")
+    parser.add_argument("--port", type=int, default=8766)
+    parser.add_argument("--seed", type=int, default=1, help="히스토리 페이지 선택 난수 시드")
+    parser.add_argument("--output", default=None, help="결과 JSON 저장 경로 (기본: 표준 출력만)")
+    parser.add_argument("--compare", nargs=2, metavar=("BASELINE", "CANDIDATE"), help="두 결과 파일 비교")
+    args = parser.parse_args()
+
+    if args.compare:
+        compare(*args.compare)
+        return
+
+    random.seed(args.seed)
+    # 클라이언트 + 서버 소켓 모두 이 프로세스에 있으므로 fd 한도를 올림
+    sockets = args.rooms * (args.listeners + args.posters) + args.list_clients + args.history_clients
+    soft, hard = resource.getrlimit(resource.RLIMIT_NOFILE)
+    resource.setrlimit(resource.RLIMIT_NOFILE, (min(hard, max(soft, sockets * 2 + 256)), hard))
+
+    prepare_database(args)
+    results = asyncio.run(run(args))
+
+    report = {
+        "meta": {
+            "benchmark": "chat_load",
+            "revision": git_revision(),
+            "started_at": datetime.utcnow().isoformat(timespec="seconds") + "Z",
+            "database": engine.url.get_backend_name(),
+            "python": sys.version.split()[0],
+            "params": {key: value for key, value in vars(args).items() if key not in ("compare", "output", "database_url")},
+        },
+        "results": results,
+    }
+    output = json.dumps(report, ensure_ascii=False, indent=2)
+    print(output)
+    if args.output:
+        os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(output + "\n")
+
+
+if __name__ == "__main__":
+    main()
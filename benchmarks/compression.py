@@ -0,0 +1,126 @@
+"""
+응답 압축 벤치마크 (채팅방 목록 형태의 JSON)
+
+같은 JSON을 반환하는 엔드포인트를 압축 구성별로 비교합니다.
+- gzip-mw:           변경 전 GZipMiddleware(minimum_size=1000, 레벨 9, 이벤트 루프에서 매번 압축)
+- <encoding>/nocache: CompressionMiddleware, 압축 결과 캐시 없음 (크기별 레벨 + 스레드풀)
+- <encoding>:        CompressionMiddleware 기본 구성 (같은 본문은 LRU에서 재사용)
+
+요청당 처리 시간, 이벤트 루프에서 압축에 쓴 시간, 압축률을 측정합니다.
+HTTP 서버 비용을 제외하기 위해 ASGI 앱을 직접 호출합니다.
+
+사용법:
+    python -m benchmarks.compression [--rooms 300] [--requests 200] [--concurrency 16]
+"""
+import argparse
+import asyncio
+import gzip
+import hashlib
+import os
+import time
+
+from fastapi import FastAPI
+from fastapi.middleware.gzip import GZipMiddleware
+
+os.environ.setdefault("AUTH_PROVIDER", "local")
+os.environ.setdefault("AUTH_LOCAL_SECRET", "compression-benchmark")
+
+from app.core.compression import CompressionMiddleware, available_encodings  # noqa: E402
+from app.core.config import settings  # noqa: E402
+from app.core.responses import UnicodeJSONResponse, model_response  # noqa: E402
+from benchmarks.json_response import build_chatrooms  # noqa: E402
+
+
+def build_app(body: bytes, middleware, **options) -> FastAPI:
+    app = FastAPI()
+
+    @app.get("/chatrooms")
+    async def chatrooms_endpoint():
+        return UnicodeJSONResponse(content=body)
+
+    app.add_middleware(middleware, **options)
+    return app
+
+
+def on_loop_ms(middleware_name: str, body: bytes, cached: bool) -> float:
+    """요청 하나가 이벤트 루프에서 압축에 쓰는 시간"""
+    started = time.perf_counter()
+    if middleware_name == "gzip-mw":
+        gzip.compress(body, compresslevel=9)
+    elif cached:
+        hashlib.blake2b(body, digest_size=16).digest()
+    elif len(body) < settings.COMPRESSION_THREADPOOL_MIN_BYTES:
+        return -1.0
+    else:
+        return 0.0
+    return (time.perf_counter() - started) * 1000
+
+
+async def drive(app, requests: int, concurrency: int, encoding: str):
+    scope = {
+        "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1", "method": "GET",
+        "scheme": "http", "path": "/chatrooms", "raw_path": b"/chatrooms", "root_path": "",
+        "query_string": b"", "client": ("127.0.0.1", 1), "server": ("bench", 80),
+        "headers": [(b"host", b"bench"), (b"accept-encoding", encoding.encode())],
+    }
+    sizes = []
+
+    async def one():
+        delivered = False
+
+        async def receive():
+            nonlocal delivered
+            if not delivered:
+                delivered = True
+                return {"type": "http.request", "body": b"", "more_body": False}
+            await asyncio.Future()
+
+        body = bytearray()
+
+        async def send(message):
+            if message["type"] == "http.response.body":
+                body.extend(message.get("body", b""))
+
+        await app(dict(scope), receive, send)
+        sizes.append(len(body))
+
+    await one()  # 워밍업
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def limited():
+        async with semaphore:
+            await one()
+
+    started = time.perf_counter()
+    await asyncio.gather(*(limited() for _ in range(requests)))
+    elapsed = time.perf_counter() - started
+    return elapsed / requests * 1000, sizes[-1]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="응답 압축 벤치마크")
+    parser.add_argument("--rooms", type=int, default=300)
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=16)
+    args = parser.parse_args()
+
+    body = model_response(build_chatrooms(args.rooms)).body
+    print(f"payload: {len(body) / 1024:.0f} KiB, available encodings: {', '.join(available_encodings())}")
+
+    cases = [("gzip-mw", GZipMiddleware, "gzip", {"minimum_size": 1000}, False)]
+    for encoding in available_encodings():
+        cases.append((f"{encoding}/nocache", CompressionMiddleware, encoding, {"cache_max_bytes": 0}, False))
+        cases.append((encoding, CompressionMiddleware, encoding, {}, True))
+    for name, middleware, encoding, options, cached in cases:
+        per_request, size = asyncio.run(
+            drive(build_app(body, middleware, **options), args.requests, args.concurrency, encoding)
+        )
+        on_loop = on_loop_ms(name, body, cached)
+        print(
+            f"{name:<14} {per_request:7.2f} ms/request   on-loop {on_loop:6.2f} ms   "
+            f"{size / 1024:6.0f} KiB ({size / len(body):.1%})"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,159 @@
+"""
+동시 채팅방 참여 테스트
+
+사용자 --users 명이 같은 채팅방에 동시에 참여한 뒤, 참여자 목록과 채팅방 카드에
+모두 기록되었는지 확인합니다. (하나라도 빠지면 종료 코드 1)
+각 참여는 join_chatroom과 같은 순서(참여자 추가 → 카드 갱신 → 커밋)로 별도 세션/스레드에서
+실행하며, 여러 워커 프로세스가 같은 행을 동시에 고치는 상황을 흉내 냅니다.
+
+- 기본:     app.utils.membership.add_participant (UPDATE 한 번)
+- --legacy: 변경 전 방식 (참여자 목록을 읽어 파이썬에서 추가한 뒤 다시 저장) - 유실 확인용
+
+DB는 기본적으로 임시 SQLite 파일이며 --database-url로 로컬 Postgres를 지정할 수 있습니다
+(스키마가 없으면 생성, 테스트용 채팅방/사용자는 끝나면 삭제).
+
+사용법:
+    python -m benchmarks.concurrent_joins [--users 500] [--threads 64] [--legacy]
+    python -m benchmarks.concurrent_joins --database-url postgresql://localhost/mhp
+"""
+import argparse
+import json
+import os
+import sys
+import tempfile
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Optional
+
+
+def _database_url_from_argv() -> Optional[str]:
+    # 앱 임포트(엔진 생성) 전에 DB URL을 확정해야 하므로 argparse보다 먼저 읽음
+    for index, arg in enumerate(sys.argv):
+        if arg == "--database-url" and index + 1 < len(sys.argv):
+            return sys.argv[index + 1]
+        if arg.startswith("--database-url="):
+            return arg.split("=", 1)[1]
+    return None
+
+
+_db_dir = tempfile.mkdtemp(prefix="concurrent_joins_")
+os.environ["SQLALCHEMY_DATABASE_URL"] = _database_url_from_argv() or f"sqlite:///{_db_dir}/joins.db"
+os.environ.setdefault("LOG_FILE", os.path.join(_db_dir, "app.log"))
+os.environ.setdefault("LOG_LEVEL", "WARNING")
+os.environ.setdefault("AUTH_PROVIDER", "local")
+os.environ.setdefault("AUTH_LOCAL_KEY_PATH", os.path.join(_db_dir, "local-auth.key"))
+
+from sqlalchemy import UUID  # noqa: E402
+from sqlalchemy.ext.compiler import compiles  # noqa: E402
+
+from app.db import SessionLocal, engine  # noqa: E402
+from app.models.chatroom import ChatroomCardDB, ChatroomDB  # noqa: E402
+from app.models.user_models import Base, UserDB  # noqa: E402
+from app.utils.membership import add_participant  # noqa: E402
+from app.utils.room_cards import refresh_room_card  # noqa: E402
+
+RUN_ID = uuid.uuid4().hex[:8]
+ROOM_ID = f"joins-{RUN_ID}-room"
+
+
+@compiles(UUID, "sqlite")
+def _compile_uuid_sqlite(type_, compiler, **kwargs):
+    # users.id(UUID)를 SQLite에서도 생성할 수 있도록 문자열 컬럼으로
+    return "CHAR(36)"
+
+
+def user_uid(index: int) -> str:
+    return f"joins-{RUN_ID}-user-{index}"
+
+
+def prepare_database(users: int):
+    Base.metadata.create_all(engine, checkfirst=True)
+    with engine.begin() as conn:
+        conn.execute(UserDB.__table__.insert(), [
+            {"id": uuid.uuid4(), "firebase_uid": user_uid(i), "email": f"{user_uid(i)}@joins.test",
+             "name": f"참여자 {i}", "likes": 0}
+            for i in range(users)
+        ])
+        conn.execute(ChatroomDB.__table__.insert(), [{
+            "id": ROOM_ID, "title": "동시 참여 테스트", "created_by": "system", "created_at": datetime.utcnow(),
+            "participants": [], "connection": [], "is_active": True
+        }])
+
+
+def cleanup_database():
+    with engine.begin() as conn:
+        conn.execute(ChatroomCardDB.__table__.delete().where(ChatroomCardDB.chatroom_id == ROOM_ID))
+        conn.execute(ChatroomDB.__table__.delete().where(ChatroomDB.id == ROOM_ID))
+        conn.execute(UserDB.__table__.delete().where(UserDB.firebase_uid.like(f"joins-{RUN_ID}-%")))
+
+
+def join(uid: str, start: threading.Event, legacy: bool):
+    start.wait()
+    with SessionLocal() as db:
+        chatroom = db.get(ChatroomDB, ROOM_ID)
+        if legacy:
+            # 변경 전 join_chatroom: 읽기 → 파이썬에서 추가 → 전체 목록 저장
+            participants = chatroom.get_participants()
+            if uid not in participants:
+                chatroom.participants = participants + [uid]
+                chatroom.updated_at = datetime.utcnow()
+        else:
+            add_participant(db, chatroom, uid)
+        refresh_room_card(db, ROOM_ID)
+        db.commit()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="동시 채팅방 참여 테스트")
+    parser.add_argument("--users", type=int, default=500)
+    parser.add_argument("--threads", type=int, default=64)
+    parser.add_argument("--legacy", action="store_true", help="변경 전 read-modify-write 방식으로 실행")
+    parser.add_argument("--database-url", help="기본값: 임시 SQLite 파일")
+    args = parser.parse_args()
+
+    prepare_database(args.users)
+    try:
+        start = threading.Event()
+        errors = []
+        with ThreadPoolExecutor(max_workers=args.threads) as pool:
+            futures = [pool.submit(join, user_uid(i), start, args.legacy) for i in range(args.users)]
+            started = time.perf_counter()
+            start.set()
+            for future in futures:
+                try:
+                    future.result()
+                except Exception as e:
+                    errors.append(str(e).splitlines()[0])
+        elapsed = time.perf_counter() - started
+
+        with SessionLocal() as db:
+            participants = db.get(ChatroomDB, ROOM_ID).get_participants()
+            card = db.get(ChatroomCardDB, ROOM_ID)
+            card_participants = len(json.loads(card.card)["participants"]) if card else 0
+
+        expected = {user_uid(i) for i in range(args.users)}
+        missing = expected - set(participants)
+        duplicates = len(participants) - len(set(participants))
+        print(
+            f"database: {engine.dialect.name}, mode: {'legacy' if args.legacy else 'atomic'}, "
+            f"users: {args.users}, threads: {args.threads}"
+        )
+        print(f"elapsed: {elapsed:.2f}s ({args.users / elapsed:,.0f} joins/s), errors: {len(errors)}")
+        for error in sorted(set(errors))[:5]:
+            print(f"  {error}")
+        print(
+            f"recorded: {len(set(participants))} / {args.users}, missing: {len(missing)}, "
+            f"duplicates: {duplicates}, card participants: {card_participants}"
+        )
+        ok = not missing and not duplicates and not errors and card_participants == args.users
+        print("OK" if ok else "FAILED")
+    finally:
+        cleanup_database()
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,115 @@
+"""
+채팅 내역 NDJSON 내보내기 처리량 벤치마크
+
+임시 SQLite DB의 채팅방 하나에 메시지를 대량으로 넣은 뒤, 같은 프로세스의 uvicorn 서버에서
+GET /api/chat/{room_id}/export 를 스트리밍으로 받아 처리량과 메모리(RSS) 변화를 측정합니다.
+채팅방 크기와 무관하게 RSS 증가량이 일정해야 합니다.
+
+Firebase 토큰 검증은 "토큰 = UID"로 대체합니다.
+
+사용법:
+    python -m benchmarks.export_throughput [--messages 5000000]
+"""
+import argparse
+import asyncio
+import os
+import tempfile
+import time
+import uuid
+from datetime import datetime, timedelta
+
+_db_dir = tempfile.mkdtemp(prefix="export_bench_")
+os.environ.setdefault("SQLALCHEMY_DATABASE_URL", f"sqlite:///{_db_dir}/export.db")
+os.environ.setdefault("MESSAGE_ARCHIVE_DIR", os.path.join(_db_dir, "archive"))
+
+import firebase_admin  # noqa: E402
+from firebase_admin import auth as firebase_auth  # noqa: E402
+
+firebase_admin.get_app = lambda *args, **kwargs: None
+firebase_auth.verify_id_token = lambda token, **kwargs: {"uid": token}
+
+import httpx  # noqa: E402
+import uvicorn  # noqa: E402
+
+from app.db import engine  # noqa: E402
+from app.main import app  # noqa: E402
+from app.models.chatroom import ChatroomDB, MessageDB  # noqa: E402
+
+ROOM_ID = "export-bench-room"
+USER_ID = "export-bench-user"
+
+
+def rss_mb() -> float:
+    with open("/proc/self/statm") as f:
+        return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 1e6
+
+
+def prepare_database(messages: int, batch: int = 50_000):
+    ChatroomDB.__table__.create(engine, checkfirst=True)
+    MessageDB.__table__.create(engine, checkfirst=True)
+    started = time.perf_counter()
+    base = datetime.utcnow() - timedelta(days=30)
+    with engine.begin() as conn:
+        conn.execute(ChatroomDB.__table__.insert(), [{
+            "id": ROOM_ID, "title": "export", "created_by": USER_ID,
+            "participants": [USER_ID], "connection": []
+        }])
+        for start in range(0, messages, batch):
+            conn.execute(MessageDB.__table__.insert(), [
+                {
+                    "id": str(uuid.uuid4()),
+                    "chatroom_id": ROOM_ID,
+                    "sender_id": USER_ID,
+                    "content": f"내보내기 벤치마크 메시지 {i} 좋은 아침입니다",
+                    "timestamp": base + timedelta(milliseconds=i),
+                    "is_read": False
+                }
+                for i in range(start, min(start + batch, messages))
+            ])
+    print(f"inserted {messages:,} messages in {time.perf_counter() - started:.1f}s")
+
+
+async def run(port: int):
+    config = uvicorn.Config(app, host="127.0.0.1", port=port, log_level="warning")
+    server = uvicorn.Server(config)
+    server_task = asyncio.create_task(server.serve())
+    while not server.started:
+        await asyncio.sleep(0.05)
+
+    baseline = rss_mb()
+    peak = baseline
+    lines = 0
+    received = 0
+    started = time.perf_counter()
+    headers = {"Authorization": f"Bearer {USER_ID}", "Accept-Encoding": "identity"}
+    async with httpx.AsyncClient(timeout=None) as client:
+        async with client.stream("GET", f"http://127.0.0.1:{port}/api/chat/{ROOM_ID}/export", headers=headers) as response:
+            assert response.status_code == 200, response.status_code
+            async for chunk in response.aiter_raw():
+                received += len(chunk)
+                lines += chunk.count(b"\n")
+                if lines % 100_000 < chunk.count(b"\n"):
+                    peak = max(peak, rss_mb())
+    elapsed = time.perf_counter() - started
+    peak = max(peak, rss_mb())
+
+    print(f"exported {lines:,} messages ({received / 1e6:.0f} MB) in {elapsed:.1f}s")
+    print(f"throughput: {lines / elapsed:,.0f} msg/s, {received / 1e6 / elapsed:.1f} MB/s")
+    print(f"RSS: {baseline:.0f} MB before, {peak:.0f} MB peak (+{peak - baseline:.0f} MB)")
+
+    server.should_exit = True
+    await server_task
+
+
+def main():
+    parser = argparse.ArgumentParser(description="NDJSON 내보내기 처리량 벤치마크")
+    parser.add_argument("--messages", type=int, default=5_000_000)
+    parser.add_argument("--port", type=int, default=8766)
+    args = parser.parse_args()
+
+    prepare_database(args.messages)
+    asyncio.run(run(args.port))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,114 @@
+"""
+JSON 응답 직렬화 벤치마크 (/api/chatrooms/ 형태의 응답)
+
+채팅방 목록 응답(List[Chatroom], 참가자 + 최근 메시지 10개 포함)을 두 가지 방식으로 비교합니다.
+- before: response_model 재검증 → jsonable_encoder → json.dumps(ensure_ascii=False)
+- after:  model_response (pydantic 직렬화기로 바로 JSON 바이트 생성, UnicodeJSONResponse)
+
+직렬화 단독 시간과, 같은 데이터를 반환하는 FastAPI 라우트의 요청 처리량을 측정합니다.
+DB 조회 비용은 제외됩니다.
+
+사용법:
+    python -m benchmarks.json_response [--rooms 100] [--requests 300]
+"""
+import argparse
+import json
+import time
+from datetime import datetime, timedelta
+from typing import List
+
+from fastapi import FastAPI
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+from fastapi.testclient import TestClient
+
+from app.core.responses import model_response
+from app.schemas.chatroom import Chatroom, Coordinate, Message
+from app.schemas.user import UserProfile
+
+
+class LegacyUnicodeJSONResponse(JSONResponse):
+    """변경 전 main.py의 UnicodeJSONResponse"""
+
+    def render(self, content) -> bytes:
+        return json.dumps(
+            content,
+            ensure_ascii=False,
+            allow_nan=False,
+            indent=None,
+            separators=(",", ":"),
+        ).encode("utf-8")
+
+
+def build_chatrooms(rooms: int) -> List[Chatroom]:
+    now = datetime.utcnow()
+    return [
+        Chatroom(
+            id=f"room-{r}",
+            title=f"한강 러닝 같이 하실 분 {r}",
+            participants=[
+                UserProfile(uid=f"user-{r}-{p}", nickname=f"김철수{p}", bio="아침 러닝을 좋아합니다", likes=p)
+                for p in range(5)
+            ],
+            connection=[Coordinate(latitude=37.5665, longitude=126.9780)],
+            createdAt=now,
+            Message=[
+                Message(id=f"msg-{r}-{m}", senderId=f"user-{r}-{m % 5}",
+                        content=f"내일 아침 6시에 만날까요? {m}", timestamp=now - timedelta(minutes=m))
+                for m in range(10)
+            ]
+        )
+        for r in range(rooms)
+    ]
+
+
+def build_app(chatrooms: List[Chatroom]) -> FastAPI:
+    app = FastAPI()
+
+    @app.get("/before", response_model=List[Chatroom], response_class=LegacyUnicodeJSONResponse)
+    async def before():
+        return chatrooms
+
+    @app.get("/after", response_model=List[Chatroom])
+    async def after():
+        return model_response(chatrooms)
+
+    return app
+
+
+def per_call_ms(fn, repeat: int) -> float:
+    started = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    return (time.perf_counter() - started) * 1000 / repeat
+
+
+def main():
+    parser = argparse.ArgumentParser(description="JSON 응답 직렬화 벤치마크")
+    parser.add_argument("--rooms", type=int, default=100)
+    parser.add_argument("--requests", type=int, default=300)
+    args = parser.parse_args()
+
+    chatrooms = build_chatrooms(args.rooms)
+
+    legacy = lambda: LegacyUnicodeJSONResponse(jsonable_encoder(chatrooms)).body  # noqa: E731
+    fast = lambda: model_response(chatrooms).body  # noqa: E731
+    assert json.loads(legacy()) == json.loads(fast()), "responses differ"
+    print(f"payload: {args.rooms} rooms, {len(fast()) / 1024:.0f} KiB")
+    print(f"serialize  before {per_call_ms(legacy, 50):7.2f} ms   after {per_call_ms(fast, 50):7.2f} ms")
+
+    client = TestClient(build_app(chatrooms))
+    results = {}
+    for route in ("before", "after"):
+        client.get(f"/{route}")
+        started = time.perf_counter()
+        for _ in range(args.requests):
+            response = client.get(f"/{route}")
+        elapsed = time.perf_counter() - started
+        results[route] = args.requests / elapsed
+        print(f"/{route:<7} {results[route]:8.1f} req/s  content-type: {response.headers['content-type']}")
+    print(f"speedup: {results['after'] / results['before']:.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,121 @@
+"""
+요청 로깅 미들웨어 오버헤드 벤치마크
+
+hello-world 엔드포인트 하나만 있는 FastAPI 앱을 세 가지로 구성해 요청당 처리 시간을 비교합니다.
+- none:     미들웨어 없음
+- baseline: 변경 전 LoggingMiddleware (BaseHTTPMiddleware + 동기 FileHandler/StreamHandler 로깅)
+- timing:   TimingMiddleware (순수 ASGI + 큐 기반 로깅)
+
+HTTP 서버 비용을 제외하기 위해 ASGI 앱을 직접 호출합니다.
+
+사용법:
+    python -m benchmarks.middleware_overhead [--requests 20000]
+"""
+import argparse
+import asyncio
+import io
+import logging
+import os
+import tempfile
+import time
+
+from fastapi import FastAPI, Request
+from starlette.middleware.base import BaseHTTPMiddleware
+
+from app.core.logging_config import setup_logging, stop_logging
+from app.core.middleware import TimingMiddleware
+
+
+class LegacyLoggingMiddleware(BaseHTTPMiddleware):
+    """변경 전 main.py의 LoggingMiddleware"""
+
+    async def dispatch(self, request: Request, call_next):
+        start_time = time.time()
+        response = await call_next(request)
+        process_time = time.time() - start_time
+        if "application/json" in response.headers.get("content-type", ""):
+            response.headers["content-type"] = "application/json; charset=utf-8"
+        legacy_logger.info(
+            f"{request.method} {request.url.path} "
+            f"완료: {response.status_code} ({process_time:.3f}s)"
+        )
+        return response
+
+
+legacy_logger = logging.getLogger("benchmark.legacy")
+
+
+def build_app(middleware=None) -> FastAPI:
+    app = FastAPI()
+
+    @app.get("/hello/{name}")
+    async def hello(name: str):
+        return {"message": f"안녕하세요 {name}"}
+
+    if middleware is not None:
+        app.add_middleware(middleware)
+    return app
+
+
+async def drive(app, requests: int) -> float:
+    scope = {
+        "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1", "method": "GET",
+        "scheme": "http", "path": "/hello/world", "raw_path": b"/hello/world", "root_path": "",
+        "query_string": b"", "headers": [(b"host", b"bench")], "client": ("127.0.0.1", 1), "server": ("bench", 80),
+    }
+
+    def make_receive():
+        # 서버와 같이 본문을 한 번 전달한 뒤에는 연결 종료 전까지 대기
+        delivered = False
+
+        async def receive():
+            nonlocal delivered
+            if not delivered:
+                delivered = True
+                return {"type": "http.request", "body": b"", "more_body": False}
+            await asyncio.Future()
+
+        return receive
+
+    async def send(message):
+        pass
+
+    for _ in range(500):
+        await app(dict(scope), make_receive(), send)
+    started = time.perf_counter()
+    for _ in range(requests):
+        await app(dict(scope), make_receive(), send)
+    return (time.perf_counter() - started) / requests * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description="요청 로깅 미들웨어 오버헤드 벤치마크")
+    parser.add_argument("--requests", type=int, default=20_000)
+    args = parser.parse_args()
+
+    log_dir = tempfile.mkdtemp(prefix="middleware_bench_")
+
+    # 변경 전 구성: 이벤트 루프에서 직접 콘솔/파일에 기록 (콘솔은 버퍼로 대체)
+    legacy_logger.propagate = False
+    legacy_logger.setLevel(logging.INFO)
+    legacy_logger.addHandler(logging.StreamHandler(io.StringIO()))
+    legacy_logger.addHandler(logging.FileHandler(os.path.join(log_dir, "legacy.log"), encoding="utf-8"))
+
+    # 변경 후 구성: 큐 기반 로깅 (콘솔 출력은 버퍼로 대체)
+    listener = setup_logging(log_file=os.path.join(log_dir, "timing.log"))
+    for handler in listener.handlers:
+        if type(handler) is logging.StreamHandler:
+            handler.setStream(io.StringIO())
+
+    results = {}
+    for name, middleware in (("none", None), ("baseline", LegacyLoggingMiddleware), ("timing", TimingMiddleware)):
+        results[name] = asyncio.run(drive(build_app(middleware), args.requests))
+    stop_logging()
+
+    for name, micros in results.items():
+        overhead = micros - results["none"]
+        print(f"{name:<9} {micros:8.1f} us/request   overhead {overhead:+7.1f} us")
+
+
+if __name__ == "__main__":
+    main()
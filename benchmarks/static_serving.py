@@ -0,0 +1,189 @@
+"""
+정적 파일 제공 경로 벤치마크
+
+같은 파일 세트를 세 가지 경로로 제공하고 동시 요청 처리량을 비교합니다.
+- app:         변경 전 StaticFiles (uvicorn 워커가 파일을 읽어 전송, Cache-Control 없음)
+- app-cached:  CachedStaticFiles + 클라이언트 재검증 (If-None-Match → 304)
+- nginx:       nginx가 디스크에서 직접 sendfile (PATH에 nginx가 있거나 --nginx-url 지정 시)
+
+앱 서버는 별도 프로세스(uvicorn 1워커)에서 실행해 부하 생성기와 CPU를 나눠 쓰지 않게 합니다.
+
+사용법:
+    python -m benchmarks.static_serving [--duration 5] [--concurrency 32]
+    python -m benchmarks.static_serving --nginx-url http://127.0.0.1:8080   # 이미 떠 있는 nginx
+"""
+import argparse
+import asyncio
+import multiprocessing
+import os
+import shutil
+import subprocess
+import tempfile
+import time
+from typing import Dict, Optional
+
+import httpx
+
+# app 패키지 임포트 시 Firebase 초기화를 건너뛰도록 로컬 인증 공급자 사용 (spawn된 서버 프로세스에도 상속)
+os.environ.setdefault("AUTH_PROVIDER", "local")
+os.environ.setdefault("AUTH_LOCAL_SECRET", "static-serving-benchmark")
+os.environ.setdefault("LOG_LEVEL", "WARNING")
+
+ASSETS = {
+    "css/styles.css": 4 * 1024,
+    "js/app.0123456789ab.js": 200 * 1024,
+    "img/hero.jpg": 2 * 1024 * 1024,
+}
+
+NGINX_CONF = """
+worker_processes 1;
+daemon off;
+pid {root}/nginx.pid;
+error_log {root}/error.log warn;
+events {{ worker_connections 1024; }}
+http {{
+    access_log off;
+    sendfile on;
+    tcp_nopush on;
+    tcp_nodelay on;
+    server {{
+        listen 127.0.0.1:{port};
+        location /static/ {{
+            root {root}/www;
+            etag on;
+            open_file_cache max=1000 inactive=60s;
+            add_header Cache-Control "public, no-cache";
+        }}
+    }}
+}}
+"""
+
+
+def create_assets(root: str) -> str:
+    static_dir = os.path.join(root, "www", "static")
+    for relative, size in ASSETS.items():
+        path = os.path.join(static_dir, relative)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "wb") as f:
+            f.write(os.urandom(size))
+    return static_dir
+
+
+def serve_app(static_dir: str, port: int, cached: bool):
+    import uvicorn
+    from starlette.applications import Starlette
+    from starlette.staticfiles import StaticFiles
+
+    from app.core.static_files import CachedStaticFiles
+
+    app = Starlette()
+    app.mount("/static", (CachedStaticFiles if cached else StaticFiles)(directory=static_dir))
+    uvicorn.run(app, host="127.0.0.1", port=port, log_level="warning")
+
+
+async def wait_ready(url: str, timeout: float = 20.0):
+    deadline = time.perf_counter() + timeout
+    async with httpx.AsyncClient() as client:
+        while time.perf_counter() < deadline:
+            try:
+                await client.get(url)
+                return
+            except httpx.TransportError:
+                await asyncio.sleep(0.1)
+    raise RuntimeError(f"server did not start: {url}")
+
+
+async def load(base_url: str, asset: str, duration: float, concurrency: int, revalidate: bool) -> Dict[str, float]:
+    url = f"{base_url}/static/{asset}"
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    requests = 0
+    not_modified = 0
+    transferred = 0
+    async with httpx.AsyncClient(limits=limits, timeout=30) as client:
+        first = await client.get(url)
+        etag = first.headers.get("etag")
+        headers = {"If-None-Match": etag} if revalidate and etag else {}
+        deadline = time.perf_counter() + duration
+
+        async def worker():
+            nonlocal requests, not_modified, transferred
+            while time.perf_counter() < deadline:
+                response = await client.get(url, headers=headers)
+                requests += 1
+                transferred += len(response.content)
+                if response.status_code == 304:
+                    not_modified += 1
+
+        started = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        elapsed = time.perf_counter() - started
+    return {
+        "rps": requests / elapsed,
+        "mb_per_s": transferred / elapsed / 1e6,
+        "not_modified": not_modified / requests if requests else 0.0,
+        "cache_control": first.headers.get("cache-control", "-"),
+    }
+
+
+def start_nginx(root: str, port: int) -> Optional[subprocess.Popen]:
+    binary = shutil.which("nginx")
+    if binary is None:
+        return None
+    conf_path = os.path.join(root, "nginx.conf")
+    with open(conf_path, "w") as f:
+        f.write(NGINX_CONF.format(root=root, port=port))
+    return subprocess.Popen([binary, "-p", root, "-c", conf_path])
+
+
+def run_target(name: str, base_url: str, args, revalidate: bool = False):
+    for asset in ASSETS:
+        result = asyncio.run(load(base_url, asset, args.duration, args.concurrency, revalidate))
+        print(
+            f"{name:<11} {asset:<24} {result['rps']:9.0f} req/s {result['mb_per_s']:9.1f} MB/s "
+            f"304 {result['not_modified']:5.0%}  cache-control: {result['cache_control']}"
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="정적 파일 제공 경로 벤치마크")
+    parser.add_argument("--duration", type=float, default=5.0, help="자산별 측정 시간(초)")
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--port", type=int, default=8767)
+    parser.add_argument("--nginx-url", default=None, help="이미 실행 중인 nginx (/static/ 에 같은 파일이 있어야 함)")
+    args = parser.parse_args()
+
+    root = tempfile.mkdtemp(prefix="static_bench_")
+    static_dir = create_assets(root)
+    context = multiprocessing.get_context("spawn")
+
+    for name, cached in (("app", False), ("app-cached", True)):
+        process = context.Process(target=serve_app, args=(static_dir, args.port, cached), daemon=True)
+        process.start()
+        try:
+            base_url = f"http://127.0.0.1:{args.port}"
+            asyncio.run(wait_ready(f"{base_url}/static/css/styles.css"))
+            run_target(name, base_url, args, revalidate=cached)
+        finally:
+            process.terminate()
+            process.join()
+
+    nginx = None
+    nginx_url = args.nginx_url
+    if nginx_url is None:
+        nginx = start_nginx(root, args.port + 1)
+        nginx_url = f"http://127.0.0.1:{args.port + 1}" if nginx else None
+    if nginx_url is None:
+        print("nginx        (skipped: nginx not found on PATH, use --nginx-url)")
+    else:
+        try:
+            asyncio.run(wait_ready(f"{nginx_url}/static/css/styles.css"))
+            run_target("nginx", nginx_url, args)
+        finally:
+            if nginx:
+                nginx.terminate()
+                nginx.wait()
+    shutil.rmtree(root, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+"""
+WebSocket 메시지 크기 측정
+
+대표적인 한국어 채팅 메시지를 인코딩별로 직렬화하여 메시지당 바이트 수를 비교합니다.
+permessage-deflate는 context takeover(연결 단위 압축 사전 유지)를 가정하여
+동일 연결에서 연속 전송되는 메시지들의 평균 압축 크기로 계산합니다.
+
+사용법:
+    python -m benchmarks.ws_payload_size [--messages 200]
+"""
+import argparse
+import json
+import random
+import uuid
+import zlib
+from datetime import datetime, timedelta
+
+from app.schemas.websocket import ChatMessageResponse
+from app.utils.ws_codec import WS_ENCODING_JSON, WS_ENCODING_MSGPACK, encode_ws_payload
+
+SAMPLE_CONTENTS = [
+    "안녕하세요! 내일 아침 7시에 한강공원에서 만나요 🌅",
+    "좋아요, 저도 갈게요. 물 챙겨오세요!",
+    "오늘 러닝 코스는 여의도 한 바퀴 어떠세요?",
+    "늦어서 죄송해요 ㅠㅠ 10분 뒤 도착합니다",
+    "날씨가 너무 좋네요. 다들 화이팅!",
+]
+
+
+def build_messages(count: int):
+    base = datetime(2025, 6, 12, 7, 0, 0)
+    senders = [f"user_korea_{i}" for i in range(5)]
+    return [
+        ChatMessageResponse(
+            id=str(uuid.uuid4()),
+            sender_id=random.choice(senders),
+            content=random.choice(SAMPLE_CONTENTS),
+            timestamp=base + timedelta(seconds=i * 7, microseconds=random.randint(0, 999999)),
+        )
+        for i in range(count)
+    ]
+
+
+def deflate_average(frames) -> float:
+    """context takeover 상태의 permessage-deflate 평균 프레임 크기 (RFC 7692 기준)"""
+    compressor = zlib.compressobj(wbits=-zlib.MAX_WBITS)
+    total = 0
+    for frame in frames:
+        data = frame.encode("utf-8") if isinstance(frame, str) else frame
+        # 메시지 경계마다 SYNC_FLUSH, 마지막 4바이트(00 00 ff ff)는 전송하지 않음
+        total += len(compressor.compress(data) + compressor.flush(zlib.Z_SYNC_FLUSH)) - 4
+    return total / len(frames)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="WebSocket 메시지 크기 측정")
+    parser.add_argument("--messages", type=int, default=200, help="측정할 메시지 수")
+    args = parser.parse_args()
+
+    random.seed(42)
+    messages = build_messages(args.messages)
+
+    variants = {
+        # 변경 전 broadcast_message: json.dumps 기본값(ensure_ascii=True) + isoformat
+        "json (legacy, ascii-escaped)": [
+            json.dumps({
+                "id": m.id,
+                "sender_id": m.sender_id,
+                "content": m.content,
+                "timestamp": m.timestamp.isoformat(),
+            })
+            for m in messages
+        ],
+        "json": [encode_ws_payload(m, WS_ENCODING_JSON) for m in messages],
+        "msgpack": [encode_ws_payload(m, WS_ENCODING_MSGPACK) for m in messages],
+    }
+
+    print(f"{'encoding':<32}{'raw B/msg':>12}{'deflate B/msg':>16}")
+    for name, frames in variants.items():
+        raw = sum(len(f.encode("utf-8") if isinstance(f, str) else f) for f in frames) / len(frames)
+        print(f"{name:<32}{raw:>12.1f}{deflate_average(frames):>16.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,146 @@
+"""
+WebSocket 커넥션 풀 소크 테스트
+
+실제 uvicorn 서버(같은 프로세스)에 인증된 WebSocket 수천 개를 연결해 둔 채로
+유휴 상태를 유지하면서 DB 커넥션 풀 점유를 관찰합니다.
+소켓 수와 무관하게 풀 점유가 pool_size + max_overflow 이하로 유지되고,
+유휴 구간에서는 0으로 돌아오는지 검증합니다.
+
+Firebase 토큰 검증은 "토큰 = UID"로 대체하고, DB는 임시 SQLite 파일을 사용합니다.
+
+사용법:
+    python -m benchmarks.ws_pool_soak [--sockets 3000] [--idle 30]
+"""
+import argparse
+import asyncio
+import json
+import os
+import resource
+import tempfile
+import time
+
+# 앱 임포트 전에 설정 주입 (로컬 소크 테스트용 입장 제어 완화)
+_db_dir = tempfile.mkdtemp(prefix="ws_soak_")
+os.environ.setdefault("SQLALCHEMY_DATABASE_URL", f"sqlite:///{_db_dir}/soak.db")
+os.environ.setdefault("WS_HANDSHAKE_RATE_PER_IP", "100000")
+os.environ.setdefault("WS_HANDSHAKE_BURST_PER_IP", "100000")
+os.environ.setdefault("WS_MAX_CONCURRENT_HANDSHAKES", "100000")
+
+import firebase_admin  # noqa: E402
+from firebase_admin import auth as firebase_auth  # noqa: E402
+
+# Firebase 스텁: 자격 증명 없이 초기화를 건너뛰고 토큰을 UID로 그대로 사용
+firebase_admin.get_app = lambda *args, **kwargs: None
+firebase_auth.verify_id_token = lambda token, **kwargs: {"uid": token}
+
+import uvicorn  # noqa: E402
+import websockets  # noqa: E402
+
+from app.db import SessionLocal, engine, pool_monitor  # noqa: E402
+from app.main import app  # noqa: E402
+from app.models.chatroom import ChatroomCardDB, ChatroomDB, MessageDB  # noqa: E402
+
+
+def room_of(user_index: int, room_size: int) -> str:
+    return f"soak-room-{user_index // room_size}"
+
+
+def prepare_database(users: int, room_size: int):
+    ChatroomDB.__table__.create(engine, checkfirst=True)
+    MessageDB.__table__.create(engine, checkfirst=True)
+    ChatroomCardDB.__table__.create(engine, checkfirst=True)
+    with SessionLocal() as db:
+        for start in range(0, users, room_size):
+            db.add(ChatroomDB(
+                id=room_of(start, room_size),
+                title="soak",
+                created_by="system",
+                participants=[f"soak-user-{i}" for i in range(start, min(start + room_size, users))],
+                connection=[]
+            ))
+        db.commit()
+
+
+async def open_socket(base_url: str, user_index: int, room_size: int):
+    url = f"{base_url}/{room_of(user_index, room_size)}"
+    websocket = await websockets.connect(url, max_queue=None, ping_interval=None, open_timeout=60)
+    await websocket.recv()  # 연결 성공 메시지
+    await websocket.send(json.dumps({"type": "auth", "token": f"soak-user-{user_index}"}))
+    return websocket
+
+
+async def drain(websocket):
+    """입장 알림 등 브로드캐스트를 계속 비워서 서버 송신 버퍼가 쌓이지 않게 함"""
+    try:
+        async for _ in websocket:
+            pass
+    except websockets.ConnectionClosed:
+        pass
+
+
+async def run(sockets: int, room_size: int, idle: float, port: int):
+    config = uvicorn.Config(app, host="127.0.0.1", port=port, log_level="warning", ws="websockets")
+    server = uvicorn.Server(config)
+    server_task = asyncio.create_task(server.serve())
+    while not server.started:
+        await asyncio.sleep(0.05)
+
+    pool_limit = engine.pool.size() + engine.pool._max_overflow
+    base_url = f"ws://127.0.0.1:{port}/api/ws/chat"
+
+    started = time.perf_counter()
+    clients = []
+    drainers = []
+    for batch_start in range(0, sockets, 200):
+        batch = await asyncio.gather(*[
+            open_socket(base_url, i, room_size)
+            for i in range(batch_start, min(batch_start + 200, sockets))
+        ])
+        clients.extend(batch)
+        drainers.extend(asyncio.create_task(drain(ws)) for ws in batch)
+    print(f"connected {len(clients)} sockets in {time.perf_counter() - started:.1f}s")
+
+    peak_during_connect = pool_monitor.peak_checked_out
+    pool_monitor.reset_peak()
+
+    samples = []
+    deadline = time.perf_counter() + idle
+    while time.perf_counter() < deadline:
+        samples.append(pool_monitor.checked_out)
+        await asyncio.sleep(0.5)
+
+    print(f"pool limit (size + overflow)   = {pool_limit}")
+    print(f"peak checked out (connect)     = {peak_during_connect}")
+    print(f"max checked out (idle {idle:.0f}s)     = {max(samples)}")
+    print(f"total checkouts                = {pool_monitor.total_checkouts}")
+    print(f"max checkout wait              = {pool_monitor.stats()['max_checkout_wait_ms']}ms")
+    print(f"pool status                    = {engine.pool.status()}")
+
+    assert peak_during_connect <= pool_limit, "pool exceeded its configured bound"
+    assert max(samples) == 0, "idle sockets are holding pooled connections"
+
+    for ws in clients:
+        await ws.close()
+    await asyncio.gather(*drainers)
+    server.should_exit = True
+    await server_task
+
+
+def main():
+    parser = argparse.ArgumentParser(description="WebSocket 커넥션 풀 소크 테스트")
+    parser.add_argument("--sockets", type=int, default=3000)
+    parser.add_argument("--room-size", type=int, default=50, help="채팅방당 소켓 수")
+    parser.add_argument("--idle", type=float, default=30.0, help="유휴 관찰 시간(초)")
+    parser.add_argument("--port", type=int, default=8765)
+    args = parser.parse_args()
+
+    # 클라이언트 + 서버 소켓 모두 이 프로세스에 있으므로 fd 한도를 올림
+    soft, hard = resource.getrlimit(resource.RLIMIT_NOFILE)
+    resource.setrlimit(resource.RLIMIT_NOFILE, (min(hard, max(soft, args.sockets * 2 + 256)), hard))
+
+    prepare_database(args.sockets, args.room_size)
+    asyncio.run(run(args.sockets, args.room_size, args.idle, args.port))
+
+
+if __name__ == "__main__":
+    main()